@@ -1,5 +1,7 @@
 import discord
 from discord.ext import commands
+from discord import app_commands
+import aiohttp
 import json
 import os
 import csv
@@ -8,74 +10,1395 @@ import random
 import math
 import zipfile
 import io
+import html
+import threading
+import re
+import hashlib
+import pickle
+import heapq
+import unicodedata
+import sys
+import array
+import time
+import contextlib
+import functools
+import concurrent.futures
+import asyncio
+import collections
+import signal
+import tempfile
+import sqlite3
 try:
-    from jinja2 import Template
+    from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, TemplateNotFound
     from weasyprint import HTML
     HAS_VISUALS = True
 except ImportError:
     HAS_VISUALS = False
-    print("Warning: jinja2 or weasyprint not found. Visual brackets disabled.")
+    print("Warning: jinja2 or weasyprint not found. Falling back to the SVG bracket renderer.")
+
+# Optional: SVG brackets are also posted as PNG when cairosvg is installed
+try:
+    import cairosvg
+    HAS_SVG_PNG = True
+except (ImportError, OSError):
+    HAS_SVG_PNG = False
+
+# --- METRICS ---
+# Simple counters/gauges shown by !metrics
+metrics = collections.defaultdict(int)
+PROCESS_STARTED = time.monotonic()  # For time-to-ready
 
 # Load student data from CSV
 STUDENT_FILE = "response.csv"
-student_db = {}
 
-if os.path.exists(STUDENT_FILE):
-    with open(STUDENT_FILE, mode='r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+class StudentRecord:
+    """One roster entry. Supports info['name'] / info['sports'] like the old dict entries."""
+    __slots__ = ("name", "sports")
+
+    def __init__(self, name, sports):
+        self.name = name
+        self.sports = sports
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+class CompactRoster:
+    """
+    Memory-efficient student_db for large (50k-100k) rosters.
+    - Sport names are interned once and stored per student as a bitmask.
+    - Names and sport masks live in parallel arrays; index maps student number -> row.
+    Lookups behave like the old dict of dicts: `sid in roster`, `roster[sid]['name']`,
+    `roster[sid]['sports']` (a frozenset), `roster.items()`.
+    """
+
+    def __init__(self):
+        self.index = {}            # student number -> row
+        self.names = []            # row -> full name
+        self.masks = array.array('Q')  # row -> bitmask of sport ids
+        self.sport_names = []      # sport id -> name
+        self.sport_ids = {}        # name -> sport id
+        self._sport_sets = {}      # mask -> frozenset of names (few distinct combinations)
+
+    def _sport_bit(self, sport):
+        sport_id = self.sport_ids.get(sport)
+        if sport_id is None:
+            sport_id = len(self.sport_names)
+            self.sport_names.append(sys.intern(sport))
+            self.sport_ids[sport] = sport_id
+            if sport_id == 64:
+                self.masks = list(self.masks)  # Too many sports for 64-bit masks, fall back to Python ints
+        return 1 << sport_id
+
+    def add(self, sid, name, sport=None):
+        """Adds a student (or just another sport for an existing one)."""
+        row = self.index.get(sid)
+        if row is None:
+            row = len(self.names)
+            self.index[sid] = row
+            self.names.append(name)
+            self.masks.append(0)
+        if sport:
+            self.masks[row] |= self._sport_bit(sport)
+
+    def sports_for_mask(self, mask):
+        sports = self._sport_sets.get(mask)
+        if sports is None:
+            sports = frozenset(name for i, name in enumerate(self.sport_names) if mask >> i & 1)
+            self._sport_sets[mask] = sports
+        return sports
+
+    # --- dict-like API ---
+
+    def __contains__(self, sid):
+        return sid in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __getitem__(self, sid):
+        row = self.index[sid]
+        return StudentRecord(self.names[row], self.sports_for_mask(self.masks[row]))
+
+    def get(self, sid, default=None):
+        return self[sid] if sid in self.index else default
+
+    def keys(self):
+        return self.index.keys()
+
+    def items(self):
+        for sid, row in self.index.items():
+            yield sid, StudentRecord(self.names[row], self.sports_for_mask(self.masks[row]))
+
+def normalize_student_id(raw):
+    """'2025 -2- 02103' -> '2025-2-02103', '2023-2-00995@lpunetwork.edu.ph' -> '2023-2-00995'."""
+    return "".join(raw.split("@", 1)[0].split())
+
+def iter_roster_rows(path):
+    """Yields (student_number, full_name, sport) for every CSV row with a student number."""
+    # utf-8-sig also accepts files saved with a BOM (e.g. Excel exports)
+    with open(path, mode='r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if 'Student Number' not in header or 'Full Name' not in header:
+            print(f"Warning: {path} has no 'Student Number'/'Full Name' columns.")
+            return
+        # Column positions instead of csv.DictReader (avoids building a dict per row)
+        sid_col = header.index('Student Number')
+        name_col = header.index('Full Name')
+        # Google Form exports use 'Column 7', hand-made sheets use 'Sport'
+        sport_col = next((header.index(c) for c in ('Column 7', 'Sport') if c in header), None)
         for row in reader:
-            # Get Student Number and strip whitespace
-            sid = row.get('Student Number', '').strip()
+            # Get Student Number without spaces or e-mail suffix
+            sid = normalize_student_id(row[sid_col]) if len(row) > sid_col else ''
             if not sid: continue # Skip empty rows
+            name = row[name_col].strip() if len(row) > name_col else ''
+            sport = row[sport_col].strip() if sport_col is not None and len(row) > sport_col else ''
+            yield sid, name, sport
+
+def load_student_db(path):
+    """Parses the registration CSV into a CompactRoster."""
+    roster = CompactRoster()
+    if not os.path.exists(path):
+        print(f"Warning: {path} not found!")
+        return roster
+
+    for sid, name, sport in iter_roster_rows(path):
+        roster.add(sid, name, sport)
+    return roster
+
+# --- NAME INDEX (claim recovery) ---
+FUZZY_MATCH_THRESHOLD = 0.55  # minimum trigram similarity for a fuzzy match
+FUZZY_MATCH_MARGIN = 0.15     # best candidate must beat the runner-up by this much
+MAX_GRAM_POSTINGS = 2000      # trigrams shared by more names than this are too common to help
+
+def normalize_name(text):
+    """Case-folded, accent-stripped, letters and digits only: 'Édralin,' -> 'edralin'."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return "".join(ch for ch in decomposed if ch.isalnum() and not unicodedata.combining(ch)).casefold()
+
+def name_trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def surname_of(full_name):
+    """Logic must match !verify nickname generation exactly."""
+    parts = full_name.split()
+    return parts[0].replace(',', '') if parts else ''
+
+class NameIndex:
+    """
+    Normalized surname/full-name lookup for matching nicknames back to students.
+    - exact: normalized key -> student IDs
+    - grams: trigram -> keys containing it (approximate matching)
+    Built once per roster load, so !scanclaims and !fixunverified don't rebuild maps.
+    Never mutated once published as name_index: reloads and imports build a new
+    index (build/extended) and swap the reference, so readers on the I/O thread
+    always see one consistent snapshot.
+    """
 
-            if sid not in student_db:
-                student_db[sid] = {'name': row.get('Full Name', '').strip(), 'sports': set()}
-            
-            # Add sport to the set (handles duplicates automatically)
-            sport = row.get('Column 7', '').strip()
-            if sport:
-                student_db[sid]['sports'].add(sport)
-else:
-    print(f"Warning: {STUDENT_FILE} not found!")
+    def __init__(self):
+        self.exact = {}
+        self.grams = {}
+
+    @classmethod
+    def build(cls, roster):
+        index = cls()
+        for sid, info in roster.items():
+            index.add(sid, info['name'])
+        return index
+
+    def add(self, sid, full_name):
+        for key in {normalize_name(surname_of(full_name)), normalize_name(full_name)}:
+            if not key:
+                continue
+            sids = self.exact.get(key)
+            if sids is None:
+                sids = self.exact[key] = []
+                for gram in name_trigrams(key):
+                    self.grams.setdefault(gram, set()).add(key)
+            if sid not in sids:
+                sids.append(sid)
+
+    def extended(self, entries):
+        """Returns a copy with (sid, full_name) entries added; self is left untouched for concurrent readers."""
+        index = NameIndex()
+        index.exact = {key: list(sids) for key, sids in self.exact.items()}
+        index.grams = {gram: set(keys) for gram, keys in self.grams.items()}
+        for sid, full_name in entries:
+            index.add(sid, full_name)
+        return index
+
+    def candidates(self, nickname, limit=5):
+        """Returns up to `limit` (student_id, score) pairs, best first. 1.0 means an exact normalized match."""
+        key = normalize_name(nickname)
+        if not key:
+            return []
+
+        scores = {sid: 1.0 for sid in self.exact.get(key, ())}
+
+        # Count shared trigrams, skipping ones so common they match half the roster
+        query_grams = name_trigrams(key)
+        shared = collections.Counter()
+        for gram in query_grams:
+            postings = self.grams.get(gram, ())
+            if len(postings) <= MAX_GRAM_POSTINGS:
+                shared.update(postings)
+
+        # Exact Jaccard similarity for the most promising keys only
+        for other, _ in shared.most_common(50):
+            other_grams = name_trigrams(other)
+            score = len(query_grams & other_grams) / len(query_grams | other_grams)
+            for sid in self.exact[other]:
+                if score > scores.get(sid, 0):
+                    scores[sid] = score
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def resolve(self, nickname):
+        """
+        Picks a student for a nickname. Returns (status, student_id, candidates) where
+        status is 'match', 'ambiguous' or 'none'.
+        """
+        ranked = self.candidates(nickname)
+        if not ranked or ranked[0][1] < FUZZY_MATCH_THRESHOLD:
+            return 'none', None, ranked
+
+        best_sid, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0
+        if best_score == 1.0 and runner_up < 1.0:
+            return 'match', best_sid, ranked
+        if best_score < 1.0 and best_score - runner_up >= FUZZY_MATCH_MARGIN:
+            return 'match', best_sid, ranked
+        return 'ambiguous', None, ranked
+
+# --- STORAGE BACKEND ---
+# "json" (default) keeps the classic teams.json / claimed_ids.json / brackets.json files.
+# "sqlite" stores everything in DB_FILE and only rewrites the rows that changed.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").lower()
+DB_FILE = os.getenv("DB_FILE", "tournament.db")
+
+TEAM_COLUMNS = ("game", "captain_id", "text_channel_id", "voice_channel_id", "role_id", "created_at")
+MATCH_COLUMNS = ("round", "team1", "team2", "winner", "next_match_id", "channel_id")
+
+class SQLiteStorage:
+    """
+    SQLite (WAL mode) storage for teams, claimed IDs and brackets.
+    Tables: teams, members, invites, claims, brackets, bracket_matches.
+    Unknown dict keys are kept in an 'extra' JSON column so nothing is lost.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS teams (
+            name TEXT PRIMARY KEY, game TEXT, captain_id TEXT,
+            text_channel_id INTEGER, voice_channel_id INTEGER, role_id INTEGER,
+            created_at TEXT, extra TEXT
+        );
+        CREATE TABLE IF NOT EXISTS members (
+            team_name TEXT NOT NULL, user_id TEXT NOT NULL,
+            PRIMARY KEY (team_name, user_id)
+        );
+        CREATE TABLE IF NOT EXISTS invites (
+            team_name TEXT NOT NULL, user_id TEXT NOT NULL,
+            PRIMARY KEY (team_name, user_id)
+        );
+        CREATE TABLE IF NOT EXISTS claims (student_id TEXT PRIMARY KEY, user_id TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS claims_by_user ON claims (user_id);
+        CREATE TABLE IF NOT EXISTS brackets (game TEXT PRIMARY KEY, format TEXT, timestamp TEXT, extra TEXT);
+        CREATE TABLE IF NOT EXISTS bracket_matches (
+            game TEXT NOT NULL, match_id TEXT NOT NULL,
+            round INTEGER, team1 TEXT, team2 TEXT, winner TEXT,
+            next_match_id INTEGER, channel_id INTEGER, extra TEXT,
+            PRIMARY KEY (game, match_id)
+        );
+        CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, data TEXT);
+        CREATE TABLE IF NOT EXISTS member_snapshot (
+            guild_id TEXT NOT NULL, user_id TEXT NOT NULL,
+            name TEXT, is_bot INTEGER, role_ids TEXT,
+            PRIMARY KEY (guild_id, user_id)
+        );
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    # --- Teams ---
+
+    def load_teams(self):
+        teams = {}
+        for row in self.conn.execute("SELECT name, game, captain_id, text_channel_id, voice_channel_id, role_id, created_at, extra FROM teams"):
+            data = json.loads(row[7]) if row[7] else {}
+            data.update(dict(zip(TEAM_COLUMNS, row[1:7])))
+            data['members'] = []
+            data['invites'] = []
+            teams[row[0]] = data
+        # rowid order preserves the join order of members
+        for team_name, user_id in self.conn.execute("SELECT team_name, user_id FROM members ORDER BY rowid"):
+            if team_name in teams:
+                teams[team_name]['members'].append(user_id)
+        for team_name, user_id in self.conn.execute("SELECT team_name, user_id FROM invites ORDER BY rowid"):
+            if team_name in teams:
+                teams[team_name]['invites'].append(user_id)
+        return teams
+
+    def _write_team(self, team_name, data):
+        extra = {k: v for k, v in data.items() if k not in TEAM_COLUMNS and k not in ("members", "invites")}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO teams (name, game, captain_id, text_channel_id, voice_channel_id, role_id, created_at, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (team_name, *[data.get(c) for c in TEAM_COLUMNS], json.dumps(extra, default=str) if extra else None)
+        )
+        self.conn.execute("DELETE FROM members WHERE team_name = ?", (team_name,))
+        self.conn.executemany("INSERT OR IGNORE INTO members (team_name, user_id) VALUES (?, ?)",
+                              [(team_name, str(uid)) for uid in data.get('members', [])])
+        self.conn.execute("DELETE FROM invites WHERE team_name = ?", (team_name,))
+        self.conn.executemany("INSERT OR IGNORE INTO invites (team_name, user_id) VALUES (?, ?)",
+                              [(team_name, str(uid)) for uid in data.get('invites', [])])
+
+    def _delete_team(self, team_name):
+        self.conn.execute("DELETE FROM teams WHERE name = ?", (team_name,))
+        self.conn.execute("DELETE FROM members WHERE team_name = ?", (team_name,))
+        self.conn.execute("DELETE FROM invites WHERE team_name = ?", (team_name,))
+
+    def save_teams(self, teams, changed=None):
+        """Writes the given team names only, or diffs the whole dict when changed is None."""
+        with self.conn:
+            if changed is None:
+                stored = {row[0] for row in self.conn.execute("SELECT name FROM teams")}
+                for team_name in stored - set(teams):
+                    self._delete_team(team_name)
+                changed = teams.keys()
+            for team_name in changed:
+                if team_name in teams:
+                    self._write_team(team_name, teams[team_name])
+                else:
+                    self._delete_team(team_name)
+
+    # --- Claims ---
+
+    def load_claimed_ids(self):
+        return dict(self.conn.execute("SELECT student_id, user_id FROM claims ORDER BY rowid"))
+
+    def save_claimed_ids(self, claimed, changed=None):
+        with self.conn:
+            if changed is None:
+                self.conn.execute("DELETE FROM claims")
+                changed = claimed.keys()
+            for sid in changed:
+                if sid in claimed:
+                    self.conn.execute("INSERT OR REPLACE INTO claims (student_id, user_id) VALUES (?, ?)", (sid, claimed[sid]))
+                else:
+                    self.conn.execute("DELETE FROM claims WHERE student_id = ?", (sid,))
+
+    # --- Brackets ---
+
+    def load_brackets(self):
+        brackets = {}
+        for game, fmt, timestamp, extra in self.conn.execute("SELECT game, format, timestamp, extra FROM brackets"):
+            data = json.loads(extra) if extra else {}
+            data.update({"format": fmt, "matches": {}, "timestamp": timestamp})
+            brackets[game] = data
+        for row in self.conn.execute("SELECT game, match_id, round, team1, team2, winner, next_match_id, channel_id, extra FROM bracket_matches ORDER BY rowid"):
+            if row[0] not in brackets:
+                continue
+            match = json.loads(row[8]) if row[8] else {}
+            match['id'] = int(row[1])
+            match.update({c: v for c, v in zip(MATCH_COLUMNS, row[2:8]) if v is not None or c in ("team1", "team2", "winner", "next_match_id")})
+            brackets[row[0]]['matches'][row[1]] = match
+        return brackets
+
+    def _write_match(self, game, match_id, match):
+        extra = {k: v for k, v in match.items() if k not in MATCH_COLUMNS and k != "id"}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO bracket_matches (game, match_id, round, team1, team2, winner, next_match_id, channel_id, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (game, str(match_id), *[match.get(c) for c in MATCH_COLUMNS], json.dumps(extra) if extra else None)
+        )
+
+    def _write_bracket(self, game, data):
+        extra = {k: v for k, v in data.items() if k not in ("format", "matches", "timestamp")}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO brackets (game, format, timestamp, extra) VALUES (?, ?, ?, ?)",
+            (game, data.get('format'), data.get('timestamp'), json.dumps(extra) if extra else None)
+        )
+        self.conn.execute("DELETE FROM bracket_matches WHERE game = ?", (game,))
+        for match_id, match in data.get('matches', {}).items():
+            self._write_match(game, match_id, match)
+
+    def save_brackets(self, brackets, changed=None):
+        """
+        changed may hold game keys (rewrite that bracket) or (game, match_id)
+        tuples (rewrite a single match row).
+        """
+        with self.conn:
+            if changed is None:
+                stored = {row[0] for row in self.conn.execute("SELECT game FROM brackets")}
+                for game in stored - set(brackets):
+                    self.conn.execute("DELETE FROM brackets WHERE game = ?", (game,))
+                    self.conn.execute("DELETE FROM bracket_matches WHERE game = ?", (game,))
+                changed = brackets.keys()
+            for key in changed:
+                if isinstance(key, tuple):
+                    game, match_id = key
+                    self._write_match(game, match_id, brackets[game]['matches'][str(match_id)])
+                elif key in brackets:
+                    self._write_bracket(key, brackets[key])
+                else:
+                    self.conn.execute("DELETE FROM brackets WHERE game = ?", (key,))
+                    self.conn.execute("DELETE FROM bracket_matches WHERE game = ?", (key,))
+
+    # --- Bulk job checkpoints ---
+
+    def load_jobs(self):
+        return {job_id: json.loads(data) for job_id, data in self.conn.execute("SELECT id, data FROM jobs")}
+
+    def save_jobs(self, jobs, changed=None):
+        with self.conn:
+            if changed is None:
+                self.conn.execute("DELETE FROM jobs")
+                changed = jobs.keys()
+            for job_id in changed:
+                if job_id in jobs:
+                    self.conn.execute("INSERT OR REPLACE INTO jobs (id, data) VALUES (?, ?)", (job_id, json.dumps(jobs[job_id])))
+                else:
+                    self.conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    # --- Member snapshot ---
+
+    def load_member_snapshot(self):
+        guilds = {}
+        for guild_id, user_id, name, is_bot, role_ids in self.conn.execute("SELECT guild_id, user_id, name, is_bot, role_ids FROM member_snapshot"):
+            guilds.setdefault(guild_id, {})[user_id] = [name, bool(is_bot), json.loads(role_ids)]
+        guilds["_startup"] = self.load_meta_json("member_startup")
+        return guilds
+
+    def save_member_snapshot(self, guilds, changed=None):
+        """
+        changed may hold guild IDs (rewrite that guild), (guild_id, user_id)
+        tuples (rewrite or delete a single member row) or "_startup".
+        """
+        with self.conn:
+            if changed is None:
+                self.conn.execute("DELETE FROM member_snapshot")
+                changed = guilds.keys()
+            for key in changed:
+                if key == "_startup":
+                    self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", ("member_startup", json.dumps(guilds.get("_startup", {}))))
+                elif isinstance(key, tuple):
+                    guild_id, user_id = key
+                    entry = guilds.get(guild_id, {}).get(user_id)
+                    if entry:
+                        self._write_snapshot_member(guild_id, user_id, entry)
+                    else:
+                        self.conn.execute("DELETE FROM member_snapshot WHERE guild_id = ? AND user_id = ?", (guild_id, user_id))
+                else:
+                    self.conn.execute("DELETE FROM member_snapshot WHERE guild_id = ?", (key,))
+                    for user_id, entry in guilds.get(key, {}).items():
+                        self._write_snapshot_member(key, user_id, entry)
+
+    def _write_snapshot_member(self, guild_id, user_id, entry):
+        name, is_bot, role_ids = entry
+        self.conn.execute(
+            "INSERT OR REPLACE INTO member_snapshot (guild_id, user_id, name, is_bot, role_ids) VALUES (?, ?, ?, ?, ?)",
+            (guild_id, user_id, name, int(is_bot), json.dumps(role_ids))
+        )
+
+    # --- Small JSON settings (meta table) ---
+
+    def load_meta_json(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save_meta_json(self, key, data):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(data)))
+
+    # --- Migration / Export ---
+
+    def is_migrated(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'migrated_at'").fetchone()
+        return row is not None
+
+    def migrate_from_json(self):
+        """One-shot import of the legacy JSON files. Returns (teams, claims, brackets) counts."""
+        teams = read_json_file(TEAMS_FILE)
+        claimed = read_json_file(CLAIMED_FILE)
+        brackets = read_json_file(BRACKETS_FILE)
+        self.save_teams(teams)
+        self.save_claimed_ids(claimed)
+        self.save_brackets(brackets)
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_at', ?)", (datetime.datetime.now().isoformat(),))
+        return len(teams), len(claimed), len(brackets)
+
+    def export_json(self):
+        """Writes the JSON snapshots used by !backup and !exportbracket."""
+        write_json_file(TEAMS_FILE, self.load_teams())
+        write_json_file(CLAIMED_FILE, self.load_claimed_ids())
+        write_json_file(BRACKETS_FILE, self.load_brackets())
+
+def read_json_file(path):
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    return {}
+
+def read_files(paths):
+    """Returns [(filename, bytes)] for the paths that exist."""
+    found = []
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                found.append((os.path.basename(path), f.read()))
+    return found
+
+def write_json_file(path, data):
+    write_file_atomic(path, json.dumps(data, indent=4, default=str).encode())
+
+def write_file_atomic(path, content):
+    """Crash-safe write: write bytes to a temp file, fsync, then atomically rename over the target."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Persist the rename itself (not supported on every platform)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+# --- ROSTER CACHE ---
+# Parsed roster + name index pickled next to the CSV, keyed by the CSV's content hash.
+ROSTER_CACHE_FILE = os.getenv("ROSTER_CACHE_FILE", ".roster_cache.pickle")
+ROSTER_CACHE_VERSION = 2  # Bump when CompactRoster/NameIndex or CSV parsing change
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_roster_with_cache(path):
+    """
+    Returns (roster, name_index, source, seconds). source is 'cache' when the
+    pickled roster matched the CSV hash, 'csv' after a full parse, or 'missing'.
+    """
+    start = time.perf_counter()
+    if not os.path.exists(path):
+        roster = load_student_db(path)
+        return roster, NameIndex.build(roster), 'missing', time.perf_counter() - start
+
+    csv_hash = file_sha256(path)
+    if os.path.exists(ROSTER_CACHE_FILE):
+        try:
+            with open(ROSTER_CACHE_FILE, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get('version') == ROSTER_CACHE_VERSION and cached.get('hash') == csv_hash:
+                return cached['roster'], cached['name_index'], 'cache', time.perf_counter() - start
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable roster cache: {e}")
+
+    # Cache miss: full parse, then refresh the cache for the next start
+    roster = load_student_db(path)
+    index = NameIndex.build(roster)
+    try:
+        payload = {'version': ROSTER_CACHE_VERSION, 'hash': csv_hash, 'roster': roster, 'name_index': index}
+        write_file_atomic(ROSTER_CACHE_FILE, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError as e:
+        print(f"Warning: Could not write roster cache: {e}")
+    return roster, index, 'csv', time.perf_counter() - start
+
+roster_load_source = None # 'cache' or 'csv' (kept out of the numeric metrics counters)
+
+def record_roster_load(source, seconds):
+    global roster_load_source
+    roster_load_source = source
+    metrics['roster_load_ms'] = round(seconds * 1000, 1)
+    metrics[f'roster_load_{source}_ms'] = round(seconds * 1000, 1)
+    print(f"Loaded {len(student_db)} students from {source} in {seconds * 1000:.1f}ms.")
+
+student_db, name_index, _source, _seconds = load_roster_with_cache(STUDENT_FILE)
+record_roster_load(_source, _seconds)
+
+db = None
+
+# --- BACKGROUND I/O ---
+
+def on_event_loop():
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+class IOExecutor:
+    """
+    Dedicated thread for file and database I/O so json/csv/zip/sqlite work never
+    blocks the event loop (and with it, gateway heartbeats).
+    Jobs run one at a time in submission order, so a read queued after a write sees it.
+    """
+
+    def __init__(self):
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="bot-io")
+        self.queued = 0
+
+    def submit(self, fn, *args):
+        """Queues fn(*args) and returns a concurrent.futures.Future."""
+        self.queued += 1
+        metrics['io_jobs'] += 1
+        metrics['io_queue_peak'] = max(metrics['io_queue_peak'], self.queued)
+        return self.pool.submit(self._call, fn, args)
+
+    def _call(self, fn, args):
+        try:
+            return fn(*args)
+        finally:
+            self.queued -= 1
+
+    async def run(self, fn, *args):
+        """Awaitable version of submit()."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
+
+io_executor = IOExecutor()
+
+class LoopLagMonitor:
+    """
+    Sleeps for a fixed interval and measures how late it wakes up.
+    Anything above a few milliseconds means something blocked the event loop.
+    """
+
+    def __init__(self, interval=0.5, warn_threshold=0.25):
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self.task = None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        samples = collections.deque(maxlen=120)
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0)
+            samples.append(lag)
+            metrics['loop_lag_last_ms'] = round(lag * 1000, 1)
+            metrics['loop_lag_avg_ms'] = round(sum(samples) / len(samples) * 1000, 1)
+            metrics['loop_lag_max_ms'] = max(metrics['loop_lag_max_ms'], round(lag * 1000, 1))
+            if lag > self.warn_threshold:
+                metrics['loop_lag_warnings'] += 1
+                print(f"Warning: Event loop was blocked for {lag * 1000:.0f}ms.")
+
+loop_lag_monitor = LoopLagMonitor()
+
+# --- WRITE-BEHIND PERSISTENCE ---
+FLUSH_WINDOW = float(os.getenv("FLUSH_WINDOW", "0.5"))     # seconds of quiet before a flush
+MAX_STALENESS = float(os.getenv("MAX_STALENESS", "3.0"))   # hard limit for unsaved changes
+
+JSON_SCALARS = (str, int, float, bool, type(None))
+
+def snapshot_state(data, changed=None):
+    """
+    Deep copy taken on the event loop thread so the I/O thread never reads a
+    dict that a command is mutating. With SQLite only the changed keys are copied.
+    Serializing is left to the I/O thread; this only copies the containers.
+    """
+    if changed is not None and db:
+        keys = {k[0] if isinstance(k, tuple) else k for k in changed}
+        data = {k: data[k] for k in keys if k in data}
+    return copy_json_tree(data)
+
+def copy_json_tree(value):
+    """Copies dicts/lists down to the (immutable) leaves; same result as a JSON round trip with default=str."""
+    kind = type(value)
+    if kind is dict:
+        return {k if type(k) is str else str(k): v if type(v) in JSON_SCALARS else copy_json_tree(v) for k, v in value.items()}
+    if kind is list or kind is tuple:
+        return [v if type(v) in JSON_SCALARS else copy_json_tree(v) for v in value]
+    if isinstance(value, JSON_SCALARS):
+        return value
+    return str(value)
+
+class WriteBehind:
+    """
+    Coalesces saves. save_*() only marks a file dirty; the write happens once
+    FLUSH_WINDOW seconds pass without new changes, and never later than
+    MAX_STALENESS seconds after the first unsaved change.
+    Writes run on the I/O thread. Outside of a running event loop
+    (startup, shutdown) they happen immediately.
+    """
+
+    def __init__(self, window, max_staleness):
+        self.window = window
+        self.max_staleness = max_staleness
+        self.pending = {}  # key -> [data, write_fn, set of changed keys or None for a full write, snapshot_fn]
+        self.first_dirty = None
+        self.timer = None
+        self.failed = collections.deque()  # (key, entry) of writes that raised, waiting to be requeued
+
+    def mark_dirty(self, key, data, write_fn, changed=None, snapshot=snapshot_state):
+        """snapshot(data, changed) copies what the I/O thread will write (see snapshot_state)."""
+        metrics['save_requests'] += 1
+        entry = self.pending.get(key)
+        if entry is None:
+            self.pending[key] = [data, write_fn, None if changed is None else set(changed), snapshot]
+        else:
+            entry[0] = data  # Always write the newest state
+            if entry[2] is not None and changed is not None:
+                entry[2].update(changed)
+            else:
+                entry[2] = None
+
+        if not on_event_loop():
+            self.flush_all()
+            return
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self.first_dirty is None:
+            self.first_dirty = now
+        deadline = min(now + self.window, self.first_dirty + self.max_staleness)
+        if self.timer:
+            self.timer.cancel()
+        self.timer = loop.call_at(deadline, self.flush_all)
+
+    def flush(self, key):
+        """Hands one dirty file to the I/O thread now."""
+        entry = self.pending.pop(key, None)
+        if entry:
+            data, write_fn, changed, snapshot = entry
+            changed = None if changed is None else list(changed)
+            snap = snapshot(data, changed)
+            entry = (data, write_fn, changed, snapshot)
+            if on_event_loop():
+                io_executor.submit(self._write, key, snap, entry, asyncio.get_running_loop())
+            else:
+                self._write(key, snap, entry, None)
+        if not self.pending:
+            self.first_dirty = None
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+
+    def _write(self, key, snap, entry, loop):
+        """Runs on the I/O thread (loop set) or synchronously off the event loop (loop None)."""
+        data, write_fn, changed, snapshot = entry
+        try:
+            write_fn(snap, changed)
+            metrics['flushes'] += 1
+        except Exception as e:
+            metrics['flush_errors'] += 1
+            print(f"Error: Failed to save {key}: {e} (will retry)")
+            self.failed.append((key, entry))  # deque.append is thread-safe
+            if loop is not None:
+                try:
+                    loop.call_soon_threadsafe(self._requeue_failed)
+                except RuntimeError:
+                    pass # Event loop already closed (shutdown): the final flush_all() retries it
+
+    def _requeue_failed(self):
+        """Puts failed writes back in the queue; on the event loop the timer is re-armed (after MAX_STALENESS, not the short window)."""
+        if not self.failed:
+            return
+        while self.failed:
+            key, (data, write_fn, changed, snapshot) = self.failed.popleft()
+            entry = self.pending.get(key)
+            if entry is None:
+                self.pending[key] = [data, write_fn, None if changed is None else set(changed), snapshot]
+            elif entry[2] is not None and changed is not None:
+                entry[2].update(changed)  # Newer changes are pending too: write both sets of keys
+            else:
+                entry[2] = None
+        if not on_event_loop():
+            return # Picked up by the flush_all() that called us
+        loop = asyncio.get_running_loop()
+        if self.first_dirty is None:
+            self.first_dirty = loop.time()
+        if self.timer is None:
+            self.timer = loop.call_later(self.max_staleness, self.flush_all)
+
+    def flush_all(self):
+        self._requeue_failed()
+        for key in list(self.pending):
+            self.flush(key)
+
+    async def drain(self):
+        """Flushes everything and waits until it is on disk."""
+        self.flush_all()
+        await io_executor.run(lambda: None)
+
+persistence = WriteBehind(FLUSH_WINDOW, MAX_STALENESS)
 
 # File to track which ID belongs to which user
 CLAIMED_FILE = "claimed_ids.json"
 
 def load_claimed_ids():
-    if os.path.exists(CLAIMED_FILE):
-        with open(CLAIMED_FILE, "r") as f:
-            return json.load(f)
-    return {}
+    if db:
+        return db.load_claimed_ids()
+    return read_json_file(CLAIMED_FILE)
+
+def _write_claimed_ids(claimed, changed):
+    if db:
+        db.save_claimed_ids(claimed, changed)
+    else:
+        write_json_file(CLAIMED_FILE, claimed)
+
+def save_claimed_ids(claimed, changed=None):
+    """changed: student IDs that were added/removed (SQLite only rewrites those rows)."""
+    persistence.mark_dirty("claimed_ids", claimed, _write_claimed_ids, changed)
+
+class ClaimRegistry:
+    """
+    Bidirectional view of claimed_ids.json.
+    - by_student: student_id -> user_id (the persisted mapping)
+    - by_user: user_id -> set of student_ids
+    Both directions are updated together on every mutation.
+    """
 
-def save_claimed_ids(claimed):
-    with open(CLAIMED_FILE, "w") as f:
-        json.dump(claimed, f, indent=4)
+    def __init__(self):
+        self.by_student = {}
+        self.by_user = {}
+
+    def load(self):
+        self.replace_all(load_claimed_ids(), persist=False)
+
+    def replace_all(self, claimed, persist=True):
+        """Swaps in a whole new mapping (used by !restore)."""
+        self.by_student = claimed
+        self.by_user = {}
+        for sid, uid in claimed.items():
+            self.by_user.setdefault(uid, set()).add(sid)
+        if persist:
+            save_claimed_ids(self.by_student)
+
+    # --- Lookups (all O(1)) ---
+
+    def __contains__(self, student_id):
+        return student_id in self.by_student
+
+    def __len__(self):
+        return len(self.by_student)
+
+    def owner(self, student_id):
+        return self.by_student.get(student_id)
+
+    def student_ids_of(self, user_id):
+        return self.by_user.get(str(user_id), set())
+
+    def has_claim(self, user_id):
+        return str(user_id) in self.by_user
+
+    def duplicates(self):
+        """Returns {user_id: [student_ids]} for users holding more than one ID."""
+        return {uid: sorted(sids) for uid, sids in self.by_user.items() if len(sids) > 1}
+
+    # --- Mutations ---
+
+    def claim(self, student_id, user_id, exclusive=True):
+        """Links a student ID to a user. exclusive=True drops any other IDs the user held."""
+        user_id = str(user_id)
+        changed = [student_id]
+        if exclusive:
+            for old_sid in list(self.by_user.get(user_id, ())):
+                if old_sid != student_id:
+                    self._unlink(old_sid)
+                    changed.append(old_sid)
+        previous_owner = self.by_student.get(student_id)
+        if previous_owner and previous_owner != user_id:
+            self._unlink(student_id)
+        self.by_student[student_id] = user_id
+        self.by_user.setdefault(user_id, set()).add(student_id)
+        save_claimed_ids(self.by_student, changed)
+
+    def release(self, student_id):
+        if student_id in self.by_student:
+            self._unlink(student_id)
+            save_claimed_ids(self.by_student, [student_id])
+
+    def _unlink(self, student_id):
+        uid = self.by_student.pop(student_id)
+        sids = self.by_user.get(uid)
+        if sids:
+            sids.discard(student_id)
+            if not sids:
+                del self.by_user[uid]
+
+def report_duplicate_claims():
+    """Startup consistency check: prints users that hold more than one student ID."""
+    duplicates = claims.duplicates()
+    for uid, sids in duplicates.items():
+        print(f"Warning: User {uid} has claimed multiple student IDs: {', '.join(sids)}")
+    return duplicates
 
 # File to track Teams
 TEAMS_FILE = "teams.json"
 
 def load_teams():
-    if os.path.exists(TEAMS_FILE):
-        with open(TEAMS_FILE, "r") as f:
-            return json.load(f)
-    return {}
+    if db:
+        return db.load_teams()
+    return read_json_file(TEAMS_FILE)
 
-def save_teams(teams):
-    with open(TEAMS_FILE, "w") as f:
-        json.dump(teams, f, indent=4, default=str)
+def _write_teams(teams, changed):
+    if db:
+        db.save_teams(teams, changed)
+    else:
+        write_json_file(TEAMS_FILE, teams)
+
+def save_teams(teams, changed=None):
+    """changed: team names that were modified or deleted (SQLite only rewrites those rows)."""
+    persistence.mark_dirty("teams", teams, _write_teams, changed)
+
+class TeamStore:
+    """
+    Resident copy of teams.json with lookup indexes.
+    - member_index: user_id -> team name
+    - captain_index: captain user_id -> team name
+    - role_index: role_id -> team name
+    - game_index: game -> set of team names
+    Every mutation updates the indexes in place and persists via save_teams().
+    """
+
+    def __init__(self):
+        self.teams = {}
+        self.member_index = {}
+        self.captain_index = {}
+        self.role_index = {}
+        self.game_index = {}
+        self.locks = {}  # "user:<id>" / "team:<name>" -> [asyncio.Lock, number of holders + waiters]
+
+    def load(self):
+        """Reads teams.json once and rebuilds every index."""
+        self.replace_all(load_teams(), persist=False)
+
+    def save(self, changed=None):
+        save_teams(self.teams, changed)
+
+    def replace_all(self, teams, persist=True):
+        """Swaps in a whole new teams dict (used by !restore and !scanteams)."""
+        self.teams = teams
+        self.member_index = {}
+        self.captain_index = {}
+        self.role_index = {}
+        self.game_index = {}
+        for team_name, data in teams.items():
+            self._index_team(team_name, data)
+        if persist:
+            self.save()
+
+    def _index_team(self, team_name, data):
+        for user_id in data.get('members', []):
+            self.member_index[str(user_id)] = team_name
+        if data.get('captain_id'):
+            self.captain_index[str(data['captain_id'])] = team_name
+        if data.get('role_id'):
+            self.role_index[data['role_id']] = team_name
+        self.game_index.setdefault(data.get('game'), set()).add(team_name)
+
+    def _unindex_team(self, team_name, data):
+        for user_id in data.get('members', []):
+            if self.member_index.get(str(user_id)) == team_name:
+                del self.member_index[str(user_id)]
+        if self.captain_index.get(str(data.get('captain_id'))) == team_name:
+            del self.captain_index[str(data['captain_id'])]
+        if self.role_index.get(data.get('role_id')) == team_name:
+            del self.role_index[data['role_id']]
+        game_teams = self.game_index.get(data.get('game'))
+        if game_teams:
+            game_teams.discard(team_name)
+            if not game_teams:
+                del self.game_index[data.get('game')]
+
+    # --- Locking ---
+
+    @contextlib.asynccontextmanager
+    async def transaction(self, team=None, users=()):
+        """
+        Serializes commands that touch the same team or the same users, while
+        unrelated teams keep running in parallel. Usage:
+            async with team_store.transaction(team="Team Name", users=[member.id]):
+                ...check, call Discord, mutate...
+        team may also be a callable; it is evaluated after the user locks are
+        held, so "the team this user is in" cannot change underneath us.
+        User locks are always taken (sorted) before the single team lock,
+        which keeps lock ordering consistent and deadlock-free.
+        """
+        held = []
+        try:
+            for user_id in sorted({str(u) for u in users}):
+                await self._acquire(f"user:{user_id}")
+                held.append(f"user:{user_id}")
+            team_name = team() if callable(team) else team
+            if team_name:
+                await self._acquire(f"team:{team_name}")
+                held.append(f"team:{team_name}")
+            yield self
+        finally:
+            for key in reversed(held):
+                self.locks[key][0].release()
+                self._drop_lock_ref(key)
+
+    async def _acquire(self, key):
+        entry = self.locks.get(key)
+        if entry is None:
+            entry = self.locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        if entry[0].locked():
+            metrics['lock_waits'] += 1
+        try:
+            await entry[0].acquire()
+        except BaseException:
+            self._drop_lock_ref(key)
+            raise
+
+    def _drop_lock_ref(self, key):
+        # Forget locks nobody holds or waits for, so the dict doesn't grow forever
+        entry = self.locks[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self.locks[key]
+
+    # --- Lookups (all O(1)) ---
+
+    def __contains__(self, team_name):
+        return team_name in self.teams
+
+    def __len__(self):
+        return len(self.teams)
+
+    def get(self, team_name):
+        return self.teams.get(team_name)
+
+    def items(self):
+        return self.teams.items()
+
+    def values(self):
+        return self.teams.values()
+
+    def team_of(self, user_id):
+        """Returns (team_name, team_data) for the team the user is in, or (None, None)."""
+        team_name = self.member_index.get(str(user_id))
+        if team_name is None:
+            return None, None
+        return team_name, self.teams[team_name]
+
+    def captained_by(self, user_id):
+        """Returns (team_name, team_data) for the team the user captains, or (None, None)."""
+        team_name = self.captain_index.get(str(user_id))
+        if team_name is None:
+            return None, None
+        return team_name, self.teams[team_name]
+
+    def team_by_role(self, role_id):
+        return self.role_index.get(role_id)
+
+    def teams_for_game(self, game):
+        return list(self.game_index.get(game, ()))
+
+    def member_count(self):
+        return len(self.member_index)
+
+    # --- Mutations (indexes updated incrementally) ---
+
+    def create(self, team_name, data):
+        self.teams[team_name] = data
+        self._index_team(team_name, data)
+        self.save([team_name])
+
+    def delete(self, team_name):
+        data = self.teams.pop(team_name)
+        self._unindex_team(team_name, data)
+        self.save([team_name])
+        return data
+
+    def add_member(self, team_name, user_id, from_invite=False):
+        data = self.teams[team_name]
+        data['members'].append(user_id)
+        if from_invite:
+            data.setdefault('invites', []).remove(user_id)
+        self.member_index[user_id] = team_name
+        self.save([team_name])
+
+    def remove_member(self, team_name, user_id):
+        self.teams[team_name]['members'].remove(user_id)
+        if self.member_index.get(user_id) == team_name:
+            del self.member_index[user_id]
+        self.save([team_name])
+
+    def add_invite(self, team_name, user_id):
+        # Initialize list if it doesn't exist (for older teams)
+        self.teams[team_name].setdefault('invites', []).append(user_id)
+        self.save([team_name])
 
 # File to track Brackets
 BRACKETS_FILE = "brackets.json"
 
 def load_brackets():
-    if os.path.exists(BRACKETS_FILE):
-        with open(BRACKETS_FILE, "r") as f:
-            return json.load(f)
-    return {}
+    if db:
+        return db.load_brackets()
+    return read_json_file(BRACKETS_FILE)
+
+def _write_brackets(data, changed):
+    if db:
+        db.save_brackets(data, changed)
+    else:
+        write_json_file(BRACKETS_FILE, data)
+
+def save_brackets(data, changed=None):
+    """changed: game keys or (game, match_id) pairs that were modified (SQLite only rewrites those rows)."""
+    persistence.mark_dirty("brackets", data, _write_brackets, changed)
+
+# Checkpoints of unfinished bulk jobs (see BulkScheduler)
+JOBS_FILE = "bulk_jobs.json"
+
+def load_jobs():
+    if db:
+        return db.load_jobs()
+    return read_json_file(JOBS_FILE)
+
+def _write_jobs(jobs, changed):
+    if db:
+        db.save_jobs(jobs, changed)
+    else:
+        write_json_file(JOBS_FILE, jobs)
+
+def save_jobs(jobs, changed=None):
+    """changed: job IDs that were checkpointed or finished (SQLite only rewrites those rows)."""
+    persistence.mark_dirty("jobs", jobs, _write_jobs, changed)
+
+# Message IDs of the #mod-team dashboard (see ModDashboard)
+DASHBOARD_FILE = "dashboard.json"
+
+def load_dashboards():
+    if db:
+        return db.load_meta_json("dashboards")
+    return read_json_file(DASHBOARD_FILE)
+
+def _write_dashboards(data, changed):
+    if db:
+        db.save_meta_json("dashboards", data)
+    else:
+        write_json_file(DASHBOARD_FILE, data)
+
+def save_dashboards(data):
+    persistence.mark_dirty("dashboards", data, _write_dashboards)
+
+# Last known role memberships, used while the member cache is cold (see MemberSnapshot)
+SNAPSHOT_FILE = "member_snapshot.json"
+
+def load_member_snapshot():
+    if db:
+        return db.load_member_snapshot()
+    return read_json_file(SNAPSHOT_FILE)
+
+def _write_member_snapshot(data, changed):
+    if db:
+        db.save_member_snapshot(data, changed)
+    else:
+        write_json_file(SNAPSHOT_FILE, data)
+
+def snapshot_members(data, changed=None):
+    """Like snapshot_state, but (guild_id, user_id) keys copy one member instead of the whole guild."""
+    if changed is None or not db:
+        return snapshot_state(data, changed)
+    copy = {}
+    for key in changed:
+        if isinstance(key, tuple):
+            guild_id, user_id = key
+            entry = data.get(guild_id, {}).get(user_id)
+            if entry is not None:
+                copy.setdefault(guild_id, {})[user_id] = copy_json_tree(entry)
+        elif key in data:
+            copy[key] = copy_json_tree(data[key])
+    return copy
+
+def save_member_snapshot(data, changed=None):
+    """changed: guild IDs, (guild_id, user_id) pairs or "_startup" (SQLite only rewrites those rows)."""
+    persistence.mark_dirty("member_snapshot", data, _write_member_snapshot, changed, snapshot=snapshot_members)
+
+if STORAGE_BACKEND == "sqlite":
+    db = SQLiteStorage(DB_FILE)
+    if not db.is_migrated():
+        t_count, c_count, b_count = db.migrate_from_json()
+        print(f"Migrated JSON data into {DB_FILE}: {t_count} teams, {c_count} claims, {b_count} brackets.")
+
+# --- GUILD NAME INDEX ---
+def role_slug(name):
+    """'Team Alpha' -> 'team-alpha' (how team text channels are named)."""
+    return name.replace(" ", "-").lower()
+
+class GuildNameIndex:
+    """
+    Per-guild name -> object maps for roles, text channels and categories.
+    Built once per guild and kept in sync by the role/channel gateway events,
+    so lookups are O(1) instead of a discord.utils.get scan of guild.roles.
+    Each key maps to a list ordered like the guild's own lists (position, id),
+    so duplicate names resolve to the same object discord.utils.get would return.
+    """
+
+    # map name -> (source list on the guild, key function)
+    MAPS = {
+        'roles': (lambda g: g.roles, lambda o: o.name),
+        'role_slugs': (lambda g: g.roles, lambda o: role_slug(o.name)),
+        'text_channels': (lambda g: g.text_channels, lambda o: o.name),
+        'categories': (lambda g: g.categories, lambda o: o.name),
+        'categories_lower': (lambda g: g.categories, lambda o: o.name.lower()),
+    }
+    ROLE_MAPS = ('roles', 'role_slugs')
+    TEXT_CHANNEL_MAPS = ('text_channels',)
+    CATEGORY_MAPS = ('categories', 'categories_lower')
+
+    def __init__(self):
+        self.guilds = {}
+
+    def build(self, guild):
+        maps = {}
+        for map_name, (source, key) in self.MAPS.items():
+            entries = {}
+            for obj in source(guild):
+                entries.setdefault(key(obj), []).append(obj)
+            maps[map_name] = entries
+        self.guilds[guild.id] = maps
+        metrics['guild_index_builds'] += 1
+        return maps
+
+    def drop(self, guild):
+        self.guilds.pop(guild.id, None)
+
+    def _maps(self, guild):
+        maps = self.guilds.get(guild.id)
+        if maps is None:
+            maps = self.build(guild)
+        return maps
+
+    def _lookup(self, guild, map_name, key):
+        entries = self._maps(guild)[map_name].get(key)
+        return entries[0] if entries else None
+
+    def role(self, guild, name):
+        return self._lookup(guild, 'roles', name)
+
+    def role_by_slug(self, guild, slug):
+        """Finds the role a team channel was named after ('team-alpha' -> Team Alpha)."""
+        return self._lookup(guild, 'role_slugs', slug)
+
+    def text_channel(self, guild, name):
+        return self._lookup(guild, 'text_channels', name)
+
+    def category(self, guild, name, ignore_case=False):
+        if ignore_case:
+            return self._lookup(guild, 'categories_lower', name.lower())
+        return self._lookup(guild, 'categories', name)
+
+    def all_roles(self, guild, name):
+        return list(self._maps(guild)['roles'].get(name, ()))
+
+    def all_text_channels(self, guild, name):
+        return list(self._maps(guild)['text_channels'].get(name, ()))
+
+    # --- event updates ---
+    def _maps_for(self, obj):
+        if isinstance(obj, discord.Role):
+            return self.ROLE_MAPS
+        if isinstance(obj, discord.TextChannel):
+            return self.TEXT_CHANNEL_MAPS
+        if isinstance(obj, discord.CategoryChannel):
+            return self.CATEGORY_MAPS
+        return ()
+
+    def add(self, obj):
+        maps = self.guilds.get(obj.guild.id)
+        if maps is None:
+            return # Built lazily on first lookup
+        metrics['guild_index_events'] += 1
+        for map_name in self._maps_for(obj):
+            entries = maps[map_name].setdefault(self.MAPS[map_name][1](obj), [])
+            entries.append(obj)
+            entries.sort(key=lambda o: (o.position, o.id))
+
+    def remove(self, obj):
+        """Removes by id, so the 'before' copy from an update event works too."""
+        maps = self.guilds.get(obj.guild.id)
+        if maps is None:
+            return
+        metrics['guild_index_events'] += 1
+        for map_name in self._maps_for(obj):
+            key = self.MAPS[map_name][1](obj)
+            entries = [o for o in maps[map_name].get(key, []) if o.id != obj.id]
+            if entries:
+                maps[map_name][key] = entries
+            else:
+                maps[map_name].pop(key, None)
+
+    def update(self, before, after):
+        self.remove(before)
+        self.add(after)
+
+guild_index = GuildNameIndex()
+
+# --- VERIFY CHANNEL POLICY ---
+VERIFY_REMINDER_COOLDOWN = 60.0  # seconds between format reminders for the same user
+
+class VerifyChannelPolicy:
+    """
+    Precompiled on_message rules: channel_id -> role IDs exempt from the #verify filter.
+    Rebuilt from guild_index whenever roles or channels change, so a message
+    outside #verify costs a single dict lookup and a Moderator check is a role-ID lookup.
+    """
 
-def save_brackets(data):
-    with open(BRACKETS_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    def __init__(self, cooldown):
+        self.cooldown = cooldown
+        self.channels = {}        # channel_id -> frozenset of exempt role IDs
+        self.guild_channels = {}  # guild_id -> channel IDs it contributed
+        self.last_reminder = {}   # user_id -> monotonic time of the last reminder
+
+    def build(self, guild):
+        self.drop(guild)
+        exempt = frozenset(r.id for r in guild_index.all_roles(guild, "Moderator"))
+        channel_ids = [c.id for c in guild_index.all_text_channels(guild, "verify")]
+        for channel_id in channel_ids:
+            self.channels[channel_id] = exempt
+        self.guild_channels[guild.id] = channel_ids
+
+    def drop(self, guild):
+        for channel_id in self.guild_channels.pop(guild.id, ()):
+            self.channels.pop(channel_id, None)
+
+    def should_remind(self, user_id):
+        """One format reminder per user per cooldown window."""
+        now = time.monotonic()
+        if now - self.last_reminder.get(user_id, -self.cooldown) < self.cooldown:
+            metrics['verify_reminders_suppressed'] += 1
+            return False
+        if len(self.last_reminder) > 1000:
+            self.last_reminder = {uid: t for uid, t in self.last_reminder.items() if now - t < self.cooldown}
+        self.last_reminder[user_id] = now
+        return True
+
+verify_policy = VerifyChannelPolicy(VERIFY_REMINDER_COOLDOWN)
 
 # Configuration for In-Game Roles
 GAME_ROLES_CONFIG = {
@@ -83,32 +1406,342 @@ GAME_ROLES_CONFIG = {
     "Valorant": ["Duelist", "Controller", "Sentinel", "Initiator", "Flex"]
 }
 
-claimed_ids = load_claimed_ids()
+claims = ClaimRegistry()
+claims.load()
+report_duplicate_claims()
+tournament_brackets = load_brackets()
+team_store = TeamStore()
+team_store.load()
 
 # Global flag to control team creation
 team_creation_enabled = True
 
+# --- MEMBER CACHE ---
+# "full": download every member before on_ready (classic behaviour).
+# "lazy": become ready immediately and only fetch members on demand (never chunk);
+#         member-wide commands use the persisted snapshot, refreshed by events and fetches.
+# "warm": like "lazy", but chunk every guild in the background after ready.
+MEMBER_CACHE_MODE = os.getenv("MEMBER_CACHE_MODE", "full").lower()
+SNAPSHOT_SAVE_INTERVAL = 60.0  # seconds between snapshot saves (only if something changed)
+
+def member_cache_bytes(guilds):
+    """Approximate memory of the cached Member/User objects (shallow slot values, shared objects counted once)."""
+    seen = set()
+    total = 0
+    for guild in guilds:
+        for member in guild.members:
+            for obj in (member, getattr(member, "_user", None)):
+                if obj is None or id(obj) in seen:
+                    continue
+                seen.add(id(obj))
+                total += sys.getsizeof(obj)
+                for cls in type(obj).__mro__:
+                    for slot in getattr(cls, "__slots__", ()):
+                        value = getattr(obj, slot, None)
+                        if isinstance(value, (str, bytes, list, tuple, array.array)) and id(value) not in seen:
+                            seen.add(id(value))
+                            total += sys.getsizeof(value)
+    return total
+
+class MemberSnapshot:
+    """
+    Last known display name and role IDs of every member, per guild.
+    Kept current from member events, fetches and our own edits, saved every
+    SNAPSHOT_SAVE_INTERVAL seconds, and used by member-wide commands while a
+    guild is not chunked (lazy/warm mode). Once guild.chunked is True the live cache wins.
+    """
+
+    def __init__(self):
+        self.guilds = {}   # str(guild_id) -> {str(user_id): [display_name, is_bot, [role_ids]]}
+        self.startup = {}  # mode -> startup report, kept so both modes can be compared
+        self.changed = set()  # guild IDs, (guild_id, user_id) pairs and "_startup" not saved yet
+        self.task = None
+        self.warm_task = None  # warm mode: background chunking (warm_member_cache)
+
+    def load(self):
+        data = load_member_snapshot()
+        self.startup = data.pop("_startup", {})
+        self.guilds = data
+        count = sum(len(members) for members in self.guilds.values())
+        if count:
+            print(f"Loaded member snapshot: {count} members in {len(self.guilds)} guild(s).")
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(SNAPSHOT_SAVE_INTERVAL)
+            self.save()
+
+    def start_warmup(self):
+        if self.warm_task is None or self.warm_task.done():
+            self.warm_task = asyncio.ensure_future(warm_member_cache())
+            self.warm_task.add_done_callback(self._warmup_done)
+
+    @staticmethod
+    def _warmup_done(task):
+        if not task.cancelled() and task.exception():
+            print(f"Error: Warming the member cache failed: {task.exception()!r}")
+
+    def save(self):
+        if self.changed:
+            changed, self.changed = self.changed, set()
+            save_member_snapshot({**self.guilds, "_startup": self.startup}, changed)
+
+    # --- updates ---
+    def record(self, member, roles=None, nick=None):
+        """roles/nick override the member's cached values (used right after our own edits)."""
+        role_ids = sorted(r.id for r in (member.roles if roles is None else roles) if not r.is_default())
+        name = nick or member.display_name
+        entry = [name, member.bot, role_ids]
+        members = self.guilds.setdefault(str(member.guild.id), {})
+        if members.get(str(member.id)) != entry:
+            members[str(member.id)] = entry
+            self.changed.add((str(member.guild.id), str(member.id)))
+
+    def forget(self, member):
+        if self.guilds.get(str(member.guild.id), {}).pop(str(member.id), None) is not None:
+            self.changed.add((str(member.guild.id), str(member.id)))
+
+    def capture(self, guild):
+        """Replaces a guild's snapshot with the (fully chunked) live cache."""
+        self.guilds[str(guild.id)] = {
+            str(m.id): [m.display_name, m.bot, sorted(r.id for r in m.roles if not r.is_default())]
+            for m in guild.members
+        }
+        self.changed.add(str(guild.id))
+
+    # --- queries ---
+    def entries(self, guild):
+        """{user_id: (display_name, is_bot, set of role IDs)}: snapshot overlaid with every cached member."""
+        merged = {}
+        if not guild.chunked:
+            for uid, (name, is_bot, role_ids) in self.guilds.get(str(guild.id), {}).items():
+                merged[int(uid)] = (name, is_bot, set(role_ids))
+        for m in guild.members:
+            merged[m.id] = (m.display_name, m.bot, {r.id for r in m.roles})
+        return merged
+
+    def member_ids(self, guild, include_bots=False):
+        if guild.chunked:
+            return [m.id for m in guild.members if include_bots or not m.bot]
+        return [uid for uid, (_, is_bot, _) in self.entries(guild).items() if include_bots or not is_bot]
+
+    def role_member_ids(self, guild, role):
+        if guild.chunked:
+            return [m.id for m in role.members]
+        return [uid for uid, (_, _, role_ids) in self.entries(guild).items() if role.id in role_ids]
+
+    def report_startup(self, ready_ms):
+        """Records time-to-ready and member cache size for the current mode."""
+        report = self.startup.setdefault(MEMBER_CACHE_MODE, {})
+        report.update({
+            "ready_ms": round(ready_ms),
+            "cached_members": sum(len(g.members) for g in bot.guilds),
+            "cache_bytes": member_cache_bytes(bot.guilds),
+            "at": datetime.datetime.now().isoformat(timespec="seconds")
+        })
+        self.changed.add("_startup")
+
+    def report_chunked(self, chunk_ms):
+        report = self.startup.setdefault(MEMBER_CACHE_MODE, {})
+        report.update({
+            "chunked_ms": round(chunk_ms),
+            "warm_members": sum(len(g.members) for g in bot.guilds),
+            "warm_cache_bytes": member_cache_bytes(bot.guilds)
+        })
+        self.changed.add("_startup")
+
+member_snapshot = MemberSnapshot()
+member_snapshot.load()
+
+async def resolve_member(guild, user_id):
+    """Cached member, or fetched from the API while the guild is not chunked (lazy/warm mode)."""
+    member = guild.get_member(int(user_id))
+    if member is None and not guild.chunked:
+        try:
+            member = await guild.fetch_member(int(user_id))
+            metrics['member_fetches'] += 1
+        except discord.NotFound:
+            return None
+        member_snapshot.record(member)
+    return member
+
+MEMBER_QUERY_BATCH = 100  # user IDs per query_members request (gateway maximum)
+
+async def prefetch_members(guild, user_ids):
+    """
+    Lazy/warm mode: loads uncached members over the gateway, up to 100 per
+    request, so the resolve_member() calls that follow hit the cache instead of
+    making one fetch_member() HTTP request each. Members that fail to load here
+    are still fetched one by one.
+    """
+    if guild.chunked:
+        return
+    missing = [int(uid) for uid in user_ids if guild.get_member(int(uid)) is None]
+    for i in range(0, len(missing), MEMBER_QUERY_BATCH):
+        batch = missing[i:i + MEMBER_QUERY_BATCH]
+        try:
+            members = await guild.query_members(user_ids=batch, limit=len(batch), cache=True)
+        except (asyncio.TimeoutError, discord.ClientException) as e:
+            print(f"Warning: Could not prefetch {len(batch)} members of {guild.name}: {e!r}")
+            continue
+        metrics['member_queries'] += 1
+        for member in members:
+            member_snapshot.record(member)
+
+async def warm_member_cache():
+    """Warm mode: chunk guilds one by one after ready, then refresh the snapshot from the live cache."""
+    started = time.monotonic()
+    for guild in bot.guilds:
+        if not guild.chunked:
+            await guild.chunk()
+        member_snapshot.capture(guild)
+    member_snapshot.report_chunked((time.monotonic() - started) * 1000)
+    member_snapshot.save()
+    print(f"Member cache warm after {time.monotonic() - started:.1f}s.")
+
 # Bot setup
 intents = discord.Intents.default()
 intents.members = True  # Needed to manage roles
 intents.message_content = True # Needed to read commands like !verify
-bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+
+class SlashAwareContext(commands.Context):
+    """
+    Context whose send() replies ephemerally when the command was invoked as a
+    slash command, so the same command code serves both front ends.
+    Ephemeral replies are only visible to the user, so delete_after is dropped.
+    Hybrid commands start with ctx.defer() because an interaction must be
+    answered within 3 seconds; for prefix commands defer() does nothing.
+    """
+
+    async def send(self, content=None, **kwargs):
+        if self.interaction is not None:
+            kwargs.pop("delete_after", None)
+            kwargs["ephemeral"] = True
+        return await super().send(content, **kwargs)
+
+class TournamentBot(commands.Bot):
+    async def get_context(self, origin, /, *, cls=SlashAwareContext):
+        return await super().get_context(origin, cls=cls)
+
+if MEMBER_CACHE_MODE in ("lazy", "warm"):
+    # Only cache members we actually see (joins, messages, interactions); no voice-state cache
+    cache_options = {"chunk_guilds_at_startup": False, "member_cache_flags": discord.MemberCacheFlags(voice=False, joined=True)}
+else:
+    cache_options = {}
+bot = TournamentBot(command_prefix="!", intents=intents, help_command=None, **cache_options)
 
 @bot.event
 async def on_ready():
     print(f"{bot.user} is now running!")
+    for guild in bot.guilds:
+        guild_index.build(guild)
+        verify_policy.build(guild)
+
+    # Startup report (first ready only; on_ready fires again after reconnects)
+    if not metrics['time_to_ready_ms']:
+        metrics['time_to_ready_ms'] = round((time.monotonic() - PROCESS_STARTED) * 1000)
+        print(f"Ready in {metrics['time_to_ready_ms']} ms ({MEMBER_CACHE_MODE} member cache).")
+        member_snapshot.report_startup(metrics['time_to_ready_ms'])
+        if MEMBER_CACHE_MODE == "warm":
+            member_snapshot.start_warmup()
+        elif MEMBER_CACHE_MODE == "full":
+            for guild in bot.guilds:
+                member_snapshot.capture(guild)
+        member_snapshot.start()
+    loop_lag_monitor.start()
+    roster_watcher.start()
+    mod_log.start()
+    verification_queue.start()
+    await bulk_scheduler.resume_all()
+
+    # Flush unsaved data before exiting on SIGTERM (e.g. docker stop)
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, handle_shutdown_signal)
+    except (NotImplementedError, RuntimeError):
+        pass # Signal handlers are not available on this platform
+
+# SIGTERM handler (registered in on_ready above; a plain function, not a bot event)
+shutdown_task = None
+
+def handle_shutdown_signal():
+    global shutdown_task
+    print("Received SIGTERM, saving data and shutting down...")
+    member_snapshot.save()
+    persistence.flush_all()
+    shutdown_task = asyncio.ensure_future(bot.close())
+
+# Keep guild_index in sync with role/channel changes
+@bot.event
+async def on_guild_join(guild):
+    guild_index.build(guild)
+    verify_policy.build(guild)
+
+@bot.event
+async def on_guild_available(guild):
+    guild_index.build(guild)
+    verify_policy.build(guild)
+
+@bot.event
+async def on_guild_remove(guild):
+    guild_index.drop(guild)
+    verify_policy.drop(guild)
+
+@bot.event
+async def on_guild_role_create(role):
+    guild_index.add(role)
+    verify_policy.build(role.guild)
+
+@bot.event
+async def on_guild_role_delete(role):
+    guild_index.remove(role)
+    verify_policy.build(role.guild)
+
+@bot.event
+async def on_guild_role_update(before, after):
+    guild_index.update(before, after)
+    verify_policy.build(after.guild)
+
+@bot.event
+async def on_guild_channel_create(channel):
+    guild_index.add(channel)
+    verify_policy.build(channel.guild)
+
+@bot.event
+async def on_guild_channel_delete(channel):
+    guild_index.remove(channel)
+    verify_policy.build(channel.guild)
+
+@bot.event
+async def on_guild_channel_update(before, after):
+    guild_index.update(before, after)
+    verify_policy.build(after.guild)
+
+@bot.event
+async def on_member_update(before, after):
+    member_snapshot.record(after)
+
+@bot.event
+async def on_member_remove(member):
+    member_snapshot.forget(member)
+
 @bot.event
 async def on_member_join(member):
+    member_snapshot.record(member)
+
     # Look for a channel named 'verify' or 'general' to send the message
-    channel = discord.utils.get(member.guild.text_channels, name="verify")
+    channel = guild_index.text_channel(member.guild, "verify")
     if not channel:
-        channel = discord.utils.get(member.guild.text_channels, name="general")
+        channel = guild_index.text_channel(member.guild, "general")
     
     if channel:
         await channel.send(f"Welcome {member.mention}! Please verify yourself by typing `!verify 20XX-X-XXXXX`.", delete_after=60)
 
     # Automatically assign 'Unverified' role
-    unverified_role = discord.utils.get(member.guild.roles, name="Unverified")
+    unverified_role = guild_index.role(member.guild, "Unverified")
     if unverified_role:
         try:
             await member.add_roles(unverified_role)
@@ -122,40 +1755,41 @@ async def on_message(message):
     if message.author.bot:
         return
 
-    # Strict rules for 'verify' channel
-    if message.channel.name == "verify":
-        is_mod = discord.utils.get(message.author.roles, name="Moderator")
+    # Strict rules for 'verify' channel (one dict lookup for every other channel)
+    exempt_roles = verify_policy.channels.get(message.channel.id)
+    if exempt_roles is not None:
+        is_mod = any(message.author.get_role(role_id) for role_id in exempt_roles)
         
         # If user is NOT a moderator
-        mod_log_channel = discord.utils.get(message.guild.text_channels, name="mod-logs")
         if not is_mod:
             # If it's NOT a verify command, delete it immediately
             if not message.content.startswith("!verify"):
-                # Log the deleted message to mod-logs
-                if mod_log_channel:
-                    embed = discord.Embed(
-                        title="Deleted Message",
-                        description=f"**Author:** {message.author.mention}\n**Channel:** {message.channel.mention}\n**Content:** {message.content}",
-                        color=discord.Color.red()
-                    )
-                    await mod_log_channel.send(embed=embed)
-
-                # Delete the message and remind user of correct format
+                # Log the deleted message to mod-logs (only identical repeats from the same user are merged, so no content is lost)
+                mod_log.log(message.guild, f"🗑️ Deleted in {message.channel.mention} from {message.author.mention}: {message.content}", key=("deleted", message.author.id, message.content))
+
+                # Delete the message and remind user of correct format (once per cooldown window)
                 await message.delete()
-                await message.channel.send(f"{message.author.mention}, please verify using the format: `!verify 20XX-XX-XXXXX`", delete_after=5)                
+                if verify_policy.should_remind(message.author.id):
+                    await message.channel.send(f"{message.author.mention}, please verify using the format: `!verify 20XX-XX-XXXXX`", delete_after=5)
                 return
 
     # Process commands (like !verify)
     await bot.process_commands(message)
 
-@bot.command()
+@bot.hybrid_command(description="Link your Student Number to your Discord account.")
+@commands.guild_only()
+@app_commands.describe(school_id="Your Student Number, e.g. 2025-2-00228")
 async def verify(ctx, school_id: str = None):
     """User runs !verify <school_id> to check against whitelist"""
-    # Delete the user's command message to keep channel clean
-    try:
-        await ctx.message.delete()
-    except:
-        pass
+    if ctx.interaction:
+        # Slash command: nothing to clean up, but it must be answered within 3 seconds
+        await ctx.defer(ephemeral=True)
+    else:
+        # Delete the user's command message to keep channel clean
+        try:
+            await ctx.message.delete()
+        except:
+            pass
 
     # Ensure command is run in the correct channel
     if ctx.channel.name != "verify":
@@ -166,7 +1800,7 @@ async def verify(ctx, school_id: str = None):
         await ctx.send(f"{ctx.author.mention}, please provide your Student Number (e.g., `!verify 2025-2-00228`).", delete_after=5)
         return
 
-    clean_id = school_id.strip()
+    clean_id = normalize_student_id(school_id)
     user_id = str(ctx.author.id)
 
     # 1. Check if ID is in the CSV database
@@ -175,12 +1809,40 @@ async def verify(ctx, school_id: str = None):
         return
 
     # 2. Check if ID is already claimed by someone else
-    if clean_id in claimed_ids:
-        if claimed_ids[clean_id] != user_id:
+    if clean_id in claims:
+        if claims.owner(clean_id) != user_id:
             await ctx.send(f"{ctx.author.mention}, this ID has already been used by another user.", delete_after=5)
             return
 
-    # 3. Get Student Info
+    # 3. Queue the role/nickname work (see VerificationQueue)
+    try:
+        position = verification_queue.put(ctx, clean_id)
+    except asyncio.QueueFull:
+        await ctx.send(f"{ctx.author.mention}, verification is very busy right now. Please try again in a few minutes.", delete_after=10)
+        return
+    if position is None:
+        await ctx.send(f"{ctx.author.mention}, your verification is already in the queue.", delete_after=5)
+    elif position:
+        await ctx.send(f"⏳ {ctx.author.mention}, you are **#{position}** in the verification queue. Please wait.", delete_after=10)
+
+async def complete_verification(ctx, clean_id):
+    """Second half of !verify, run by a VerificationQueue worker."""
+    user_id = str(ctx.author.id)
+
+    # The roster or claims may have changed while the request was queued
+    if clean_id not in student_db:
+        await ctx.send(f"{ctx.author.mention}, that ID number is not recognized.", delete_after=5)
+        return
+    if clean_id in claims and claims.owner(clean_id) != user_id:
+        await ctx.send(f"{ctx.author.mention}, this ID has already been used by another user.", delete_after=5)
+        return
+
+    # Reserve the ID before any await so two queued requests for it cannot both succeed
+    newly_claimed = clean_id not in claims
+    if newly_claimed:
+        claims.claim(clean_id, user_id, exclusive=False)
+
+    # Get Student Info
     student_info = student_db[clean_id]
     
     # Change Nickname (First word of Full Name)
@@ -189,75 +1851,296 @@ async def verify(ctx, school_id: str = None):
     
     print(f"Attempting to change nickname for {ctx.author} to '{new_nickname}'...")
 
+    # Nickname and roles are collected and sent as one edit
+    update = MemberUpdate(ctx.author)
     if ctx.author.id == ctx.guild.owner_id:
         print("Error: Cannot change nickname because the user is the Server Owner.")
         await ctx.send("I cannot change the server owner's nickname.", delete_after=5)
     else:
-        try:
-            await ctx.author.edit(nick=new_nickname)
-            print("Nickname changed successfully.")
-        except discord.Forbidden as e:
-            print(f"Error: Failed to change nickname. Permission denied. Details: {e}")
-            print(f"Debug: Bot Top Role Position: {ctx.guild.me.top_role.position}, User Top Role Position: {ctx.author.top_role.position}")
-            await ctx.send("I couldn't change your nickname. My role might be below yours in the server settings.", delete_after=5)
-        except Exception as e:
-            print(f"Error: An unexpected error occurred: {e}")
+        update.set_nick(new_nickname)
 
     # 4. Assign Roles based on Sports
     roles_added = []
     for sport_name in student_info['sports']:
-        role = discord.utils.get(ctx.guild.roles, name=sport_name)
+        role = guild_index.role(ctx.guild, sport_name)
         if role:
             roles_added.append(role)
     
     # Add 'Solo' role (Free Agent status)
-    solo_role = discord.utils.get(ctx.guild.roles, name="Solo")
+    solo_role = guild_index.role(ctx.guild, "Solo")
     if solo_role:
         roles_added.append(solo_role)
 
     # Add the base 'Verified' role
-    verified_role = discord.utils.get(ctx.guild.roles, name="Verified")
+    verified_role = guild_index.role(ctx.guild, "Verified")
     if verified_role:
         roles_added.append(verified_role)
     
-    if roles_added:
-        await ctx.author.add_roles(*roles_added)
+    update.add(*roles_added)
     
     # Remove 'Unverified' role if the user has it
-    unverified_role = discord.utils.get(ctx.guild.roles, name="Unverified")
-    if unverified_role and unverified_role in ctx.author.roles:
-        await ctx.author.remove_roles(unverified_role)
+    update.remove(guild_index.role(ctx.guild, "Unverified"))
 
-    # 5. Save Claim
-    if clean_id not in claimed_ids:
-        claimed_ids[clean_id] = user_id
-        save_claimed_ids(claimed_ids)
+    try:
+        nick_ok = await update.apply(reason="!verify")
+    except Exception:
+        if newly_claimed:
+            claims.release(clean_id)
+        raise
+    if nick_ok and update.nick is not None:
+        print("Nickname changed successfully.")
+    elif not nick_ok:
+        print("Error: Failed to change nickname. Permission denied.")
+        print(f"Debug: Bot Top Role Position: {ctx.guild.me.top_role.position}, User Top Role Position: {ctx.author.top_role.position}")
+        await ctx.send("I couldn't change your nickname. My role might be below yours in the server settings.", delete_after=5)
 
     await ctx.send(f"{ctx.author.mention}, you have been verified as **{new_nickname}**!", delete_after=10)
 
+# --- VERIFICATION QUEUE ---
+VERIFY_WORKERS = int(os.getenv("VERIFY_WORKERS", "4"))
+VERIFY_GUILD_RATE = float(os.getenv("VERIFY_GUILD_RATE", "2.0"))  # API calls per second one guild's verifications may use
+VERIFY_GUILD_BURST = 6
+VERIFY_API_COST = 2  # One member edit + one confirmation message
+VERIFY_QUEUE_MAX = int(os.getenv("VERIFY_QUEUE_MAX", "200"))  # queued requests per guild before !verify answers "busy"
+
+class TokenBucket:
+    """Refills at 'rate' tokens per second up to 'capacity'."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def available(self, cost=1):
+        """True if acquire(cost) would not wait right now (nothing is spent)."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens >= cost
+
+    async def acquire(self, cost=1):
+        """Waits until 'cost' tokens are available. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= cost:
+                self.tokens -= cost
+                return waited
+            delay = (cost - self.tokens) / self.rate
+            waited += delay
+            await asyncio.sleep(delay)
+
+class VerificationQueue:
+    """
+    !verify requests are validated inline, then queued here and processed by a
+    bounded pool of workers. Guilds are served round-robin and each guild
+    spends from its own TokenBucket, so one server's registration rush cannot
+    starve another or exhaust the shared rate limits.
+    """
+
+    def __init__(self, workers, rate, burst):
+        self.workers = workers
+        self.rate = rate
+        self.burst = burst
+        self.pending = collections.OrderedDict()  # guild_id -> deque of (ctx, clean_id, queued_at), in service order
+        self.queued_users = set()
+        self.budgets = {}
+        self.items = asyncio.Semaphore(0)
+        self.idle = 0
+        self.tasks = []
+        self.latencies = collections.deque(maxlen=200)  # (wait, total) seconds of recent requests
+
+    def start(self):
+        self.tasks = [t for t in self.tasks if not t.done()]
+        while len(self.tasks) < self.workers:
+            self.tasks.append(asyncio.ensure_future(self._worker()))
+
+    @property
+    def depth(self):
+        return sum(len(q) for q in self.pending.values())
+
+    def budget(self, guild_id):
+        budget = self.budgets.get(guild_id)
+        if budget is None:
+            budget = self.budgets[guild_id] = TokenBucket(self.rate, self.burst)
+        return budget
+
+    def put(self, ctx, clean_id):
+        """
+        Queues a request. Returns its position in the guild's queue, 0 if a
+        worker and the guild's budget are free to run it right away, or None if
+        the user is already queued. Raises asyncio.QueueFull above VERIFY_QUEUE_MAX.
+        """
+        key = (ctx.guild.id, ctx.author.id)
+        if key in self.queued_users:
+            return None
+        queue = self.pending.setdefault(ctx.guild.id, collections.deque())
+        if len(queue) >= VERIFY_QUEUE_MAX:
+            metrics['verify_rejected'] += 1
+            raise asyncio.QueueFull
+        self.queued_users.add(key)
+        queue.append((ctx, clean_id, time.monotonic()))
+        metrics['verify_queue_peak'] = max(metrics['verify_queue_peak'], self.depth)
+        runs_now = self.depth <= self.idle and self.budget(ctx.guild.id).available(VERIFY_API_COST)
+        position = 0 if runs_now else len(queue)
+        self.items.release()
+        return position
+
+    def _next(self):
+        # Round-robin: take from the first guild, then move it to the back
+        guild_id, queue = next(iter(self.pending.items()))
+        request = queue.popleft()
+        if queue:
+            self.pending.move_to_end(guild_id)
+        else:
+            del self.pending[guild_id]
+        return guild_id, request
+
+    async def _worker(self):
+        while True:
+            self.idle += 1
+            await self.items.acquire()
+            self.idle -= 1
+            guild_id, (ctx, clean_id, queued_at) = self._next()
+            if await self.budget(guild_id).acquire(VERIFY_API_COST):
+                metrics['verify_budget_waits'] += 1
+
+            started = time.monotonic()
+            try:
+                await complete_verification(ctx, clean_id)
+                metrics['verify_processed'] += 1
+            except Exception as e:
+                metrics['verify_failed'] += 1
+                print(f"Error: Verification for {ctx.author} failed: {e}")
+                with contextlib.suppress(discord.HTTPException):
+                    await ctx.send(f"{ctx.author.mention}, something went wrong while verifying you. Please try again or contact a Moderator.", delete_after=10)
+            finally:
+                self.queued_users.discard((guild_id, ctx.author.id))
+            self.latencies.append((started - queued_at, time.monotonic() - queued_at))
+
+    def latency_ms(self):
+        """(average wait, average total, max total) over recent requests, in ms."""
+        if not self.latencies:
+            return 0, 0, 0
+        waits, totals = zip(*self.latencies)
+        return round(sum(waits) / len(waits) * 1000), round(sum(totals) / len(totals) * 1000), round(max(totals) * 1000)
+
+verification_queue = VerificationQueue(VERIFY_WORKERS, VERIFY_GUILD_RATE, VERIFY_GUILD_BURST)
+
 # --- TEAM SYSTEM HELPERS ---
 
-async def update_solo_role(guild, member, has_team):
+class MemberUpdate:
+    """
+    Collects role additions/removals and a nickname for a member, then applies
+    them with a single member.edit(roles=..., nick=...) call, or none at all if
+    nothing changed. Replaces separate add_roles/remove_roles/edit(nick=) calls.
+    Only the deltas are stored: the final role set is computed from the live
+    member.roles inside apply(), so role changes made by others in between
+    (gameroles, moderators, other bots) are kept.
+    """
+
+    def __init__(self, member):
+        self.member = member
+        self.added = set()
+        self.removed = set()
+        self.nick = None
+        self.legacy_calls = 0 # Calls the old add/remove/edit code would have made
+
+    def current_roles(self):
+        return {r for r in self.member.roles if not r.is_default()}
+
+    def target_roles(self, current):
+        return (current | self.added) - self.removed
+
+    def add(self, *roles):
+        roles = {r for r in roles if r and r not in self.target_roles(self.current_roles())}
+        if roles:
+            self.added |= roles
+            self.removed -= roles
+            self.legacy_calls += 1
+        return self
+
+    def remove(self, *roles):
+        roles = {r for r in roles if r and r in self.target_roles(self.current_roles())}
+        if roles:
+            self.removed |= roles
+            self.added -= roles
+            self.legacy_calls += 1
+        return self
+
+    def set_nick(self, nick):
+        # The server owner's nickname can never be changed by a bot
+        if self.member.id != self.member.guild.owner_id and nick != self.member.nick:
+            self.nick = nick
+            self.legacy_calls += 1
+        return self
+
+    @property
+    def changed(self):
+        current = self.current_roles()
+        return self.target_roles(current) != current or self.nick is not None
+
+    async def apply(self, reason=None):
+        """
+        Sends the edit. Returns False if only the nickname could not be set
+        (the roles are retried on their own, as the old separate calls allowed).
+        """
+        calls = 0
+        nick_ok = True
+        # Read the live roles right before the edit (roles= replaces the whole set)
+        current = self.current_roles()
+        roles = self.target_roles(current)
+        if roles != current or self.nick is not None:
+            kwargs = {}
+            if roles != current:
+                kwargs['roles'] = sorted(roles, key=lambda r: r.position)
+            if self.nick is not None:
+                kwargs['nick'] = self.nick
+            try:
+                calls += 1
+                await self.member.edit(reason=reason, **kwargs)
+            except discord.Forbidden:
+                if 'nick' not in kwargs:
+                    raise
+                nick_ok = False
+                kwargs.pop('nick')
+                if kwargs:
+                    calls += 1
+                    await self.member.edit(reason=reason, **kwargs)
+        else:
+            metrics['member_edits_skipped'] += 1
+
+        metrics['member_api_calls'] += calls
+        metrics['member_api_calls_saved'] += max(self.legacy_calls - calls, 0)
+        if calls:
+            member_snapshot.record(self.member, roles=roles, nick=self.nick if nick_ok else None)
+        return nick_ok
+
+async def update_solo_role(guild, member, has_team, update=None):
     """
     Manages the 'Solo' role based on team status.
     - If has_team is True: Remove 'Solo' role.
     - If has_team is False: Add 'Solo' role.
     Does NOT touch the 'Verified' role.
+    If a MemberUpdate is passed, the change is staged on it instead of applied.
     """
-    solo_role = discord.utils.get(guild.roles, name="Solo")
-    if not solo_role:
-        return
+    solo_role = guild_index.role(guild, "Solo")
+    pending = update or MemberUpdate(member)
+    if solo_role:
+        if has_team:
+            pending.remove(solo_role)
+        else:
+            pending.add(solo_role)
 
-    if has_team:
-        if solo_role in member.roles:
-            await member.remove_roles(solo_role)
-    else:
-        if solo_role not in member.roles:
-            await member.add_roles(solo_role)
+    if update is None:
+        await pending.apply()
 
 async def perform_verification(guild, member, student_id, moderator_user):
     """Reusable logic to verify a user, assign roles, and log the action."""
-    clean_id = student_id.strip()
+    clean_id = normalize_student_id(student_id)
     
     if clean_id not in student_db:
         return False, f"Student ID {clean_id} not found."
@@ -266,112 +2149,961 @@ async def perform_verification(guild, member, student_id, moderator_user):
     user_id = str(member.id)
 
     # 1. Manage Claimed IDs (Prevent Duplicates)
-    ids_to_remove = [sid for sid, uid in claimed_ids.items() if uid == user_id]
-    for old_sid in ids_to_remove:
-        del claimed_ids[old_sid]
-    
-    claimed_ids[clean_id] = user_id
-    save_claimed_ids(claimed_ids)
+    # claim() also releases any other IDs this user held
+    claims.claim(clean_id, user_id)
 
     # 2. Update Nickname
     new_nickname = student_info['name'].split()[0].replace(',', '')
-    try:
-        if member.id != guild.owner_id:
-            await member.edit(nick=new_nickname)
-    except:
-        pass # Ignore permission errors
+    update = MemberUpdate(member).set_nick(new_nickname)
 
     # 3. Assign Roles
     roles_to_add = []
-    verified_role = discord.utils.get(guild.roles, name="Verified")
+    verified_role = guild_index.role(guild, "Verified")
     if verified_role: roles_to_add.append(verified_role)
     
     for sport in student_info['sports']:
-        r = discord.utils.get(guild.roles, name=sport)
+        r = guild_index.role(guild, sport)
         if r: roles_to_add.append(r)
     
     # Solo Role (Only if NOT in a team)
-    teams = load_teams()
-    in_team = False
-    for t in teams.values():
-        if user_id in t['members']:
-            in_team = True
-            break
+    in_team = user_id in team_store.member_index
     
     if not in_team:
-        solo_role = discord.utils.get(guild.roles, name="Solo")
+        solo_role = guild_index.role(guild, "Solo")
         if solo_role: roles_to_add.append(solo_role)
     
-    if roles_to_add:
-        await member.add_roles(*roles_to_add)
+    update.add(*roles_to_add)
 
     # 4. Remove Unverified
-    unverified_role = discord.utils.get(guild.roles, name="Unverified")
-    if unverified_role and unverified_role in member.roles:
-        await member.remove_roles(unverified_role)
+    update.remove(guild_index.role(guild, "Unverified"))
+    await update.apply(reason=f"Verified by {moderator_user}") # Nickname permission errors are ignored
 
     # 5. Log Action
-    log_channel = discord.utils.get(guild.text_channels, name="mod-logs")
-    if log_channel:
-        embed = discord.Embed(title="🛡️ Verification Action", color=discord.Color.orange())
-        embed.add_field(name="User", value=member.mention, inline=True)
-        embed.add_field(name="Student ID", value=clean_id, inline=True)
-        embed.add_field(name="Nickname", value=new_nickname, inline=True)
-        embed.add_field(name="Action By", value=moderator_user.mention, inline=False)
-        embed.set_footer(text="User has been linked and roles assigned.")
-        await log_channel.send(embed=embed)
+    mod_log.log(guild, f"🛡️ {member.mention} verified as **{new_nickname}** (`{clean_id}`) by {moderator_user.mention}")
     
     return True, f"Verified {member.display_name} as {new_nickname}"
 
+DASHBOARD_DEBOUNCE = 3.0     # Seconds without team changes before the dashboard is redrawn
+DASHBOARD_MAX_DELAY = 15.0   # Redraw at least this often during a continuous burst
+EMBED_FIELD_CHARS = 1024     # Discord limits
+EMBED_FIELDS = 25
+MESSAGE_EMBEDS = 10
+MESSAGE_EMBED_CHARS = 6000   # Summed over all embeds of one message
+
+def build_dashboard_pages(teams_by_game):
+    """
+    Lays the team list out as pages (one page = one message = a list of embed dicts).
+    Long games are split over several fields, fields over several embeds, and
+    embeds over several messages so no Discord limit is exceeded.
+    """
+    # 1. Split each game's team list into fields of at most EMBED_FIELD_CHARS
+    fields = []
+    for game, team_list in teams_by_game.items():
+        chunks = [[]]
+        size = 0
+        for name in team_list:
+            if chunks[-1] and size + len(name) + 1 > EMBED_FIELD_CHARS:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(name)
+            size += len(name) + 1
+        for i, chunk in enumerate(chunks):
+            field_name = f"{game} ({len(team_list)})" if i == 0 else f"{game} (cont.)"
+            fields.append({"name": field_name, "value": "\n".join(chunk), "inline": False})
+    if not fields:
+        fields.append({"name": "Status", "value": "No teams created yet.", "inline": False})
+
+    # 2. Pack fields into embeds and embeds into messages
+    total = sum(len(team_list) for team_list in teams_by_game.values())
+    color = discord.Color.gold().value
+    pages = []
+    page_chars = 0
+    for field in fields:
+        cost = len(field["name"]) + len(field["value"])
+        page = pages[-1] if pages else None
+        # New message when this one is full (leaving room for titles and the footer)
+        if page is None or page_chars + cost > MESSAGE_EMBED_CHARS - 200 or (len(page) == MESSAGE_EMBEDS and len(page[-1]["fields"]) == EMBED_FIELDS):
+            embed = {"title": "🏆 Tournament Teams Dashboard" + (" (cont.)" if pages else ""), "color": color, "fields": []}
+            if not pages:
+                embed["description"] = f"**Total Teams:** {total}"
+            pages.append([embed])
+            page_chars = 0
+        elif len(page[-1]["fields"]) == EMBED_FIELDS:
+            page.append({"color": color, "fields": []})
+        pages[-1][-1]["fields"].append(field)
+        page_chars += cost
+    return pages
+
+class ModDashboard:
+    """
+    Keeps the #mod-team team list as persistent messages that are edited in place.
+    update_mod_dashboard() only schedules a redraw: a burst of team changes is
+    debounced into one redraw, and only pages whose content changed are edited.
+    Message IDs are stored with save_dashboards() so a restart reuses them.
+    """
+
+    def __init__(self, debounce, max_delay):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.state = {}  # str(guild_id) -> {"channel_id": id, "messages": [[message_id, page_hash], ...]}
+        self.timers = {}
+        self.first_request = {}
+        self.locks = collections.defaultdict(asyncio.Lock)
+        self.tasks = set()  # running redraws, referenced so they are not garbage-collected
+
+    def load(self):
+        self.state = load_dashboards()
+
+    def schedule(self, guild):
+        metrics['dashboard_requests'] += 1
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        first = self.first_request.setdefault(guild.id, now)
+        if guild.id in self.timers:
+            self.timers[guild.id].cancel()
+        delay = max(min(now + self.debounce, first + self.max_delay) - now, 0)
+        self.timers[guild.id] = loop.call_later(delay, self.start_refresh, guild)
+
+    def start_refresh(self, guild):
+        task = asyncio.ensure_future(self.refresh(guild))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def get_channel(self, guild, entry):
+        """Finds or creates the #mod-team channel."""
+        mod_channel = guild.get_channel(entry.get("channel_id") or 0) or guild_index.text_channel(guild, "mod-team")
+        if not mod_channel:
+            # Create channel exclusive to Moderators
+            overwrites = {
+                guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                guild.me: discord.PermissionOverwrite(read_messages=True)
+            }
+            mod_role = guild_index.role(guild, "Moderator")
+            if mod_role:
+                overwrites[mod_role] = discord.PermissionOverwrite(read_messages=True)
+
+            mod_channel = await guild.create_text_channel("mod-team", overwrites=overwrites)
+        return mod_channel
+
+    async def refresh(self, guild):
+        self.timers.pop(guild.id, None)
+        self.first_request.pop(guild.id, None)
+        async with self.locks[guild.id]:
+            metrics['dashboard_refreshes'] += 1
+            try:
+                await self.redraw(guild)
+            except discord.HTTPException as e:
+                print(f"Warning: Could not update the mod dashboard: {e}")
+
+    async def redraw(self, guild):
+        entry = self.state.get(str(guild.id), {})
+        mod_channel = await self.get_channel(guild, entry)
+        if entry.get("channel_id") != mod_channel.id:
+            # First run (or channel recreated): clear old one-off dashboard posts once
+            try:
+                await mod_channel.purge(limit=10)
+            except:
+                pass # Fail silently if history is too old or perms issue
+            entry = {"channel_id": mod_channel.id, "messages": []}
+
+        # Group teams by Game
+        teams_by_game = {}
+        for game, team_names in team_store.game_index.items():
+            if team_names:
+                teams_by_game[game.upper()] = sorted(team_names)
+        pages = build_dashboard_pages(teams_by_game)
+
+        old = entry["messages"]
+        new = []
+        stamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for i, page in enumerate(pages):
+            page_hash = hashlib.sha1(json.dumps(page, sort_keys=True).encode()).hexdigest()
+            embeds = [discord.Embed.from_dict(e) for e in page]
+            embeds[-1].set_footer(text=f"Last Updated: {stamp}")
+
+            if i < len(old):
+                message_id, old_hash = old[i]
+                if old_hash == page_hash:
+                    new.append(old[i])
+                    metrics['dashboard_edits_skipped'] += 1
+                    continue
+                try:
+                    await mod_channel.get_partial_message(message_id).edit(embeds=embeds)
+                    new.append([message_id, page_hash])
+                    metrics['dashboard_edits'] += 1
+                    continue
+                except discord.NotFound:
+                    # Deleted by hand: repost from here on so the pages stay in order
+                    for message_id, _ in old[i + 1:]:
+                        with contextlib.suppress(discord.HTTPException):
+                            await mod_channel.get_partial_message(message_id).delete()
+                    old = old[:i]
+
+            msg = await mod_channel.send(embeds=embeds)
+            new.append([msg.id, page_hash])
+            metrics['dashboard_posts'] += 1
+
+        # The team list shrank: remove leftover pages
+        for message_id, _ in old[len(pages):]:
+            with contextlib.suppress(discord.HTTPException):
+                await mod_channel.get_partial_message(message_id).delete()
+
+        entry["messages"] = new
+        self.state[str(guild.id)] = entry
+        save_dashboards(self.state)
+
+mod_dashboard = ModDashboard(DASHBOARD_DEBOUNCE, DASHBOARD_MAX_DELAY)
+mod_dashboard.load()
+
 async def update_mod_dashboard(guild):
-    """Updates the #mod-team channel with a list of all teams."""
-    teams = load_teams()
-    
-    # Find or Create #mod-team channel
-    mod_channel = discord.utils.get(guild.text_channels, name="mod-team")
-    if not mod_channel:
-        # Create channel exclusive to Moderators
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            guild.me: discord.PermissionOverwrite(read_messages=True)
-        }
-        mod_role = discord.utils.get(guild.roles, name="Moderator")
-        if mod_role:
-            overwrites[mod_role] = discord.PermissionOverwrite(read_messages=True)
-        
-        mod_channel = await guild.create_text_channel("mod-team", overwrites=overwrites)
+    """Schedules a redraw of the #mod-team team list (debounced, edited in place)."""
+    mod_dashboard.schedule(guild)
+
+# --- MOD LOG ---
+MODLOG_FLUSH_INTERVAL = float(os.getenv("MODLOG_FLUSH_INTERVAL", "5"))  # seconds between batched posts
+MODLOG_BATCH_SIZE = 25      # Post early once a guild has this many buffered events
+MODLOG_MAX_BUFFER = 500     # Oldest routine events are dropped beyond this (per guild)
+MODLOG_MAX_BACKOFF = 300.0  # seconds; cap for the delay after repeated 429/5xx errors
+EMBED_DESCRIPTION_CHARS = 4096
+MODLOG_LINE_CHARS = EMBED_DESCRIPTION_CHARS - 64  # A whole message fits; the rest is room for the timestamp, 🚨 and (×N)
+
+class ModLogSink:
+    """
+    Buffers #mod-logs events per guild and posts them as batched embeds,
+    one message per flush instead of one message per event.
+    - Events with the same key (e.g. repeated spam from one user) are coalesced into one line.
+    - Urgent events are listed first and trigger an immediate flush.
+    - When the buffer is full the oldest routine events are dropped.
+    Coalesced and dropped counts are shown in the embed footer and in !metrics.
+    """
+
+    def __init__(self, interval, batch_size, max_buffer):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.buffers = {}  # guild_id -> {"guild": guild, "events": OrderedDict(key -> event), "coalesced": n, "dropped": n, "backoff": s, "retry_at": t}
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._run())
+
+    def log(self, guild, text, key=None, urgent=False):
+        """Queues one line for #mod-logs. key: events with the same key are merged."""
+        metrics['modlog_events'] += 1
+        buffer = self.buffers.get(guild.id)
+        if buffer is None:
+            buffer = self.buffers[guild.id] = {"guild": guild, "events": collections.OrderedDict(), "coalesced": 0, "dropped": 0, "backoff": 0, "retry_at": 0}
+        events = buffer["events"]
+
+        key = key or object() # Unkeyed events are never merged
+        if key in events:
+            events[key]["count"] += 1
+            events[key]["urgent"] |= urgent
+            buffer["coalesced"] += 1
+            metrics['modlog_coalesced'] += 1
+        else:
+            if len(events) >= self.max_buffer:
+                oldest = next((k for k, e in events.items() if not e["urgent"]), None)
+                if oldest is None and not urgent:
+                    oldest = key # Buffer is all urgent: drop the new routine event instead
+                if oldest is not None:
+                    buffer["dropped"] += 1
+                    metrics['modlog_dropped'] += 1
+                    if oldest is key:
+                        return
+                    del events[oldest]
+            if len(text) > MODLOG_LINE_CHARS:
+                text = text[:MODLOG_LINE_CHARS - 1] + "…"
+            events[key] = {"text": text, "count": 1, "urgent": urgent, "time": datetime.datetime.now()}
+
+        if urgent or len(events) >= self.batch_size:
+            self.wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            for guild_id in list(self.buffers):
+                try:
+                    await self.flush(guild_id)
+                except discord.HTTPException as e:
+                    print(f"Warning: Could not post to #mod-logs (retrying in {self.buffers[guild_id]['backoff']:.0f}s): {e}")
+
+    async def flush(self, guild_id):
+        buffer = self.buffers.get(guild_id)
+        if not buffer or not buffer["events"] or time.monotonic() < buffer["retry_at"]:
+            return
+        guild = buffer["guild"]
+        log_channel = guild_index.text_channel(guild, "mod-logs")
+        if not log_channel:
+            del self.buffers[guild_id] # Nowhere to post
+            return
+
+        # Urgent events first, then in arrival order; whatever does not fit waits for the next flush
+        events = buffer["events"]
+        ordered = sorted(events.items(), key=lambda item: not item[1]["urgent"])
+        chunks = []
+        lines = []
+        chars = 0
+        total_chars = 0
+        sent_keys = []
+        for key, event in ordered:
+            prefix = "🚨 " if event["urgent"] else ""
+            suffix = f" (×{event['count']})" if event["count"] > 1 else ""
+            line = f"`{event['time'].strftime('%H:%M:%S')}` {prefix}{event['text']}{suffix}"
+            if total_chars + len(line) + 1 > MESSAGE_EMBED_CHARS - 300:
+                break
+            if chars + len(line) + 1 > EMBED_DESCRIPTION_CHARS:
+                if len(chunks) + 1 == MESSAGE_EMBEDS:
+                    break
+                chunks.append(lines)
+                lines = []
+                chars = 0
+            lines.append(line)
+            chars += len(line) + 1
+            total_chars += len(line) + 1
+            sent_keys.append(key)
+        chunks.append(lines)
+
+        urgent = any(events[k]["urgent"] for k in sent_keys)
+        color = discord.Color.red() if urgent else discord.Color.dark_grey()
+        embeds = []
+        for i, chunk in enumerate(chunks):
+            embed = discord.Embed(description="\n".join(chunk), color=color)
+            if i == 0:
+                embed.title = f"📝 Mod Log ({len(sent_keys)} events)"
+            embeds.append(embed)
+        embeds[-1].set_footer(text=f"Coalesced: {buffer['coalesced']} | Dropped: {buffer['dropped']} | Waiting: {len(events) - len(sent_keys)}")
+
+        # Events stay buffered until the post succeeds
+        sent_counts = {key: events[key]["count"] for key in sent_keys}
+        coalesced, dropped = buffer["coalesced"], buffer["dropped"]
+        try:
+            await log_channel.send(embeds=embeds)
+        except discord.HTTPException as e:
+            if e.status == 429 or e.status >= 500:
+                # Transient: keep the batch and wait longer after every failure
+                buffer["backoff"] = min(max(buffer["backoff"] * 2, self.interval), MODLOG_MAX_BACKOFF)
+                buffer["retry_at"] = time.monotonic() + buffer["backoff"]
+                raise
+            # Permanent (403 lost access, 400 bad embed): resending can never succeed
+            self.discard(buffer, sent_counts)
+            buffer["dropped"] += len(sent_counts)
+            metrics['modlog_dropped'] += len(sent_counts)
+            print(f"Warning: Dropped {len(sent_counts)} mod-log events for {guild.name}: {e}")
+            return
+        buffer["backoff"] = 0
+        metrics['modlog_messages'] += 1
+        self.discard(buffer, sent_counts)
+        buffer["coalesced"] -= coalesced
+        buffer["dropped"] -= dropped
+
+    @staticmethod
+    def discard(buffer, sent_counts):
+        """Removes posted (or given up) events; repeats merged in while sending stay for the next post."""
+        events = buffer["events"]
+        for key, count in sent_counts.items():
+            event = events.get(key)
+            if event is None:
+                continue
+            if event["count"] > count:
+                event["count"] -= count
+            else:
+                del events[key]
+
+mod_log = ModLogSink(MODLOG_FLUSH_INTERVAL, MODLOG_BATCH_SIZE, MODLOG_MAX_BUFFER)
+
+# --- ROSTER RELOAD ---
+ROSTER_POLL_INTERVAL = float(os.getenv("ROSTER_POLL_INTERVAL", "30"))  # seconds between response.csv checks
+ROSTER_MIN_KEEP = 0.5  # a reload must keep at least this fraction of the current roster (else it is a partial file)
 
-    # Clear previous messages to keep it clean (Dashboard style)
+def file_signature(path):
+    """(mtime, size) of a file, or None if it is missing. Cheap change detection."""
     try:
-        await mod_channel.purge(limit=10)
-    except:
-        pass # Fail silently if history is too old or perms issue
-
-    # Build the Dashboard Embed
-    embed = discord.Embed(title="🏆 Tournament Teams Dashboard", color=discord.Color.gold())
-    embed.description = f"**Total Teams:** {len(teams)}\nLast Updated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-
-    # Group teams by Game
-    teams_by_game = {}
-    for team_name, data in teams.items():
-        game = data['game'].upper()
-        if game not in teams_by_game:
-            teams_by_game[game] = []
-        teams_by_game[game].append(team_name)
-    
-    if not teams_by_game:
-        embed.add_field(name="Status", value="No teams created yet.", inline=False)
-    else:
-        for game, team_list in teams_by_game.items():
-            embed.add_field(name=f"{game} ({len(team_list)})", value="\n".join(team_list), inline=False)
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def diff_rosters(old, new):
+    """Compares two student_db dicts. Returns added IDs, removed IDs and {sid: (old_sports, new_sports)}."""
+    added = sorted(set(new) - set(old))
+    removed = sorted(set(old) - set(new))
+    sports_changed = {}
+    for sid in set(old) & set(new):
+        old_sports = old[sid]['sports']
+        new_sports = new[sid]['sports']
+        if old_sports != new_sports:
+            sports_changed[sid] = (old_sports, new_sports)
+    return {'added': added, 'removed': removed, 'sports_changed': sports_changed}
+
+async def apply_sport_changes(guild, sports_changed):
+    """Adjusts sport roles only for verified members whose sports changed. Returns members updated."""
+    updated = 0
+    await prefetch_members(guild, [uid for uid in map(claims.owner, sports_changed) if uid])
+    for sid, (old_sports, new_sports) in sports_changed.items():
+        user_id = claims.owner(sid)
+        member = await resolve_member(guild, user_id) if user_id else None
+        if not member:
+            continue
+
+        update = MemberUpdate(member)
+        update.add(*(guild_index.role(guild, s) for s in new_sports - old_sports))
+        update.remove(*(guild_index.role(guild, s) for s in old_sports - new_sports))
+        if not update.changed:
+            continue
+        try:
+            await update.apply(reason="Roster reload")
+        except discord.Forbidden:
+            print(f"Could not update sport roles for {member.name} due to permission error.")
+            continue
+        updated += 1
+    return updated
+
+def format_roster_diff(diff, updated_members):
+    embed = discord.Embed(title="📋 Roster Reloaded", color=discord.Color.teal())
+    embed.add_field(name="Students", value=str(len(student_db)), inline=True)
+    embed.add_field(name="Added", value=str(len(diff['added'])), inline=True)
+    embed.add_field(name="Removed", value=str(len(diff['removed'])), inline=True)
+    embed.add_field(name="Sport Changes", value=f"{len(diff['sports_changed'])} students ({updated_members} verified members updated)", inline=False)
+
+    # Show a preview of the actual IDs (embed fields are limited to 1024 characters)
+    if diff['added']:
+        embed.add_field(name="New IDs", value=", ".join(diff['added'][:40])[:1024], inline=False)
+    if diff['removed']:
+        embed.add_field(name="Removed IDs", value=", ".join(diff['removed'][:40])[:1024], inline=False)
+    if diff['sports_changed']:
+        lines = [f"{sid}: {', '.join(sorted(old)) or 'None'} → {', '.join(sorted(new)) or 'None'}" for sid, (old, new) in list(diff['sports_changed'].items())[:15]]
+        embed.add_field(name="Sport Changes", value="\n".join(lines)[:1024], inline=False)
+    return embed
+
+class RosterShrinkError(Exception):
+    """The reloaded roster is empty or much smaller than the current one."""
+
+class RosterWatcher:
+    """
+    Reloads response.csv without restarting the bot.
+    The file is re-parsed on the I/O thread and the new student_db is swapped in
+    as a single assignment, so commands always see either the old or the new roster.
+    An empty or much smaller file (e.g. caught mid-write) is not swapped in; the
+    watcher retries once the file changes again, or a moderator can force it.
+    """
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self.signature = file_signature(path)
+        self.rejected = None  # signature of the last file refused by the shrink guard
+        self.lock = asyncio.Lock()
+        self.task = None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            signature = await io_executor.run(file_signature, self.path)
+            if not signature or signature in (self.signature, self.rejected):
+                continue
+            try:
+                embed = await self.reload()
+                for guild in bot.guilds:
+                    log_channel = guild_index.text_channel(guild, "mod-logs")
+                    if log_channel:
+                        await log_channel.send(content=f"`{self.path}` changed on disk.", embed=embed)
+            except RosterShrinkError as e:
+                self.rejected = signature
+                print(f"Warning: {e}")
+                for guild in bot.guilds:
+                    log_channel = guild_index.text_channel(guild, "mod-logs")
+                    if log_channel:
+                        await log_channel.send(f"⚠️ {e} Use `!reloadroster force` if this is intended.")
+            except Exception as e:
+                print(f"Error: Roster reload failed: {e}")
+
+    async def reload(self, force=False):
+        """
+        Parses the CSV in the background, swaps it in and fixes sport roles. Returns a summary embed.
+        Raises RosterShrinkError (keeping the current roster) if the new one is empty or
+        below ROSTER_MIN_KEEP of the current size, unless force is True.
+        """
+        global student_db, name_index
+        async with self.lock:
+            signature = await io_executor.run(file_signature, self.path)
+            new_db, new_index, source, seconds = await io_executor.run(load_roster_with_cache, self.path)
+            if not force and (not new_db or len(new_db) < len(student_db) * ROSTER_MIN_KEEP):
+                raise RosterShrinkError(f"`{self.path}` has {len(new_db)} students (currently {len(student_db)}); not reloading it.")
+            self.signature = signature
+            self.rejected = None
+            diff = diff_rosters(student_db, new_db)
+            student_db, name_index = new_db, new_index
+            record_roster_load(source, seconds)
+            metrics['roster_reloads'] += 1
+
+            updated = 0
+            for guild in bot.guilds:
+                updated += await apply_sport_changes(guild, diff['sports_changed'])
+
+            print(f"Roster reloaded: +{len(diff['added'])} -{len(diff['removed'])} ~{len(diff['sports_changed'])}")
+            return format_roster_diff(diff, updated)
+
+roster_watcher = RosterWatcher(STUDENT_FILE, ROSTER_POLL_INTERVAL)
+
+# --- ROSTER IMPORT ---
+STUDENT_ID_PATTERN = re.compile(r"^\d{4}-?\d{1,2}-?\d{5}$")  # e.g. 2025-2-00228 or 2022202851 (after normalize_student_id)
+IMPORT_BATCH_SIZE = 1000        # rows handed from the parser thread to the event loop at a time
+IMPORT_PROGRESS_INTERVAL = 2.0  # seconds between status message edits
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_MAX_PENDING = 4        # chunks queued on the I/O thread at once (backpressure)
+
+async def download_attachment(attachment, path):
+    """Streams an attachment to disk in chunks instead of holding it all in memory."""
+    f = await io_executor.run(open, path, "wb")
+    pending = collections.deque()
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(attachment.url) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    pending.append(io_executor.submit(f.write, chunk))  # Ordered by the I/O thread
+                    # Don't read faster than the disk writes (and don't starve persistence writes)
+                    if len(pending) >= DOWNLOAD_MAX_PENDING:
+                        await asyncio.wrap_future(pending.popleft())
+                while pending:
+                    await asyncio.wrap_future(pending.popleft())
+    finally:
+        await io_executor.run(f.close)
+
+def read_roster_header(path):
+    """Header row of a roster CSV (utf-8-sig accepts a BOM)."""
+    with open(path, mode='r', encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader(f), [])
+
+def append_roster_rows(path, rows):
+    """Appends imported (student_number, full_name, sport) rows to response.csv so they survive restarts."""
+    header = read_roster_header(path) if os.path.exists(path) else []
+    if 'Student Number' not in header or 'Full Name' not in header:
+        header = ['Full Name', 'Student Number', 'Column 7']
+        with open(path, mode='w', encoding='utf-8', newline='') as f:
+            csv.writer(f).writerow(header)
+
+    sport_col = next((header.index(c) for c in ('Column 7', 'Sport') if c in header), None)
+
+    # Don't glue the first new row onto a last line that has no trailing newline
+    needs_newline = False
+    with open(path, mode='rb') as f:
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) not in (b"\n", b"\r")
+
+    with open(path, mode='a', encoding='utf-8', newline='') as f:
+        if needs_newline:
+            f.write("\r\n")
+        writer = csv.writer(f)
+        for sid, name, sport in rows:
+            row = [''] * len(header)
+            row[header.index('Student Number')] = sid
+            row[header.index('Full Name')] = name
+            if sport_col is not None:
+                row[sport_col] = sport
+            writer.writerow(row)
+        f.flush()
+        os.fsync(f.fileno())
+
+async def import_roster_file(path, status_msg):
+    """
+    Parses a CSV on a worker thread and merges it into the live student_db batch
+    by batch. The parser blocks on a bounded queue, so a huge file never sits in
+    memory at once and the event loop only ever handles one small batch at a time.
+    """
+    global name_index
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=4)
+    stop = threading.Event()
+
+    def produce():
+        batch = []
+        try:
+            for row in iter_roster_rows(path):
+                if stop.is_set():
+                    return
+                batch.append(row)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+                    batch = []
+            if batch:
+                asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+        finally:
+            asyncio.run_coroutine_threadsafe(queue.put(None), loop).result()
+
+    producer = loop.run_in_executor(None, produce)
+
+    stats = {'rows': 0, 'added': 0, 'updated': 0, 'invalid': 0}
+    invalid_examples = []
+    sports_changed = {}
+    new_names = []
+
+    try:
+        await merge_import_batches(queue, status_msg, stats, invalid_examples, sports_changed, new_names)
+    finally:
+        # If merging failed, unblock the parser thread so it can exit
+        stop.set()
+        while not producer.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.01)
+
+    await producer  # Re-raises parser errors
+
+    # The live name index may be in use on the I/O thread (!scanclaims), so new
+    # students go into a copy that is swapped in, as RosterWatcher.reload does
+    if new_names:
+        name_index = await io_executor.run(name_index.extended, new_names)
+    return stats, invalid_examples, sports_changed
+
+async def merge_import_batches(queue, status_msg, stats, invalid_examples, sports_changed, new_names):
+    """
+    Event loop side of import_roster_file(): validates rows, merges them into
+    student_db and queues them for appending to response.csv. New students are
+    collected in new_names for the name index.
+    """
+    loop = asyncio.get_running_loop()
+    last_edit = loop.time()
+
+    while True:
+        batch = await queue.get()
+        if batch is None:
+            break
+        accepted = []
+        for sid, name, sport in batch:
+            stats['rows'] += 1
+            if not STUDENT_ID_PATTERN.match(sid):
+                stats['invalid'] += 1
+                if len(invalid_examples) < 5:
+                    invalid_examples.append(sid)
+                continue
 
-    await mod_channel.send(embed=embed)
+            existing = student_db.get(sid)
+            if existing is None:
+                student_db.add(sid, name, sport)
+                new_names.append((sid, name))
+                stats['added'] += 1
+            elif sport and sport not in existing['sports']:
+                student_db.add(sid, name, sport)
+                old_sports = sports_changed.get(sid, (existing['sports'],))[0]
+                sports_changed[sid] = (old_sports, student_db[sid]['sports'])
+                stats['updated'] += 1
+            else:
+                continue
+            accepted.append((sid, name, sport))
+
+        # Persist accepted rows so they survive restarts and hot reloads
+        if accepted:
+            io_executor.submit(append_roster_rows, STUDENT_FILE, accepted)
+
+        if loop.time() - last_edit >= IMPORT_PROGRESS_INTERVAL:
+            last_edit = loop.time()
+            await status_msg.edit(content=f"📥 **Importing roster...** {stats['rows']} rows read | {stats['added']} added | {stats['updated']} updated | {stats['invalid']} invalid")
+
+# --- BULK JOBS ---
+BULK_CONCURRENCY = 4          # Requests in flight per (guild, route) rate-limit bucket
+BULK_MAX_RETRIES = 3          # Retries for 429 / 5xx / network errors, with exponential backoff
+BULK_PROGRESS_INTERVAL = 5.0  # Seconds between status message updates
+BULK_CHECKPOINT_EVERY = 25    # Finished items between checkpoint saves
+
+class BulkScheduler:
+    """
+    Runs mass member jobs (syncsolo, scanteams, disband, fixunverified).
+    - Bounded concurrency per (guild, route) bucket, shared by every job in that guild,
+      so two jobs editing members do not double the request rate.
+    - Transient failures (429, 5xx, network) are retried with backoff.
+    - The status message is edited every BULK_PROGRESS_INTERVAL seconds.
+    - Progress is checkpointed via save_jobs(); unfinished jobs resume on startup.
+    Handlers must be idempotent: items after the last checkpoint may run twice.
+    """
+
+    def __init__(self):
+        self.jobs = {}      # job id -> checkpoint dict (persisted)
+        self.handlers = {}  # kind -> (handler, route, title)
+        self.finishers = {} # kind -> coroutine run once every item is done, before the checkpoint is dropped
+        self.buckets = {}   # (guild_id, route) -> Semaphore
+        self.running = set()
+        self.tasks = set()  # resumed job tasks, referenced so they are not garbage-collected
+
+    def register(self, kind, route, title):
+        def decorator(fn):
+            self.handlers[kind] = (fn, route, title)
+            return fn
+        return decorator
+
+    def on_finish(self, kind):
+        def decorator(fn):
+            self.finishers[kind] = fn
+            return fn
+        return decorator
+
+    def load(self):
+        self.jobs = load_jobs()
+        if self.jobs:
+            print(f"Found {len(self.jobs)} unfinished bulk job(s); they will resume when the bot is ready.")
+
+    def bucket(self, guild_id, route):
+        key = (guild_id, route)
+        if key not in self.buckets:
+            self.buckets[key] = asyncio.Semaphore(BULK_CONCURRENCY)
+        return self.buckets[key]
+
+    async def start(self, kind, guild, items, status_msg=None, params=None):
+        """Creates a job and runs it to completion. Returns the result counts."""
+        job_id = self.create(kind, guild, items, status_msg, params)
+        return await self.run(job_id, guild, status_msg)
+
+    def create(self, kind, guild, items, status_msg=None, params=None):
+        """Checkpoints a new job without running it (see run()). Returns the job ID."""
+        job_id = f"{kind}-{guild.id}-{int(time.time() * 1000)}"
+        self.jobs[job_id] = {
+            "kind": kind,
+            "guild_id": guild.id,
+            "channel_id": status_msg.channel.id if status_msg else None,
+            "message_id": status_msg.id if status_msg else None,
+            "items": [str(i) for i in items],
+            "cursor": 0,
+            "counts": {},
+            "params": params or {},
+            "started_at": datetime.datetime.now().isoformat()
+        }
+        save_jobs(self.jobs, [job_id])
+        return job_id
+
+    async def run(self, job_id, guild, status_msg=None):
+        job = self.jobs[job_id]
+        handler, route, title = self.handlers[job['kind']]
+        items = job['items']
+        bucket = self.bucket(guild.id, route)
+        counts = collections.Counter(job['counts'])
+        done = [False] * len(items)
+        state = {'next': job['cursor'], 'cursor': job['cursor'], 'saved': job['cursor'], 'progress_at': time.monotonic()}
+        prefetches = {}  # batch start -> task loading that slice of members (lazy/warm mode)
+        self.running.add(job_id)
+        metrics['bulk_jobs'] += 1
+
+        async def worker():
+            while state['next'] < len(items):
+                i = state['next']
+                state['next'] += 1
+                if route == "member" and not guild.chunked:
+                    # Members are loaded 100 at a time over the gateway instead of one fetch each
+                    start = i - i % MEMBER_QUERY_BATCH
+                    if start not in prefetches:
+                        prefetches[start] = asyncio.ensure_future(prefetch_members(guild, items[start:start + MEMBER_QUERY_BATCH]))
+                    await prefetches[start]
+                async with bucket:
+                    result = await self.attempt(handler, guild, items[i], job)
+                counts[result] += 1
+                metrics['bulk_items'] += 1
+                done[i] = True
+
+                # The checkpoint only moves past items that are all finished
+                while state['cursor'] < len(items) and done[state['cursor']]:
+                    state['cursor'] += 1
+                if state['cursor'] - state['saved'] >= BULK_CHECKPOINT_EVERY:
+                    state['saved'] = job['cursor'] = state['cursor']
+                    job['counts'] = dict(counts)
+                    save_jobs(self.jobs, [job_id])
+
+                if status_msg and time.monotonic() - state['progress_at'] >= BULK_PROGRESS_INTERVAL:
+                    state['progress_at'] = time.monotonic()
+                    try:
+                        await status_msg.edit(content=self.format_progress(title, state['cursor'], len(items), counts))
+                    except discord.HTTPException:
+                        pass # Progress is best-effort
+
+        try:
+            # A worker that dies must not abort the job while its siblings keep running
+            results = await asyncio.gather(*(worker() for _ in range(BULK_CONCURRENCY)), return_exceptions=True)
+        finally:
+            self.running.discard(job_id)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Error: Bulk {job['kind']} worker stopped: {result!r}")
+
+        # Final step of the job (e.g. deleting channels); a restart before this point runs it on resume
+        finish = self.finishers.get(job['kind'])
+        if finish:
+            try:
+                await finish(guild, job)
+            except Exception as e:
+                print(f"Error: Bulk {job['kind']} final step failed: {e!r}")
+
+        # Finished: drop the checkpoint
+        del self.jobs[job_id]
+        save_jobs(self.jobs, [job_id])
+        return counts
+
+    async def attempt(self, handler, guild, item, job):
+        for attempt in range(BULK_MAX_RETRIES + 1):
+            try:
+                return await handler(guild, item, job) or "skipped"
+            except discord.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    print(f"Warning: Bulk {job['kind']} failed for {item}: {e}")
+                    return "failed"
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            except Exception as e:
+                # Bugs/bad data fail this item only; the job (and its checkpoint) moves on
+                print(f"Error: Bulk {job['kind']} crashed on {item}: {e!r}")
+                return "failed"
+            if attempt < BULK_MAX_RETRIES:
+                metrics['bulk_retries'] += 1
+                await asyncio.sleep(2 ** attempt)
+        print(f"Warning: Bulk {job['kind']} gave up on {item} after {BULK_MAX_RETRIES} retries: {error}")
+        return "failed"
+
+    @staticmethod
+    def format_progress(title, finished, total, counts):
+        percent = finished * 100 // total if total else 100
+        details = ", ".join(f"{key}: {value}" for key, value in sorted(counts.items()))
+        return f"⏳ **{title}:** {finished}/{total} ({percent}%)\n{details}"
+
+    async def resume_all(self):
+        """Restarts checkpointed jobs after a restart (called from on_ready)."""
+        for job_id, job in list(self.jobs.items()):
+            if job_id in self.running or job['kind'] not in self.handlers:
+                continue
+            guild = bot.get_guild(job['guild_id'])
+            if not guild:
+                continue
+            channel = guild.get_channel(job['channel_id']) if job['channel_id'] else None
+            status_msg = channel.get_partial_message(job['message_id']) if channel else None
+            task = asyncio.create_task(self.resume(job_id, guild, status_msg))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def resume(self, job_id, guild, status_msg):
+        title = self.handlers[self.jobs[job_id]['kind']][2]
+        print(f"Resuming bulk job {job_id} at item {self.jobs[job_id]['cursor']}/{len(self.jobs[job_id]['items'])}")
+        counts = await self.run(job_id, guild, status_msg)
+        if status_msg:
+            details = ", ".join(f"{key}: {value}" for key, value in sorted(counts.items()))
+            try:
+                await status_msg.edit(content=f"✅ **{title} Complete!** (resumed after restart)\n{details}")
+            except discord.HTTPException:
+                pass
+
+bulk_scheduler = BulkScheduler()
+bulk_scheduler.load()
+
+@bulk_scheduler.register("syncsolo", route="member", title="Solo Sync")
+async def bulk_sync_solo(guild, user_id, job):
+    """Adds 'Solo' to verified members without a team and removes it from team members."""
+    member = await resolve_member(guild, user_id)
+    if not member or member.bot:
+        return "skipped"
+
+    # Skip Moderators and Unverified users (only manage Verified users)
+    mod_role = guild_index.role(guild, "Moderator")
+    verified_role = guild_index.role(guild, "Verified")
+    if mod_role and mod_role in member.roles:
+        return "skipped"
+    if verified_role and verified_role not in member.roles:
+        return "skipped"
+
+    has_team = user_id in team_store.member_index
+    update = MemberUpdate(member)
+    await update_solo_role(guild, member, has_team=has_team, update=update)
+    if not update.changed:
+        return "unchanged"
+    await update.apply(reason="!syncsolo")
+    return "removed" if has_team else "added"
+
+@bulk_scheduler.register("teamsolo", route="member", title="Team Solo Cleanup")
+async def bulk_remove_solo(guild, user_id, job):
+    """Ensures team members do not have the 'Solo' role (used by !scanteams)."""
+    member = await resolve_member(guild, user_id)
+    if not member:
+        return "skipped"
+    update = MemberUpdate(member)
+    await update_solo_role(guild, member, has_team=True, update=update)
+    if not update.changed:
+        return "unchanged"
+    await update.apply(reason="!scanteams")
+    return "updated"
+
+@bulk_scheduler.register("disband", route="member", title="Disband")
+async def bulk_disband_member(guild, user_id, job):
+    """Removes the team role and gives 'Solo' back."""
+    member = await resolve_member(guild, user_id)
+    if not member:
+        return "skipped"
+    update = MemberUpdate(member).remove(guild.get_role(job['params'].get('role_id')))
+    await update_solo_role(guild, member, has_team=False, update=update)
+    await update.apply(reason="!disband")
+    return "updated"
+
+@bulk_scheduler.on_finish("disband")
+async def bulk_disband_finish(guild, job):
+    """Deletes the team channels and role once every member is released."""
+    # A restart between the job checkpoint and the team deletion leaves the record behind.
+    # No transaction: !disband still holds this team's lock while its job runs (check + delete don't await).
+    team_name = job['params'].get('team_name')
+    team_data = team_store.get(team_name)
+    if team_data and team_data.get("role_id") == job['params'].get('role_id'):
+        team_store.delete(team_name)
+        await update_mod_dashboard(guild)
+    for channel_id in job['params'].get('channel_ids', []):
+        channel = guild.get_channel(channel_id)
+        if channel:
+            await channel.delete()
+    team_role = guild.get_role(job['params'].get('role_id'))
+    if team_role:
+        await team_role.delete()
+
+@bulk_scheduler.register("fixunverified", route="member", title="Unverified Fix")
+async def bulk_fix_unverified(guild, user_id, job):
+    """Verifies a team member who lacks the Verified role, via their claim or nickname."""
+    member = await resolve_member(guild, user_id)
+    verified_role = guild_index.role(guild, "Verified")
+    if not member or verified_role in member.roles:
+        return "skipped"
+
+    # Strategy 1: Check if they already have a claimed ID (maybe role was just removed)
+    student_id = None
+    claimed = claims.student_ids_of(user_id)
+    if claimed:
+        student_id = min(claimed)
+
+    # Strategy 2: Try to match Nickname to Database (accent/case-insensitive, fuzzy)
+    if not student_id:
+        status, sid, _ = name_index.resolve(member.display_name)
+        if status == 'match' and sid not in claims:
+            student_id = sid
+
+    if student_id:
+        moderator = await resolve_member(guild, job['params'].get('moderator_id') or guild.me.id) or guild.me
+        success, msg = await perform_verification(guild, member, student_id, moderator)
+        return "fixed" if success else "failed"
+
+    # Log ambiguity so Mod can fix manually
+    mod_log.log(guild, f"⚠️ **Auto-Fix Failed:** {member.mention} is in a team but unverified. Could not determine Student ID automatically.", urgent=True)
+    return "failed"
 
 # --- TEAM COMMANDS ---
 
-@bot.command()
+@bot.hybrid_command(description="Create a team with private channels and a role.")
+@commands.guild_only()
+@app_commands.describe(game="Valorant, MLBB or CODM", team_name="Name of your team")
 async def createteam(ctx, game: str = None, *, team_name: str = None):
     """Creates a team, private channels, and role. Usage: !createteam valorant "Team Name" """
+    await ctx.defer(ephemeral=True)
     
     if not team_creation_enabled:
         await ctx.send(f"🚫 {ctx.author.mention}, team creation is currently **PAUSED** by the moderators.", delete_after=10)
@@ -400,90 +3132,88 @@ async def createteam(ctx, game: str = None, *, team_name: str = None):
         return
 
     # 2. Check if User is Verified
-    verified_role = discord.utils.get(ctx.guild.roles, name="Verified")
+    verified_role = guild_index.role(ctx.guild, "Verified")
     if verified_role not in ctx.author.roles:
         await ctx.send("You must be Verified to create a team.", delete_after=5)
         return
 
-    # 3. Check Database (Is user already in a team? Is name taken?)
-    teams = load_teams()
-    
-    if team_name in teams:
-        await ctx.send(f"Team name **{team_name}** is already taken.", delete_after=5)
-        return
+    # Lock the team name and the author so a concurrent !createteam/!join cannot slip in
+    async with team_store.transaction(team=team_name, users=[ctx.author.id]):
+        # 3. Check Database (Is user already in a team? Is name taken?)
+        if team_name in team_store:
+            await ctx.send(f"Team name **{team_name}** is already taken.", delete_after=5)
+            return
 
-    user_id = str(ctx.author.id)
-    for t_name, t_data in teams.items():
-        if user_id in t_data['members']:
+        user_id = str(ctx.author.id)
+        t_name, _ = team_store.team_of(user_id)
+        if t_name:
             await ctx.send(f"You are already in a team ({t_name}). You cannot create another one.", delete_after=5)
             return
 
-    # 4. Create Discord Infrastructure
-    guild = ctx.guild
+        # 4. Create Discord Infrastructure
+        guild = ctx.guild
     
-    # Find Category
-    category = discord.utils.get(guild.categories, name=category_name)
-    if not category:
-        await ctx.send(f"Error: Category `{category_name}` not found. Please contact an admin.", delete_after=10)
-        return
-
-    # Create Role
-    team_role = await guild.create_role(name=team_name, mentionable=True)
-    await ctx.author.add_roles(team_role)
-
-    # Create Channels (Private)
-    overwrites = {
-        guild.default_role: discord.PermissionOverwrite(read_messages=False, connect=False),
-        team_role: discord.PermissionOverwrite(read_messages=True, connect=True),
-        guild.me: discord.PermissionOverwrite(read_messages=True, connect=True)
-    }
-
-    text_channel = await guild.create_text_channel(team_name.replace(" ", "-").lower(), category=category, overwrites=overwrites)
-    voice_channel = await guild.create_voice_channel(team_name, category=category, overwrites=overwrites)
-
-    # 5. Save to Database
-    teams[team_name] = {
-        "game": game.lower(),
-        "captain_id": user_id,
-        "members": [user_id],
-        "text_channel_id": text_channel.id,
-        "voice_channel_id": voice_channel.id,
-        "role_id": team_role.id,
-        "invites": [],
-        "created_at": datetime.datetime.now().isoformat()
-    }
-    save_teams(teams)
+        # Find Category
+        category = guild_index.category(guild, category_name)
+        if not category:
+            await ctx.send(f"Error: Category `{category_name}` not found. Please contact an admin.", delete_after=10)
+            return
 
-    # 6. Post Captain's Guide
-    embed = discord.Embed(title=f"👑 Welcome to {team_name}", description="You are the Captain! Here are your commands:", color=discord.Color.green())
-    embed.add_field(name="!invite <user> ", value="Invite a player to your team.", inline=False)
-    embed.add_field(name="!kick @user", value="Remove a player from your team.", inline=False)
-    embed.add_field(name="!disband", value="Delete this team permanently.", inline=False)
-    await text_channel.send(content=ctx.author.mention, embed=embed)
-    await text_channel.pin_message(await text_channel.fetch_message(text_channel.last_message_id))
+        # Create Role
+        team_role = await guild.create_role(name=team_name, mentionable=True)
+        update = MemberUpdate(ctx.author).add(team_role)
 
-    # 7. Update 'Solo' Status (User is now in a team)
-    # We keep 'Verified' role, but remove 'Solo' role
-    await update_solo_role(guild, ctx.author, has_team=True)
+        # Create Channels (Private)
+        overwrites = {
+            guild.default_role: discord.PermissionOverwrite(read_messages=False, connect=False),
+            team_role: discord.PermissionOverwrite(read_messages=True, connect=True),
+            guild.me: discord.PermissionOverwrite(read_messages=True, connect=True)
+        }
 
-    # 8. Update Dashboard
-    await update_mod_dashboard(guild)
+        text_channel = await guild.create_text_channel(team_name.replace(" ", "-").lower(), category=category, overwrites=overwrites)
+        voice_channel = await guild.create_voice_channel(team_name, category=category, overwrites=overwrites)
+
+        # 5. Save to Database
+        team_store.create(team_name, {
+            "game": game.lower(),
+            "captain_id": user_id,
+            "members": [user_id],
+            "text_channel_id": text_channel.id,
+            "voice_channel_id": voice_channel.id,
+            "role_id": team_role.id,
+            "invites": [],
+            "created_at": datetime.datetime.now().isoformat()
+        })
+
+        # 6. Post Captain's Guide
+        embed = discord.Embed(title=f"👑 Welcome to {team_name}", description="You are the Captain! Here are your commands:", color=discord.Color.green())
+        embed.add_field(name="!invite <user> ", value="Invite a player to your team.", inline=False)
+        embed.add_field(name="!kick @user", value="Remove a player from your team.", inline=False)
+        embed.add_field(name="!disband", value="Delete this team permanently.", inline=False)
+        await text_channel.send(content=ctx.author.mention, embed=embed)
+        await text_channel.pin_message(await text_channel.fetch_message(text_channel.last_message_id))
+
+        # 7. Update 'Solo' Status (User is now in a team)
+        # We keep 'Verified' role, but remove 'Solo' role (sent with the team role as one edit)
+        await update_solo_role(guild, ctx.author, has_team=True, update=update)
+        await update.apply()
+
+        # 8. Update Dashboard
+        await update_mod_dashboard(guild)
     
     await ctx.send(f"Team **{team_name}** created successfully! Check {text_channel.mention}.", delete_after=10)
 
 @bot.command()
 async def teamstats(ctx):
     """Shows statistics about teams and players."""
-    teams = load_teams()
-    
-    total_teams = len(teams)
+    total_teams = len(team_store)
     
     # Count players in teams
-    players_in_teams = sum(len(t['members']) for t in teams.values())
+    players_in_teams = team_store.member_count()
     
     # Count Solo players
-    solo_role = discord.utils.get(ctx.guild.roles, name="Solo")
-    solo_count = len(solo_role.members) if solo_role else 0
+    solo_role = guild_index.role(ctx.guild, "Solo")
+    solo_count = len(member_snapshot.role_member_ids(ctx.guild, solo_role)) if solo_role else 0
 
     embed = discord.Embed(title="📊 Tournament Statistics", color=discord.Color.blue())
     embed.add_field(name="Total Teams", value=str(total_teams), inline=True)
@@ -492,51 +3222,41 @@ async def teamstats(ctx):
     
     await ctx.send(embed=embed)
 
-@bot.command()
+@bot.hybrid_command(description="Invite a player to your team (Captain only).")
+@commands.guild_only()
+@app_commands.describe(member="The player to invite")
 async def invite(ctx, member: discord.Member):
     """Captain invites a player: !invite <User> !invite Paxton"""
-    # 1. Check if Author is a Captain
-    teams = load_teams()
-    my_team_name = None
-    my_team_data = None
-
-    for t_name, t_data in teams.items():
-        if t_data['captain_id'] == str(ctx.author.id):
-            my_team_name = t_name
-            my_team_data = t_data
-            break
+    await ctx.defer(ephemeral=True)
+    async with team_store.transaction(team=lambda: team_store.captain_index.get(str(ctx.author.id)), users=[ctx.author.id, member.id]):
+        # 1. Check if Author is a Captain
+        my_team_name, my_team_data = team_store.captained_by(ctx.author.id)
     
-    if not my_team_name:
-        await ctx.send(f"{ctx.author.mention}, you are not the captain of any team.", delete_after=5)
-        return
+        if not my_team_name:
+            await ctx.send(f"{ctx.author.mention}, you are not the captain of any team.", delete_after=5)
+            return
 
-    # 2. Validate the Target Member
-    if member.bot:
-        await ctx.send("You cannot invite bots.", delete_after=5)
-        return
+        # 2. Validate the Target Member
+        if member.bot:
+            await ctx.send("You cannot invite bots.", delete_after=5)
+            return
     
-    verified_role = discord.utils.get(ctx.guild.roles, name="Verified")
-    if verified_role not in member.roles:
-        await ctx.send(f"{member.display_name} is not Verified yet.", delete_after=5)
-        return
+        verified_role = guild_index.role(ctx.guild, "Verified")
+        if verified_role not in member.roles:
+            await ctx.send(f"{member.display_name} is not Verified yet.", delete_after=5)
+            return
 
-    # Check if they are already in a team
-    for t_data in teams.values():
-        if str(member.id) in t_data['members']:
+        # Check if they are already in a team
+        if str(member.id) in team_store.member_index:
             await ctx.send(f"{member.display_name} is already in a team.", delete_after=5)
             return
 
-    # 3. Add to Invites List
-    # Initialize list if it doesn't exist (for older teams)
-    if "invites" not in my_team_data:
-        my_team_data["invites"] = []
-
-    if str(member.id) in my_team_data["invites"]:
-        await ctx.send(f"{member.display_name} is already invited.", delete_after=5)
-        return
+        # 3. Add to Invites List
+        if str(member.id) in my_team_data.get("invites", []):
+            await ctx.send(f"{member.display_name} is already invited.", delete_after=5)
+            return
 
-    my_team_data["invites"].append(str(member.id))
-    save_teams(teams)
+        team_store.add_invite(my_team_name, str(member.id))
 
     # 4. Notify the User
     try:
@@ -545,175 +3265,164 @@ async def invite(ctx, member: discord.Member):
     except discord.Forbidden:
         await ctx.send(f"I couldn't DM {member.display_name}, but they can still join by typing `!join \"{my_team_name}\"`.", delete_after=10)
 
-@bot.command()
+@bot.hybrid_command(description="Join a team you have been invited to.")
+@commands.guild_only()
+@app_commands.describe(team_name="Exact team name (case-sensitive)")
 async def join(ctx, *, team_name: str):
     """Accept an invite: !join "Team Name" """
-    teams = load_teams()
-    
+    await ctx.defer(ephemeral=True)
     # Clean quotes from input so !join "CCS" works for team CCS
     team_name = team_name.strip('"')
     
-    # 1. Check if Team Exists
-    if team_name not in teams:
-        await ctx.send(f"Team **{team_name}** does not exist. Check spelling (case-sensitive).", delete_after=5)
-        return
+    async with team_store.transaction(team=team_name, users=[ctx.author.id]):
+        # 1. Check if Team Exists
+        if team_name not in team_store:
+            await ctx.send(f"Team **{team_name}** does not exist. Check spelling (case-sensitive).", delete_after=5)
+            return
 
-    team_data = teams[team_name]
-    user_id = str(ctx.author.id)
+        team_data = team_store.get(team_name)
+        user_id = str(ctx.author.id)
 
-    # 2. Check if User was Invited
-    # (Handle case where 'invites' key might be missing in old data)
-    invites = team_data.get("invites", [])
+        # 2. Check if User was Invited
+        # (Handle case where 'invites' key might be missing in old data)
+        invites = team_data.get("invites", [])
     
-    if user_id not in invites:
-        await ctx.send(f"{ctx.author.mention}, you have not been invited to **{team_name}**. Ask the captain to `!invite` you.", delete_after=5)
-        return
+        if user_id not in invites:
+            await ctx.send(f"{ctx.author.mention}, you have not been invited to **{team_name}**. Ask the captain to `!invite` you.", delete_after=5)
+            return
 
-    # 3. Double Check: Is user already in a team?
-    for t_name, t_data in teams.items():
-        if user_id in t_data['members']:
+        # 3. Double Check: Is user already in a team?
+        t_name, _ = team_store.team_of(user_id)
+        if t_name:
             await ctx.send(f"You are already in **{t_name}**. You must leave it first.", delete_after=5)
             return
 
-    # 4. Process Joining
-    # Update Database
-    team_data["members"].append(user_id)
-    team_data["invites"].remove(user_id) # Remove from invite list
-    save_teams(teams)
+        # 4. Process Joining
+        # Update Database (also removes the user from the invite list)
+        team_store.add_member(team_name, user_id, from_invite=True)
 
-    # Update Discord Role
-    role_id = team_data.get("role_id")
-    if role_id:
-        role = ctx.guild.get_role(role_id)
-        if role:
-            await ctx.author.add_roles(role)
+        # Update Discord Role (applied together with the Solo change below)
+        update = MemberUpdate(ctx.author)
+        role_id = team_data.get("role_id")
+        if role_id:
+            update.add(ctx.guild.get_role(role_id))
 
-    # Update Channel Permissions (Text & Voice)
-    # We need to explicitly let them see the channel
-    text_channel = ctx.guild.get_channel(team_data["text_channel_id"])
-    voice_channel = ctx.guild.get_channel(team_data["voice_channel_id"])
+        # Update Channel Permissions (Text & Voice)
+        # We need to explicitly let them see the channel
+        text_channel = ctx.guild.get_channel(team_data["text_channel_id"])
+        voice_channel = ctx.guild.get_channel(team_data["voice_channel_id"])
 
-    overwrite = discord.PermissionOverwrite(read_messages=True, connect=True)
+        overwrite = discord.PermissionOverwrite(read_messages=True, connect=True)
     
-    if text_channel:
-        await text_channel.set_permissions(ctx.author, overwrite=overwrite)
-        await text_channel.send(f"👋 Welcome {ctx.author.mention} to the team!")
+        if text_channel:
+            await text_channel.set_permissions(ctx.author, overwrite=overwrite)
+            await text_channel.send(f"👋 Welcome {ctx.author.mention} to the team!")
     
-    if voice_channel:
-        await voice_channel.set_permissions(ctx.author, overwrite=overwrite)
+        if voice_channel:
+            await voice_channel.set_permissions(ctx.author, overwrite=overwrite)
 
-    # Update Solo Status
-    await update_solo_role(ctx.guild, ctx.author, has_team=True)
+        # Update Solo Status
+        await update_solo_role(ctx.guild, ctx.author, has_team=True, update=update)
+        await update.apply()
 
-    # Update Dashboard
-    await update_mod_dashboard(ctx.guild)
+        # Update Dashboard
+        await update_mod_dashboard(ctx.guild)
     
     await ctx.send(f"Successfully joined **{team_name}**!", delete_after=5)
 
-@bot.command()
+@bot.hybrid_command(description="Remove a player from your team (Captain only).")
+@commands.guild_only()
+@app_commands.describe(member="The player to remove")
 async def kick(ctx, member: discord.Member):
     """Captain removes a player: !kick @User"""
-    # 1. Check if Author is a Captain
-    teams = load_teams()
-    my_team_name = None
-    my_team_data = None
-
-    for t_name, t_data in teams.items():
-        if t_data['captain_id'] == str(ctx.author.id):
-            my_team_name = t_name
-            my_team_data = t_data
-            break
+    await ctx.defer(ephemeral=True)
+    async with team_store.transaction(team=lambda: team_store.captain_index.get(str(ctx.author.id)), users=[ctx.author.id, member.id]):
+        # 1. Check if Author is a Captain
+        my_team_name, my_team_data = team_store.captained_by(ctx.author.id)
     
-    if not my_team_name:
-        await ctx.send(f"{ctx.author.mention}, you are not the captain of any team.", delete_after=5)
-        return
+        if not my_team_name:
+            await ctx.send(f"{ctx.author.mention}, you are not the captain of any team.", delete_after=5)
+            return
 
-    # 2. Validate Target
-    if member.id == ctx.author.id:
-        await ctx.send("You cannot kick yourself. Use `!disband` to delete the team.", delete_after=5)
-        return
+        # 2. Validate Target
+        if member.id == ctx.author.id:
+            await ctx.send("You cannot kick yourself. Use `!disband` to delete the team.", delete_after=5)
+            return
     
-    user_id = str(member.id)
-    if user_id not in my_team_data['members']:
-        await ctx.send(f"{member.display_name} is not in your team.", delete_after=5)
-        return
+        user_id = str(member.id)
+        if user_id not in my_team_data['members']:
+            await ctx.send(f"{member.display_name} is not in your team.", delete_after=5)
+            return
 
-    # 3. Update Database
-    my_team_data['members'].remove(user_id)
-    save_teams(teams)
+        # 3. Update Database
+        team_store.remove_member(my_team_name, user_id)
 
-    # 4. Remove Discord Role
-    role_id = my_team_data.get("role_id")
-    if role_id:
-        role = ctx.guild.get_role(role_id)
-        if role and role in member.roles:
-            await member.remove_roles(role)
+        # 4. Remove Discord Role (applied together with the Solo change below)
+        update = MemberUpdate(member)
+        role_id = my_team_data.get("role_id")
+        if role_id:
+            update.remove(ctx.guild.get_role(role_id))
 
-    # 5. Remove Channel Permissions (Lock them out)
-    text_channel = ctx.guild.get_channel(my_team_data["text_channel_id"])
-    voice_channel = ctx.guild.get_channel(my_team_data["voice_channel_id"])
+        # 5. Remove Channel Permissions (Lock them out)
+        text_channel = ctx.guild.get_channel(my_team_data["text_channel_id"])
+        voice_channel = ctx.guild.get_channel(my_team_data["voice_channel_id"])
 
-    # overwrite=None removes the specific permission override for this user
-    if text_channel:
-        await text_channel.set_permissions(member, overwrite=None)
-    if voice_channel:
-        await voice_channel.set_permissions(member, overwrite=None)
+        # overwrite=None removes the specific permission override for this user
+        if text_channel:
+            await text_channel.set_permissions(member, overwrite=None)
+        if voice_channel:
+            await voice_channel.set_permissions(member, overwrite=None)
 
-    # 6. Update Solo Status (User is now a Free Agent)
-    await update_solo_role(ctx.guild, member, has_team=False)
+        # 6. Update Solo Status (User is now a Free Agent)
+        await update_solo_role(ctx.guild, member, has_team=False, update=update)
+        await update.apply()
 
-    # 7. Update Dashboard
-    await update_mod_dashboard(ctx.guild)
+        # 7. Update Dashboard
+        await update_mod_dashboard(ctx.guild)
 
     await ctx.send(f"🚫 **{member.display_name}** has been kicked from **{my_team_name}**.")
 
-@bot.command()
+@bot.hybrid_command(description="Leave your current team.")
+@commands.guild_only()
 async def leave(ctx):
     """Player leaves their current team."""
-    teams = load_teams()
+    await ctx.defer(ephemeral=True)
     user_id = str(ctx.author.id)
     
-    my_team_name = None
-    my_team_data = None
-    
-    for t_name, t_data in teams.items():
-        if user_id in t_data['members']:
-            my_team_name = t_name
-            my_team_data = t_data
-            break
+    async with team_store.transaction(team=lambda: team_store.member_index.get(user_id), users=[user_id]):
+        my_team_name, my_team_data = team_store.team_of(user_id)
             
-    if not my_team_name:
-        await ctx.send("You are not in a team.", delete_after=5)
-        return
+        if not my_team_name:
+            await ctx.send("You are not in a team.", delete_after=5)
+            return
         
-    # Check if Captain
-    if my_team_data['captain_id'] == user_id:
-        await ctx.send("The Captain cannot leave. Use `!disband` to delete the team.", delete_after=10)
-        return
+        # Check if Captain
+        if my_team_data['captain_id'] == user_id:
+            await ctx.send("The Captain cannot leave. Use `!disband` to delete the team.", delete_after=10)
+            return
         
-    # 1. Update Database
-    my_team_data['members'].remove(user_id)
-    save_teams(teams)
-    
-    # 2. Remove Discord Role
-    role_id = my_team_data.get("role_id")
-    if role_id:
-        role = ctx.guild.get_role(role_id)
-        if role:
-            await ctx.author.remove_roles(role)
+        # 1. Update Database
+        team_store.remove_member(my_team_name, user_id)
+    
+        # 2. Remove Discord Role (applied together with the Solo change below)
+        update = MemberUpdate(ctx.author)
+        role_id = my_team_data.get("role_id")
+        if role_id:
+            update.remove(ctx.guild.get_role(role_id))
             
-    # 3. Remove Channel Permissions
-    text_channel = ctx.guild.get_channel(my_team_data['text_channel_id'])
-    voice_channel = ctx.guild.get_channel(my_team_data['voice_channel_id'])
+        # 3. Remove Channel Permissions
+        text_channel = ctx.guild.get_channel(my_team_data['text_channel_id'])
+        voice_channel = ctx.guild.get_channel(my_team_data['voice_channel_id'])
     
-    if text_channel: await text_channel.set_permissions(ctx.author, overwrite=None)
-    if voice_channel: await voice_channel.set_permissions(ctx.author, overwrite=None)
+        if text_channel: await text_channel.set_permissions(ctx.author, overwrite=None)
+        if voice_channel: await voice_channel.set_permissions(ctx.author, overwrite=None)
     
-    # 4. Update Solo Status
-    await update_solo_role(ctx.guild, ctx.author, has_team=False)
+        # 4. Update Solo Status
+        await update_solo_role(ctx.guild, ctx.author, has_team=False, update=update)
+        await update.apply()
     
-    # 5. Update Dashboard
-    await update_mod_dashboard(ctx.guild)
+        # 5. Update Dashboard
+        await update_mod_dashboard(ctx.guild)
     
     # Notify
     if text_channel:
@@ -723,46 +3432,33 @@ async def leave(ctx):
 @bot.command()
 async def disband(ctx):
     """Captain deletes the team entirely."""
-    teams = load_teams()
-    
-    # Identify team
-    my_team_name = None
-    my_team_data = None
-    for t_name, t_data in teams.items():
-        if t_data['captain_id'] == str(ctx.author.id):
-            my_team_name = t_name
-            my_team_data = t_data
-            break
-            
-    if not my_team_name:
-        await ctx.send("You are not the captain of any team.", delete_after=5)
-        return
-
-    guild = ctx.guild
-    
-    # 1. Cleanup Members (Remove Roles & Give Solo back)
-    role_id = my_team_data.get("role_id")
-    team_role = guild.get_role(role_id)
-    
-    for member_id in my_team_data['members']:
-        member = guild.get_member(int(member_id))
-        if member:
-            if team_role and team_role in member.roles:
-                await member.remove_roles(team_role)
-            await update_solo_role(guild, member, has_team=False)
+    async with team_store.transaction(team=lambda: team_store.captain_index.get(str(ctx.author.id)), users=[ctx.author.id]):
+        # Identify team
+        my_team_name, my_team_data = team_store.captained_by(ctx.author.id)
             
-    # 2. Delete Channels & Role
-    tc = guild.get_channel(my_team_data['text_channel_id'])
-    vc = guild.get_channel(my_team_data['voice_channel_id'])
-    
-    if tc: await tc.delete()
-    if vc: await vc.delete()
-    if team_role: await team_role.delete()
-    
-    # 3. Delete from DB & Update Dashboard
-    del teams[my_team_name]
-    save_teams(teams)
-    await update_mod_dashboard(guild)
+        if not my_team_name:
+            await ctx.send("You are not the captain of any team.", delete_after=5)
+            return
+
+        guild = ctx.guild
+
+        # 1. Checkpoint the job before touching anything: Cleanup Members (Remove Roles & Give Solo back),
+        # then Delete Channels & Role (bulk_disband_member / bulk_disband_finish). It resumes after a restart.
+        params = {
+            "team_name": my_team_name,
+            "role_id": my_team_data.get("role_id"),
+            "channel_ids": [my_team_data['text_channel_id'], my_team_data['voice_channel_id']]
+        }
+        job_id = bulk_scheduler.create("disband", guild, my_team_data['members'], params=params)
+        persistence.flush("jobs")
+
+        # 2. Delete from DB (written after the checkpoint; no await in between)
+        team_store.delete(my_team_name)
+        persistence.flush("teams")
+
+        # 3. Run the job & Update Dashboard
+        await update_mod_dashboard(guild)
+        await bulk_scheduler.run(job_id, guild)
 
 @bot.command()
 async def syncsolo(ctx):
@@ -774,51 +3470,17 @@ async def syncsolo(ctx):
 
     status_msg = await ctx.send("🔄 Syncing Solo roles... This might take a moment.")
     
-    teams = load_teams()
-    # Create a set of all user IDs currently in a team
-    team_member_ids = set()
-    for t_data in teams.values():
-        for member_id in t_data.get('members', []):
-            team_member_ids.add(str(member_id))
-            
-    solo_role = discord.utils.get(ctx.guild.roles, name="Solo")
-    mod_role = discord.utils.get(ctx.guild.roles, name="Moderator")
-    verified_role = discord.utils.get(ctx.guild.roles, name="Verified")
-    
-    if not solo_role:
+    if not guild_index.role(ctx.guild, "Solo"):
         await ctx.send("Error: 'Solo' role not found.", delete_after=5)
         return
 
-    added_count = 0
-    removed_count = 0
-    
-    for member in ctx.guild.members:
-        # Skip Bots
-        if member.bot:
-            continue
-            
-        # Skip Moderators
-        if mod_role and mod_role in member.roles:
-            continue
-            
-        # Skip Unverified (Safety check: only manage Verified users)
-        if verified_role and verified_role not in member.roles:
-            continue
-
-        user_id = str(member.id)
-
-        if user_id not in team_member_ids:
-            # User has NO team -> Add Solo
-            if solo_role not in member.roles:
-                await member.add_roles(solo_role)
-                added_count += 1
-        else:
-            # User HAS team -> Remove Solo (Cleanup)
-            if solo_role in member.roles:
-                await member.remove_roles(solo_role)
-                removed_count += 1
+    # Bots, Moderators and Unverified users are skipped by the job handler
+    member_ids = member_snapshot.member_ids(ctx.guild)
+    counts = await bulk_scheduler.start("syncsolo", ctx.guild, member_ids, status_msg)
+    added_count = counts['added']
+    removed_count = counts['removed']
 
-    await status_msg.edit(content=f"✅ **Sync Complete!**\nAdded @Solo to: {added_count}\nRemoved @Solo from: {removed_count}")
+    await status_msg.edit(content=f"✅ **Sync Complete!**\nAdded @Solo to: {added_count}\nRemoved @Solo from: {removed_count}\nFailed: {counts['failed']}")
 
 @bot.command()
 async def setteam(ctx, member: discord.Member, *, team_name: str):
@@ -828,56 +3490,54 @@ async def setteam(ctx, member: discord.Member, *, team_name: str):
         await ctx.send("You need the **Moderator** role to use this command.", delete_after=5)
         return
 
-    teams = load_teams()
-
     # Clean quotes from team name (e.g., "CCS" -> CCS)
     team_name = team_name.strip('"')
 
-    # 1. Check if Team Exists
-    if team_name not in teams:
-        await ctx.send(f"Team **{team_name}** does not exist. Check spelling (case-sensitive).", delete_after=5)
-        return
+    async with team_store.transaction(team=team_name, users=[member.id]):
+        # 1. Check if Team Exists
+        if team_name not in team_store:
+            await ctx.send(f"Team **{team_name}** does not exist. Check spelling (case-sensitive).", delete_after=5)
+            return
 
-    team_data = teams[team_name]
-    user_id = str(member.id)
+        team_data = team_store.get(team_name)
+        user_id = str(member.id)
 
-    # 2. Check if User is already in a team
-    for t_name, t_data in teams.items():
-        if user_id in t_data['members']:
+        # 2. Check if User is already in a team
+        t_name, _ = team_store.team_of(user_id)
+        if t_name:
             await ctx.send(f"{member.display_name} is already in **{t_name}**. Remove them first.", delete_after=5)
             return
 
-    # 3. Process Joining
-    # Update Database
-    team_data["members"].append(user_id)
-    save_teams(teams)
+        # 3. Process Joining
+        # Update Database
+        team_store.add_member(team_name, user_id)
 
-    # Update Discord Role
-    role_id = team_data.get("role_id")
-    if role_id:
-        role = ctx.guild.get_role(role_id)
-        if role:
-            await member.add_roles(role)
+        # Update Discord Role (applied together with the Solo change below)
+        update = MemberUpdate(member)
+        role_id = team_data.get("role_id")
+        if role_id:
+            update.add(ctx.guild.get_role(role_id))
 
-    # Update Channel Permissions (Text & Voice)
-    # We need to explicitly let them see the channel
-    text_channel = ctx.guild.get_channel(team_data["text_channel_id"])
-    voice_channel = ctx.guild.get_channel(team_data["voice_channel_id"])
+        # Update Channel Permissions (Text & Voice)
+        # We need to explicitly let them see the channel
+        text_channel = ctx.guild.get_channel(team_data["text_channel_id"])
+        voice_channel = ctx.guild.get_channel(team_data["voice_channel_id"])
 
-    overwrite = discord.PermissionOverwrite(read_messages=True, connect=True)
+        overwrite = discord.PermissionOverwrite(read_messages=True, connect=True)
 
-    if text_channel:
-        await text_channel.set_permissions(member, overwrite=overwrite)
-        await text_channel.send(f"👋 Moderator has added {member.mention} to the team!")
+        if text_channel:
+            await text_channel.set_permissions(member, overwrite=overwrite)
+            await text_channel.send(f"👋 Moderator has added {member.mention} to the team!")
 
-    if voice_channel:
-        await voice_channel.set_permissions(member, overwrite=overwrite)
+        if voice_channel:
+            await voice_channel.set_permissions(member, overwrite=overwrite)
 
-    # Update Solo Status
-    await update_solo_role(ctx.guild, member, has_team=True)
+        # Update Solo Status
+        await update_solo_role(ctx.guild, member, has_team=True, update=update)
+        await update.apply()
 
-    # Update Dashboard
-    await update_mod_dashboard(ctx.guild)
+        # Update Dashboard
+        await update_mod_dashboard(ctx.guild)
     await ctx.send(f"✅ Moderator has added **{member.display_name}** to **{team_name}**!", delete_after=5)
 
 @bot.command()
@@ -904,13 +3564,14 @@ async def backup(ctx):
         await ctx.send("You need the **Moderator** role to use this command.", delete_after=5)
         return
 
-    files_to_send = []
-    if os.path.exists(TEAMS_FILE):
-        files_to_send.append(discord.File(TEAMS_FILE))
-    if os.path.exists(CLAIMED_FILE):
-        files_to_send.append(discord.File(CLAIMED_FILE))
-    if os.path.exists(BRACKETS_FILE):
-        files_to_send.append(discord.File(BRACKETS_FILE))
+    await persistence.drain()
+
+    # SQLite backend: refresh the JSON snapshots so the backup format stays the same
+    if db:
+        await io_executor.run(db.export_json)
+
+    backup_files = await io_executor.run(read_files, [TEAMS_FILE, CLAIMED_FILE, BRACKETS_FILE])
+    files_to_send = [discord.File(io.BytesIO(content), filename=name) for name, content in backup_files]
 
     if not files_to_send:
         await ctx.send("No database files found on the server.")
@@ -930,18 +3591,34 @@ async def restore(ctx):
         return
 
     attachment = ctx.message.attachments[0]
+
+    # Write out pending changes first so they cannot overwrite the restored file
+    await persistence.drain()
+
+    target_files = {"teams.json": TEAMS_FILE, "claimed_ids.json": CLAIMED_FILE, "brackets.json": BRACKETS_FILE}
+    restored = None
+    if attachment.filename in target_files:
+        content = await attachment.read()
+        path = target_files[attachment.filename]
+        await io_executor.run(write_file_atomic, path, content)
+        restored = await io_executor.run(read_json_file, path)
     
     if attachment.filename == "teams.json":
-        await attachment.save(TEAMS_FILE)
+        # replace_all() also writes the restored data into the SQLite backend
+        team_store.replace_all(restored)
         await update_mod_dashboard(ctx.guild)
         await ctx.send(f"✅ **Success!** `teams.json` has been restored. Teams are updated.")
     elif attachment.filename == "claimed_ids.json":
-        await attachment.save(CLAIMED_FILE)
-        global claimed_ids
-        claimed_ids = load_claimed_ids()
+        claims.replace_all(restored)
+        duplicates = report_duplicate_claims()
         await ctx.send(f"✅ **Success!** `claimed_ids.json` has been restored. Verified users updated.")
+        if duplicates:
+            await ctx.send(f"⚠️ {len(duplicates)} user(s) hold more than one student ID. Check the console log for details.")
     elif attachment.filename == "brackets.json":
-        await attachment.save(BRACKETS_FILE)
+        global tournament_brackets
+        tournament_brackets = restored
+        if db:
+            save_brackets(tournament_brackets)
         await ctx.send(f"✅ **Success!** `brackets.json` has been restored.")
     else:
         await ctx.send("❌ **Error:** Unknown file. Please upload `teams.json`, `claimed_ids.json`, or `brackets.json`.", delete_after=5)
@@ -968,12 +3645,11 @@ async def scanteams(ctx):
         "codm-team": "codm"
     }
 
-    log_channel = discord.utils.get(guild.text_channels, name="mod-logs")
     restored_count = 0
 
     for cat_name in TARGET_CATEGORIES:
         # Find the category object (case-insensitive)
-        category = discord.utils.find(lambda c: c.name.lower() == cat_name, guild.categories)
+        category = guild_index.category(guild, cat_name, ignore_case=True)
         if not category:
             continue
 
@@ -987,21 +3663,13 @@ async def scanteams(ctx):
 
             # 1. Find the Role matching the channel name
             # Logic: Channel "team-alpha" matches Role "Team Alpha"
-            found_role = None
-            for role in guild.roles:
-                if role.name.replace(" ", "-").lower() == channel.name:
-                    found_role = role
-                    break
+            found_role = guild_index.role_by_slug(guild, channel.name)
             
             if not found_role:
                 continue
 
             # 2. Find Members
-            member_ids = []
-            for m in found_role.members:
-                member_ids.append(str(m.id))
-                # Ensure team members do not have the Solo role
-                await update_solo_role(guild, m, has_team=True)
+            member_ids = [str(uid) for uid in member_snapshot.role_member_ids(guild, found_role)]
 
             # 3. Find Captain (First message mention)
             captain_id = None
@@ -1043,49 +3711,401 @@ async def scanteams(ctx):
             restored_count += 1
             
             # Log to mod-logs
-            if log_channel:
-                captain_user = guild.get_member(int(captain_id))
-                cap_name = captain_user.display_name if captain_user else "Unknown"
-                await log_channel.send(f"♻️ **System restored.** {captain_user.mention if captain_user else cap_name} is now Captain in team **{team_name}**.")
+            captain_user = guild.get_member(int(captain_id))
+            cap_name = captain_user.display_name if captain_user else "Unknown"
+            mod_log.log(guild, f"♻️ **System restored.** {captain_user.mention if captain_user else cap_name} is now Captain in team **{team_name}**.")
 
-    save_teams(teams)
+    team_store.replace_all(teams)
     await update_mod_dashboard(guild)
+
+    # Ensure team members do not have the Solo role
+    await bulk_scheduler.start("teamsolo", guild, list(team_store.member_index), status_msg)
     await status_msg.edit(content=f"✅ **Scan Complete!** Restored {restored_count} teams.")
 
-@bot.command()
-async def createbracket(ctx, game: str = None):
-    """(Moderator Only) Generates a Single Elimination bracket for a specific game."""
-    if "Moderator" not in [r.name for r in ctx.author.roles]:
-        await ctx.send("You need the **Moderator** role to use this command.", delete_after=5)
-        return
+# --- TEMPLATES ---
+TEMPLATE_DIR = "."
+TEMPLATE_CACHE_DIR = ".template_cache" # Compiled template bytecode, reused across restarts
+TEMPLATES = ["bracket_template.html"] # Compiled at startup
 
-    if not game:
-        await ctx.send("Usage: `!createbracket <game>` (e.g., valorant)", delete_after=5)
-        return
+def create_template_env():
+    """
+    Shared Jinja2 environment for all bot templates. Compiled templates stay
+    in memory and are only re-checked against the file's mtime (auto_reload).
+    The bytecode cache on disk lets a restart skip the parse/compile step.
+    """
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        auto_reload=True,
+        bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR),
+    )
 
-    game_key = game.lower()
-    teams_db = load_teams()
-    
-    # 1. Fetch Teams for this Game
-    participating_teams = [name for name, data in teams_db.items() if data['game'] == game_key]
-    
-    if len(participating_teams) < 2:
-        await ctx.send(f"❌ Not enough teams to create a bracket for **{game}**. Need at least 2.", delete_after=5)
-        return
+def preload_templates(env, names):
+    """Compiles the known templates up front so no command pays for it."""
+    start = time.perf_counter()
+    for name in names:
+        try:
+            env.get_template(name)
+        except TemplateNotFound:
+            print(f"Warning: Template '{name}' not found.")
+    metrics['template_load_ms'] = round((time.perf_counter() - start) * 1000, 1)
 
-    status_msg = await ctx.send(f"🎲 **Generating Bracket for {len(participating_teams)} teams...**")
+template_env = None
+if HAS_VISUALS:
+    template_env = create_template_env()
+    preload_templates(template_env, TEMPLATES)
 
-    # 2. Shuffle Seeds
-    random.shuffle(participating_teams)
+# --- BRACKET RENDERING ---
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(min(os.cpu_count() or 1, 4))))
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", "120"))  # seconds before a stuck render is killed
+
+RENDER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bracket_render.py")
+
+class RenderPool:
+    """
+    Runs CPU-heavy rasterization (WeasyPrint, cairosvg) outside the bot
+    process, so it never blocks the event loop (or holds the GIL). Each
+    render is its own fresh interpreter running bracket_render.py: nothing is
+    forked from this multithreaded process, and a render that exceeds the
+    timeout is killed without affecting the others. Up to RENDER_WORKERS
+    renders run in parallel; further requests wait in line.
+    """
+
+    def __init__(self, workers, timeout):
+        self.workers = workers
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(workers)
+        self.waiting = 0
+        self.running = set()
+
+    async def run(self, kind, source, img_filename):
+        """Rasterizes an 'html' or 'svg' document into img_filename."""
+        self.waiting += 1
+        metrics['render_queue_peak'] = max(metrics['render_queue_peak'], self.waiting)
+        async with self.slots:
+            self.waiting -= 1
+            started = time.perf_counter()
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, RENDER_SCRIPT, kind, img_filename,
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+            )
+            self.running.add(process)
+            try:
+                _, stderr = await asyncio.wait_for(process.communicate(source.encode("utf-8")), self.timeout)
+            except BaseException as e:
+                # Timeout or cancellation: stop this render only
+                with contextlib.suppress(ProcessLookupError):
+                    process.kill()
+                if isinstance(e, asyncio.TimeoutError):
+                    metrics['render_timeouts'] += 1
+                    raise TimeoutError(f"rendering took longer than {self.timeout:.0f}s and was stopped") from None
+                raise
+            finally:
+                self.running.discard(process)
+
+            if process.returncode != 0:
+                lines = stderr.decode("utf-8", errors="replace").strip().splitlines()
+                raise RuntimeError(lines[-1] if lines else f"render process exited with code {process.returncode}")
+            metrics['renders'] += 1
+            metrics['render_last_ms'] = round((time.perf_counter() - started) * 1000)
+
+    def shutdown(self):
+        for process in list(self.running):
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+
+render_pool = RenderPool(RENDER_WORKERS, RENDER_TIMEOUT)
+
+def bracket_rounds(matches):
+    """Groups a bracket's matches by round for the template."""
+    rounds_data = {}
+    for m in matches.values():
+        rounds_data.setdefault(m['round'], []).append(m)
+    return rounds_data
+
+def write_bracket_html(html_filename, game_name, rounds_data):
+    """Renders the bracket template into html_filename. Returns the HTML."""
+    template = template_env.get_template("bracket_template.html") # Compiled once, reloaded only if the file changes
+    html_content = template.render(game_name=game_name, rounds=rounds_data)
     
-    # 3. Calculate Bracket Size (Next Power of 2)
+    # Save HTML file
+    with open(html_filename, "w") as f:
+        f.write(html_content)
+    return html_content
+
+async def render_bracket_files(html_filename, img_filename, game_name, rounds_data):
+    """Renders a bracket to html_filename (I/O thread) and img_filename (render process). Returns the error, if any."""
+    html_content = await io_executor.run(write_bracket_html, html_filename, game_name, rounds_data)
+
+    # Render Image (to a temp file first, so a killed render never leaves a half-written PNG behind)
+    tmp_filename = img_filename + ".tmp"
+    try:
+        await render_pool.run("html", html_content, tmp_filename)
+        await io_executor.run(os.replace, tmp_filename, img_filename)
+    except Exception as e:
+        return e
+    return None
+
+# --- SVG BRACKET RENDERER ---
+# Pure-Python alternative to the template + WeasyPrint path: lays the tree out
+# straight from the heap ids (match i sits between its feeders 2*i and 2*i+1),
+# so a 256-team bracket is a few thousand string appends.
+BRACKET_RENDERER = os.getenv("BRACKET_RENDERER", "html").lower() # Default for !createbracket / !exportbracket
+BRACKET_RENDERERS = ("html", "svg")
+SVG_RENDERER_VERSION = "1" # Bump when the layout changes (invalidates cached SVG renders)
+SVG_BOX_WIDTH = 200
+SVG_ROW_HEIGHT = 24
+SVG_COLUMN_GAP = 48
+SVG_ROW_GAP = 16
+SVG_MARGIN = 20
+SVG_HEADER = 70
+SVG_NAME_CHARS = 24
+
+def pick_renderer(requested=None):
+    """Resolves a renderer name; the HTML path falls back to SVG when jinja2/weasyprint or the template are missing."""
+    name = (requested or BRACKET_RENDERER).lower()
+    if name not in BRACKET_RENDERERS:
+        return None
+    if name == "html" and not (HAS_VISUALS and os.path.exists("bracket_template.html")):
+        return "svg"
+    return name
+
+def svg_box_origin(match_id, total_rounds):
+    """Top-left corner of a match box; match i is centred between its feeders 2*i and 2*i+1."""
+    depth = match_id.bit_length() - 1
+    column = total_rounds - 1 - depth
+    tree_height = (1 << (total_rounds - 1)) * (SVG_ROW_HEIGHT * 2 + SVG_ROW_GAP)
+    center_y = SVG_HEADER + (match_id - (1 << depth) + 0.5) * tree_height / (1 << depth)
+    return SVG_MARGIN + column * (SVG_BOX_WIDTH + SVG_COLUMN_GAP), center_y - SVG_ROW_HEIGHT
+
+# Fragments are cached per match state, so after a result is reported only the
+# reported match and the slot it feeds are drawn again; the rest is reassembled.
+@functools.lru_cache(maxsize=8192)
+def svg_connector(match_id, total_rounds):
+    """Elbow line from a match to the match its winner advances to."""
+    x, y = svg_box_origin(match_id, total_rounds)
+    parent_x, parent_y = svg_box_origin(match_id // 2, total_rounds)
+    start_x, mid_x = x + SVG_BOX_WIDTH, x + SVG_BOX_WIDTH + SVG_COLUMN_GAP / 2
+    return f'<path d="M{start_x:.0f} {y + SVG_ROW_HEIGHT:.1f}H{mid_x:.0f}V{parent_y + SVG_ROW_HEIGHT:.1f}H{parent_x:.0f}"/>'
+
+@functools.lru_cache(maxsize=8192)
+def svg_match_box(match_id, total_rounds, team1, team2, winner):
+    x, y = svg_box_origin(match_id, total_rounds)
+    parts = [
+        f'<rect x="{x:.0f}" y="{y:.1f}" width="{SVG_BOX_WIDTH}" height="{SVG_ROW_HEIGHT * 2}" rx="5" fill="#202225" stroke="#40444b"/>',
+        f'<line x1="{x:.0f}" y1="{y + SVG_ROW_HEIGHT:.1f}" x2="{x + SVG_BOX_WIDTH:.0f}" y2="{y + SVG_ROW_HEIGHT:.1f}" stroke="#2f3136"/>',
+        f'<text x="{x + SVG_BOX_WIDTH - 4:.0f}" y="{y - 3:.1f}" text-anchor="end" font-size="10" fill="#b9bbbe">#{match_id}</text>',
+    ]
+    for row, team in enumerate((team1, team2)):
+        name = team or "TBD"
+        if len(name) > SVG_NAME_CHARS:
+            name = name[:SVG_NAME_CHARS - 1] + "…"
+        if team and team == winner:
+            style = 'fill="#43b581" font-weight="bold"'
+        elif not team or team == "BYE":
+            style = 'fill="#72767d" font-style="italic"'
+        else:
+            style = 'fill="#ffffff"'
+        text_y = y + row * SVG_ROW_HEIGHT + SVG_ROW_HEIGHT / 2 + 4.5
+        parts.append(f'<text x="{x + 8:.0f}" y="{text_y:.1f}" {style}>{html.escape(name)}</text>')
+    return "".join(parts)
+
+def build_bracket_svg(game_name, matches):
+    """Draws a bracket (matches dict from build_bracket_matches) as an SVG document."""
+    ids = sorted(m['id'] for m in matches.values())
+    if not ids:
+        return '<svg xmlns="http://www.w3.org/2000/svg" width="1" height="1"/>'
+    total_rounds = ids[-1].bit_length() # Leaves sit at depth total_rounds - 1
+    width = SVG_MARGIN * 2 + total_rounds * SVG_BOX_WIDTH + (total_rounds - 1) * SVG_COLUMN_GAP
+    height = SVG_HEADER + (1 << (total_rounds - 1)) * (SVG_ROW_HEIGHT * 2 + SVG_ROW_GAP) + SVG_MARGIN
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height:.0f}" viewBox="0 0 {width} {height:.0f}" '
+        f'font-family="Segoe UI, Tahoma, Geneva, Verdana, sans-serif" font-size="13">',
+        f'<rect width="100%" height="100%" fill="#2f3136"/>',
+        f'<text x="{width / 2:.0f}" y="34" text-anchor="middle" font-size="24" font-weight="bold" fill="#f0b132">{html.escape(game_name)} Tournament</text>',
+    ]
+    for round_num in range(1, total_rounds + 1):
+        x = SVG_MARGIN + (round_num - 1) * (SVG_BOX_WIDTH + SVG_COLUMN_GAP) + SVG_BOX_WIDTH / 2
+        parts.append(f'<text x="{x:.0f}" y="{SVG_HEADER - 12}" text-anchor="middle" fill="#b9bbbe">Round {round_num}</text>')
+
+    # Connectors first so boxes are drawn over them
+    parts.append('<g fill="none" stroke="#40444b" stroke-width="2">')
+    parts.extend(svg_connector(match_id, total_rounds) for match_id in ids if match_id > 1)
+    parts.append('</g>')
+
+    for match in matches.values():
+        parts.append(svg_match_box(match['id'], total_rounds, match['team1'], match['team2'], match['winner']))
+    parts.append('</svg>')
+    return "".join(parts)
+
+def write_bracket_svg(svg_filename, game_name, matches):
+    """Writes the SVG bracket to svg_filename. Returns the SVG."""
+    svg_content = build_bracket_svg(game_name, matches)
+    with open(svg_filename, "w", encoding="utf-8") as f:
+        f.write(svg_content)
+    return svg_content
+
+async def render_bracket_svg_files(svg_filename, img_filename, game_name, matches):
+    """Renders a bracket to svg_filename and, if cairosvg is available, img_filename. Returns the error, if any."""
+    svg_content = await io_executor.run(write_bracket_svg, svg_filename, game_name, matches)
+    if not HAS_SVG_PNG:
+        return None
+
+    tmp_filename = img_filename + ".tmp"
+    try:
+        await render_pool.run("svg", svg_content, tmp_filename)
+        await io_executor.run(os.replace, tmp_filename, img_filename)
+    except Exception as e:
+        return e
+    return None
+
+# --- RENDER CACHE ---
+RENDER_CACHE_DIR = "render_cache"
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_MB", "200")) * 1024 * 1024
+RENDER_MATCH_FIELDS = ("id", "round", "team1", "team2", "winner") # Everything the template draws
+
+class RenderCache:
+    """
+    Content-addressed store for rendered brackets. The key is a hash of the
+    match fields the renderer draws plus the renderer version (template hash
+    for HTML, SVG_RENDERER_VERSION for SVG), so an unchanged
+    bracket is served from disk instantly and any result or template edit gets
+    a new key. Total size is bounded with LRU eviction across all games;
+    concurrent requests for the same key share one render.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict() # key -> bytes on disk, least recently used first
+        self.total_bytes = 0
+        self.pending = {} # key -> render task in progress
+        self.template_stamp = None
+        self.template_version = None
+
+    def path(self, key, ext):
+        return os.path.join(self.directory, key + ext)
+
+    def load(self):
+        """Indexes complete entries already on disk (oldest first) and removes leftovers of unfinished renders."""
+        os.makedirs(self.directory, exist_ok=True)
+        found = {}
+        for entry in os.scandir(self.directory):
+            key, ext = os.path.splitext(entry.name)
+            stat = entry.stat()
+            size, mtime = found.get(key, (0, 0))
+            found[key] = (size + stat.st_size, max(mtime, stat.st_mtime))
+        for key, (size, _) in sorted(found.items(), key=lambda item: item[1][1]):
+            if self.image_path(key):
+                self.entries[key] = size
+                self.total_bytes += size
+            else:
+                self.remove_files(key)
+        self.evict()
+
+    def current_template_version(self):
+        """Hash of bracket_template.html, re-read only when the file changes."""
+        stat = os.stat("bracket_template.html")
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self.template_stamp:
+            with open("bracket_template.html", "rb") as f:
+                self.template_version = hashlib.sha256(f.read()).hexdigest()
+            self.template_stamp = stamp
+        return self.template_version
+
+    def image_path(self, key):
+        """The entry's image, or None if it never finished rendering (an SVG is its own image without cairosvg)."""
+        if os.path.exists(self.path(key, ".png")):
+            return self.path(key, ".png")
+        if not HAS_SVG_PNG and os.path.exists(self.path(key, ".svg")):
+            return self.path(key, ".svg")
+        return None
+
+    def key(self, game_name, matches, renderer):
+        """Content hash of a bracket's rendered output. Runs on the I/O thread."""
+        ordered = sorted(matches.values(), key=lambda m: m['id'])
+        payload = json.dumps({
+            "game": game_name,
+            "renderer": renderer,
+            "version": self.current_template_version() if renderer == "html" else SVG_RENDERER_VERSION,
+            "matches": [[m.get(field) for field in RENDER_MATCH_FIELDS] for m in ordered],
+        })
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def entry_size(self, key):
+        return sum(os.path.getsize(self.path(key, ext)) for ext in (".html", ".svg", ".png") if os.path.exists(self.path(key, ext)))
+
+    def remove_files(self, key):
+        for ext in (".html", ".svg", ".png", ".png.tmp"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.path(key, ext))
+
+    def evict(self, keep=None):
+        """Drops least recently used entries until the cache fits (never the entry just served)."""
+        while self.total_bytes > self.max_bytes and self.entries:
+            key = next(iter(self.entries))
+            if key == keep:
+                break
+            self.total_bytes -= self.entries.pop(key)
+            metrics['render_cache_evictions'] += 1
+            io_executor.submit(self.remove_files, key)
+
+    async def render(self, game_name, matches, renderer="html"):
+        """Returns (source_file, image_file, error) for a bracket, rendering only on a cache miss."""
+        source_ext = ".html" if renderer == "html" else ".svg"
+        # Snapshot on the loop first, so the key and the image describe the same bracket state
+        # (a !report while hashing or rendering gets its own key)
+        snapshot = {m_id: dict(m) for m_id, m in matches.items()}
+        key = await io_executor.run(self.key, game_name, snapshot, renderer)
+        if key in self.entries:
+            image_filename = self.image_path(key)
+            if image_filename:
+                self.entries.move_to_end(key)
+                metrics['render_cache_hits'] += 1
+                io_executor.submit(os.utime, image_filename) # Keeps LRU order across restarts
+                return self.path(key, source_ext), image_filename, None
+            self.total_bytes -= self.entries.pop(key) # Files removed behind our back
+
+        if key not in self.pending:
+            metrics['render_cache_misses'] += 1
+            self.pending[key] = asyncio.ensure_future(self.fill(key, game_name, snapshot, renderer))
+        return await asyncio.shield(self.pending[key])
+
+    async def fill(self, key, game_name, matches, renderer):
+        try:
+            if renderer == "html":
+                source_filename = self.path(key, ".html")
+                error = await render_bracket_files(source_filename, self.path(key, ".png"), game_name, bracket_rounds(matches))
+            else:
+                source_filename = self.path(key, ".svg")
+                error = await render_bracket_svg_files(source_filename, self.path(key, ".png"), game_name, matches)
+            if error:
+                return source_filename, None, error
+            size = await io_executor.run(self.entry_size, key)
+            self.entries[key] = size
+            self.total_bytes += size
+            self.evict(keep=key)
+            return source_filename, self.image_path(key), None
+        finally:
+            del self.pending[key]
+
+render_cache = RenderCache(RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES)
+render_cache.load()
+
+def build_bracket_matches(participating_teams):
+    """
+    Builds a single elimination bracket from seeded teams. Returns the matches
+    dict keyed by str(match_id); match i is fed by matches 2*i and 2*i+1.
+    """
+    # 1. Calculate Bracket Size (Next Power of 2)
     # e.g., 6 teams -> needs size 8
     count = len(participating_teams)
     bracket_size = 1
     while bracket_size < count:
         bracket_size *= 2
     
-    # 4. Generate Seeding Order (Standard Snake Seeding)
+    # 2. Generate Seeding Order (Standard Snake Seeding)
     # Recursive function to get order: [1, 8, 4, 5, 2, 7, 3, 6]
     def get_seeds(n):
         if n == 1: return [1]
@@ -1110,7 +4130,7 @@ async def createbracket(ctx, game: str = None):
         else:
             slots[i] = "BYE"
 
-    # 5. Build Match Structure (Binary Heap Array Logic)
+    # 3. Build Match Structure (Binary Heap Array Logic)
     # Root is Match 1. Children of Match i are 2*i and 2*i+1.
     # We work backwards from the leaves.
     # Total matches = bracket_size - 1
@@ -1166,48 +4186,133 @@ async def createbracket(ctx, game: str = None):
         else:
             tree[match_id] = {"match_ref": match_id} # Placeholder
 
-    # 6. Save to Database
-    brackets = load_brackets()
+    return matches
+
+def bracket_attachment(game_key, path):
+    """Attaches a cached render under its {game}_bracket.* name."""
+    return discord.File(path, filename=f"{game_key}_bracket{os.path.splitext(path)[1]}")
+
+@bot.command()
+async def createbracket(ctx, game: str = None, renderer: str = None):
+    """(Moderator Only) Generates a Single Elimination bracket for a specific game. Usage: !createbracket <game> [html|svg]"""
+    if "Moderator" not in [r.name for r in ctx.author.roles]:
+        await ctx.send("You need the **Moderator** role to use this command.", delete_after=5)
+        return
+
+    if not game:
+        await ctx.send("Usage: `!createbracket <game> [html|svg]` (e.g., valorant)", delete_after=5)
+        return
+
+    renderer = pick_renderer(renderer)
+    if not renderer:
+        await ctx.send(f"❌ Unknown renderer. Choose one of: {', '.join(BRACKET_RENDERERS)}.", delete_after=5)
+        return
+
+    game_key = game.lower()
+    
+    # 1. Fetch Teams for this Game
+    participating_teams = team_store.teams_for_game(game_key)
+    
+    if len(participating_teams) < 2:
+        await ctx.send(f"❌ Not enough teams to create a bracket for **{game}**. Need at least 2.", delete_after=5)
+        return
+
+    status_msg = await ctx.send(f"🎲 **Generating Bracket for {len(participating_teams)} teams...**")
+
+    # 2. Shuffle Seeds
+    random.shuffle(participating_teams)
+    
+    # 3. Build Match Structure (seeding + binary heap ids)
+    matches = build_bracket_matches(participating_teams)
+
+    # 4. Save to Database
+    brackets = tournament_brackets
     brackets[game_key] = {
         "format": "single_elimination",
         "matches": matches,
         "timestamp": datetime.datetime.now().isoformat()
     }
-    save_brackets(brackets)
-
-    # 7. Generate Visuals
-    if HAS_VISUALS and os.path.exists("bracket_template.html"):
-        # Group matches by round for the template
-        rounds_data = {}
-        for m in matches.values():
-            r = m['round']
-            if r not in rounds_data: rounds_data[r] = []
-            rounds_data[r].append(m)
+    save_brackets(brackets, [game_key])
+
+    # 5. Generate Visuals
+    # Served from the render cache when an identical bracket was drawn before;
+    # otherwise the source is written on the I/O thread and the image is rendered in a separate process
+    queue_note = f" ({render_pool.waiting} ahead in the render queue)" if render_pool.waiting else ""
+    await status_msg.edit(content=f"🖨️ **Rendering {game.upper()} bracket image ({renderer})...**{queue_note}")
+    source_filename, img_filename, error = await render_cache.render(game.upper(), matches, renderer)
+
+    if not error:
+        files = [bracket_attachment(game_key, img_filename)]
+        if source_filename != img_filename:
+            files.append(bracket_attachment(game_key, source_filename))
+        await ctx.send(f"🏆 **{game.upper()} Tournament Bracket Created!**", files=files)
+    else:
+        await ctx.send(f"✅ Bracket created, but image generation failed: {error}")
+        await ctx.send(file=bracket_attachment(game_key, source_filename))
+    
+    await status_msg.delete()
+
+async def get_match_category(guild, game_key):
+    """Finds or creates the '<game> Battle' category. Returns (category, created)."""
+    category_name = f"{game_key} Battle"
+    category = guild_index.category(guild, category_name, ignore_case=True)
+    if category:
+        return category, False
+    return await guild.create_category(category_name), True
+
+async def open_match_channel(guild, category, match_id, match):
+    """
+    Links or creates the private channel of a match (visible to Moderators and
+    both teams) and stores its id on the match. Returns (channel, created).
+    """
+    # Define expected channel name prefix (e.g., "match-1")
+    channel_prefix = f"match-{match_id}"
+    
+    # A. Check for EXISTING channel (Manual Creation Adaptation)
+    existing_channel = None
+    for channel in category.text_channels:
+        # Exact id only: "match-1" must not pick up "match-10-..." .. "match-15-..."
+        if channel.name == channel_prefix or channel.name.startswith(channel_prefix + "-"):
+            existing_channel = channel
+            break
+    
+    target_channel = existing_channel
+    
+    # B. Create Channel if missing
+    if not target_channel:
+        # Name: match-1-teamA-vs-teamB
+        t1 = match.get('team1') or "TBD"
+        t2 = match.get('team2') or "TBD"
+        # Sanitize names for discord channel (lowercase, no spaces)
+        chan_name = f"{channel_prefix}-{t1}-vs-{t2}".lower().replace(" ", "-")
         
-        # Render HTML
-        with open("bracket_template.html", "r") as f:
-            template = Template(f.read())
+        # Permissions: Private to Mods + Teams
+        overwrites = {
+            guild.default_role: discord.PermissionOverwrite(read_messages=False),
+            guild.me: discord.PermissionOverwrite(read_messages=True)
+        }
         
-        html_content = template.render(game_name=game.upper(), rounds=rounds_data)
+        # Add Mod Role
+        mod_role = guild_index.role(guild, "Moderator")
+        if mod_role: overwrites[mod_role] = discord.PermissionOverwrite(read_messages=True)
         
-        # Save HTML file
-        html_filename = f"{game_key}_bracket.html"
-        with open(html_filename, "w") as f:
-            f.write(html_content)
-            
-        # Render Image
-        img_filename = f"{game_key}_bracket.png"
-        try:
-            HTML(string=html_content).write_png(img_filename)
-            files = [discord.File(img_filename), discord.File(html_filename)]
-            await ctx.send(f"🏆 **{game.upper()} Tournament Bracket Created!**", files=files)
-        except Exception as e:
-            await ctx.send(f"✅ Bracket created, but image generation failed: {e}")
-            await ctx.send(file=discord.File(html_filename))
-    else:
-        await ctx.send(f"✅ Bracket created! (Visuals disabled or template missing). Check `brackets.json`.")
+        # Add Team Roles
+        if match.get('team1'):
+            r1 = guild_index.role(guild, match['team1'])
+            if r1: overwrites[r1] = discord.PermissionOverwrite(read_messages=True)
+        if match.get('team2'):
+            r2 = guild_index.role(guild, match['team2'])
+            if r2: overwrites[r2] = discord.PermissionOverwrite(read_messages=True)
+
+        target_channel = await guild.create_text_channel(chan_name, category=category, overwrites=overwrites)
+
+    # C. Save Channel ID to Bracket DB
+    match['channel_id'] = target_channel.id
     
-    await status_msg.delete()
+    # Post Welcome Message if newly created
+    if not existing_channel:
+        await target_channel.send(f"⚔️ **Match #{match_id} Ready!**\n{match.get('team1', 'TBD')} vs {match.get('team2', 'TBD')}\n\nGLHF! Moderators will report the score here.")
+    return target_channel, not existing_channel
 
 @bot.command()
 async def setupmatches(ctx, game: str = None):
@@ -1221,7 +4326,7 @@ async def setupmatches(ctx, game: str = None):
         return
 
     game_key = game.lower()
-    brackets = load_brackets()
+    brackets = tournament_brackets
     
     if game_key not in brackets:
         await ctx.send(f"❌ No bracket found for **{game}**. Create one first with `!createbracket`.", delete_after=5)
@@ -1232,12 +4337,9 @@ async def setupmatches(ctx, game: str = None):
     matches = bracket_data['matches']
     
     # 1. Find/Create Category
-    category_name = f"{game_key} Battle"
-    category = discord.utils.find(lambda c: c.name.lower() == category_name.lower(), guild.categories)
-    
-    if not category:
-        category = await guild.create_category(category_name)
-        await ctx.send(f"📁 Created category: **{category_name}**")
+    category, category_created = await get_match_category(guild, game_key)
+    if category_created:
+        await ctx.send(f"📁 Created category: **{category.name}**")
 
     created_count = 0
     linked_count = 0
@@ -1252,72 +4354,138 @@ async def setupmatches(ctx, game: str = None):
         if not match.get('team1') and not match.get('team2'):
             continue
 
-        # Define expected channel name prefix (e.g., "match-1")
-        channel_prefix = f"match-{match_id}"
-        
-        # A. Check for EXISTING channel (Manual Creation Adaptation)
-        existing_channel = None
-        for channel in category.text_channels:
-            if channel.name.startswith(channel_prefix):
-                existing_channel = channel
-                break
-        
-        target_channel = existing_channel
-        
-        # B. Create Channel if missing
-        if not target_channel:
-            # Name: match-1-teamA-vs-teamB
-            t1 = match.get('team1') or "TBD"
-            t2 = match.get('team2') or "TBD"
-            # Sanitize names for discord channel (lowercase, no spaces)
-            chan_name = f"{channel_prefix}-{t1}-vs-{t2}".lower().replace(" ", "-")
-            
-            # Permissions: Private to Mods + Teams
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(read_messages=False),
-                guild.me: discord.PermissionOverwrite(read_messages=True)
-            }
-            
-            # Add Mod Role
-            mod_role = discord.utils.get(guild.roles, name="Moderator")
-            if mod_role: overwrites[mod_role] = discord.PermissionOverwrite(read_messages=True)
-            
-            # Add Team Roles
-            if match.get('team1'):
-                r1 = discord.utils.get(guild.roles, name=match['team1'])
-                if r1: overwrites[r1] = discord.PermissionOverwrite(read_messages=True)
-            if match.get('team2'):
-                r2 = discord.utils.get(guild.roles, name=match['team2'])
-                if r2: overwrites[r2] = discord.PermissionOverwrite(read_messages=True)
-
-            target_channel = await guild.create_text_channel(chan_name, category=category, overwrites=overwrites)
+        channel, created = await open_match_channel(guild, category, match_id, match)
+        if created:
             created_count += 1
         else:
             linked_count += 1
 
-        # C. Save Channel ID to Bracket DB
-        match['channel_id'] = target_channel.id
-        
-        # Post Welcome Message if newly created
-        if not existing_channel:
-            await target_channel.send(f"⚔️ **Match #{match_id} Ready!**\n{match.get('team1', 'TBD')} vs {match.get('team2', 'TBD')}\n\nGLHF! Moderators will report the score here.")
-
-    save_brackets(brackets)
+    save_brackets(brackets, [game_key])
     await ctx.send(f"✅ **Setup Complete!**\nCreated: {created_count} channels\nLinked: {linked_count} existing channels")
 
+def set_match_result(matches, match_id, winner):
+    """
+    Records (or clears, with winner=None) a match result and moves the winner
+    into the match it feeds. Heap ids make this O(1): match i feeds match i//2,
+    as team1 when i is even and team2 when i is odd. Returns the parent match
+    (None for the final).
+    """
+    match = matches[str(match_id)]
+    match['winner'] = winner
+    if match_id == 1:
+        return None
+    parent = matches[str(match_id // 2)]
+    parent["team1" if match_id % 2 == 0 else "team2"] = winner
+    return parent
+
 @bot.command()
-async def exportbracket(ctx, game: str = None):
-    """(Moderator Only) Exports bracket data and visuals as a ZIP file."""
+async def report(ctx, game: str = None, match_id: int = None, *, winner: str = None):
+    """(Moderator Only) Records, corrects or undoes a match result. Usage: !report <game> <match_id> <winner|undo>"""
     if "Moderator" not in [r.name for r in ctx.author.roles]:
         await ctx.send("You need the **Moderator** role to use this command.", delete_after=5)
         return
 
-    if not game:
-        await ctx.send("Usage: `!exportbracket <game>`", delete_after=5)
+    if not game or match_id is None or not winner:
+        await ctx.send("Usage: `!report <game> <match_id> <winner|undo>`", delete_after=5)
         return
 
     game_key = game.lower()
-    
+    bracket = tournament_brackets.get(game_key)
+    if not bracket:
+        await ctx.send(f"❌ No bracket found for **{game}**. Create one first with `!createbracket`.", delete_after=5)
+        return
+
+    matches = bracket['matches']
+    match = matches.get(str(match_id))
+    if not match:
+        await ctx.send(f"❌ Match **#{match_id}** does not exist in the {game.upper()} bracket.", delete_after=5)
+        return
+
+    # 1. Resolve the new winner (None = undo)
+    previous = match.get('winner')
+    if "BYE" in (match.get('team1'), match.get('team2')):
+        await ctx.send(f"❌ Match **#{match_id}** was decided by a BYE and cannot be changed.", delete_after=5)
+        return
+    if winner.lower() == "undo":
+        if not previous:
+            await ctx.send(f"❌ Match **#{match_id}** has no result to undo.", delete_after=5)
+            return
+        new_winner = None
+    else:
+        if not (match.get('team1') and match.get('team2')):
+            await ctx.send(f"❌ Match **#{match_id}** is still waiting for both teams.", delete_after=5)
+            return
+        new_winner = next((t for t in (match['team1'], match['team2']) if t.lower() == winner.lower()), None)
+        if not new_winner:
+            await ctx.send(f"❌ **{winner}** is not playing in match #{match_id} ({match['team1']} vs {match['team2']}).", delete_after=5)
+            return
+        if new_winner == previous:
+            await ctx.send(f"ℹ️ **{new_winner}** is already recorded as the winner of match #{match_id}.", delete_after=5)
+            return
+
+    # 2. A result can only change while the team it advanced has not played on
+    parent_id = match_id // 2
+    if previous and match_id > 1 and matches[str(parent_id)].get('winner'):
+        await ctx.send(f"❌ Match **#{parent_id}** already has a result. Undo it first: `!report {game_key} {parent_id} undo`", delete_after=10)
+        return
+
+    # 3. Update the match and the slot it feeds (two rows, not the whole bracket)
+    parent = set_match_result(matches, match_id, new_winner)
+    changed = [(game_key, match_id)]
+    if parent:
+        changed.append((game_key, parent_id))
+    # Saved before any Discord call, so a failed send can't leave memory and disk apart
+    save_brackets(tournament_brackets, changed)
+    guild = ctx.guild
+
+    if new_winner is None:
+        summary = f"↩️ Result of **{game_key.upper()} match #{match_id}** undone (was: {previous})."
+    elif previous:
+        summary = f"✏️ **{game_key.upper()} match #{match_id}** corrected: **{new_winner}** wins (was: {previous})."
+    else:
+        loser = match['team2'] if new_winner == match['team1'] else match['team1']
+        summary = f"🏅 **{game_key.upper()} match #{match_id}:** **{new_winner}** defeats {loser}."
+    mod_log.log(guild, f"{summary} Reported by {ctx.author.mention}.")
+
+    if not parent and new_winner:
+        summary += f"\n🏆 **{new_winner}** are the {game_key.upper()} champions!"
+
+    # 4. Channel side effects (the result is already recorded if any of these fail)
+    try:
+        match_channel = guild.get_channel(match['channel_id']) if match.get('channel_id') else None
+        if match_channel:
+            await match_channel.send(summary)
+
+        if parent:
+            parent_channel = guild.get_channel(parent['channel_id']) if parent.get('channel_id') else None
+            if parent_channel:
+                # Channel opened earlier: swap the team that can see it
+                if previous:
+                    old_role = guild_index.role(guild, previous)
+                    if old_role: await parent_channel.set_permissions(old_role, overwrite=None)
+                if new_winner:
+                    new_role = guild_index.role(guild, new_winner)
+                    if new_role: await parent_channel.set_permissions(new_role, read_messages=True)
+                await parent_channel.send(f"🔄 Match #{parent_id} is now: {parent.get('team1') or 'TBD'} vs {parent.get('team2') or 'TBD'}")
+            elif parent.get('team1') and parent.get('team2'):
+                # Both slots filled: the next match can start
+                category, _ = await get_match_category(guild, game_key)
+                parent_channel, _ = await open_match_channel(guild, category, parent_id, parent)
+                save_brackets(tournament_brackets, [(game_key, parent_id)]) # Store the new channel_id
+                summary += f"\n⚔️ Match #{parent_id} is ready: {parent_channel.mention}"
+    except discord.HTTPException as e:
+        print(f"Error: Could not update match channels for {game_key} match #{match_id}: {e}")
+        summary += f"\n⚠️ Result saved, but the match channels could not be updated: {e}"
+
+    # 5. Post the updated bracket (unchanged match fragments are reused by the SVG renderer)
+    source_filename, img_filename, error = await render_cache.render(game_key.upper(), matches, pick_renderer())
+    if error:
+        await ctx.send(f"{summary}\n⚠️ Bracket image could not be updated: {error}")
+    else:
+        await ctx.send(summary, file=bracket_attachment(game_key, img_filename))
+
+def build_export_zip(game_key, source_file, image_file):
+    """Zips brackets.json and the game's bracket visuals. Returns (buffer, files_found)."""
     # Create a buffer for the zip file
     zip_buffer = io.BytesIO()
     
@@ -1329,21 +4497,50 @@ async def exportbracket(ctx, game: str = None):
             zip_file.write(BRACKETS_FILE, arcname="brackets.json")
             files_found = True
             
-        # 2. Add Visuals (HTML & PNG)
-        html_file = f"{game_key}_bracket.html"
-        png_file = f"{game_key}_bracket.png"
-        
-        if os.path.exists(html_file):
-            zip_file.write(html_file, arcname=html_file)
-        if os.path.exists(png_file):
-            zip_file.write(png_file, arcname=png_file)
+        # 2. Add Visuals (HTML/SVG & PNG)
+        for path in {source_file, image_file}:
+            if path and os.path.exists(path):
+                zip_file.write(path, arcname=f"{game_key}_bracket{os.path.splitext(path)[1]}")
+
+    # Reset buffer position
+    zip_buffer.seek(0)
+    return zip_buffer, files_found
+
+@bot.command()
+async def exportbracket(ctx, game: str = None, renderer: str = None):
+    """(Moderator Only) Exports bracket data and visuals as a ZIP file. Usage: !exportbracket <game> [html|svg]"""
+    if "Moderator" not in [r.name for r in ctx.author.roles]:
+        await ctx.send("You need the **Moderator** role to use this command.", delete_after=5)
+        return
+
+    if not game:
+        await ctx.send("Usage: `!exportbracket <game> [html|svg]`", delete_after=5)
+        return
+
+    renderer = pick_renderer(renderer)
+    if not renderer:
+        await ctx.send(f"❌ Unknown renderer. Choose one of: {', '.join(BRACKET_RENDERERS)}.", delete_after=5)
+        return
+
+    game_key = game.lower()
+
+    await persistence.drain()
+    if db:
+        await io_executor.run(db.export_json)
+
+    # Visuals come from the render cache, so they always match the saved bracket
+    # (a re-render only happens when the bracket changed since it was last drawn)
+    source_file, image_file = f"{game_key}_bracket.html", f"{game_key}_bracket.png"
+    if game_key in tournament_brackets:
+        source_file, image_file, error = await render_cache.render(game_key.upper(), tournament_brackets[game_key]['matches'], renderer)
+        if error:
+            await ctx.send(f"⚠️ Image generation failed, exporting without the PNG: {error}", delete_after=10)
+    
+    zip_buffer, files_found = await io_executor.run(build_export_zip, game_key, source_file, image_file)
 
     if not files_found:
         await ctx.send("❌ No bracket data found to export.", delete_after=5)
         return
-
-    # Reset buffer position
-    zip_buffer.seek(0)
     
     await ctx.send(
         f"📦 **Export Ready:** {game.upper()} Tournament Data",
@@ -1359,58 +4556,48 @@ async def scanclaims(ctx):
 
     status_msg = await ctx.send("🕵️ **Starting Claim Scan...** This attempts to link Verified users back to Student IDs based on their nickname.")
     
-    # 1. Build a lookup map: Surname -> List of Student IDs
-    surname_map = {}
-    for sid, info in student_db.items():
-        # Logic must match !verify nickname generation exactly
-        surname = info['name'].split()[0].replace(',', '')
-        if surname not in surname_map:
-            surname_map[surname] = []
-        surname_map[surname].append(sid)
-
     restored_count = 0
+    fuzzy_count = 0
     ambiguous_count = 0
     not_found_count = 0
     
-    verified_role = discord.utils.get(ctx.guild.roles, name="Verified")
+    verified_role = guild_index.role(ctx.guild, "Verified")
     if not verified_role:
         await ctx.send("Error: 'Verified' role not found.")
         return
 
-    for member in ctx.guild.members:
-        if verified_role in member.roles:
-            # Skip if this user is already linked in our database
-            if str(member.id) in claimed_ids.values():
-                continue
+    # 1. Verified members not yet linked in our database (snapshot-backed while the member cache is cold)
+    unlinked = [(uid, name) for uid, (name, _, role_ids) in member_snapshot.entries(ctx.guild).items()
+                if verified_role.id in role_ids and not claims.has_claim(uid)]
 
-            nickname = member.display_name
-            
-            matches = surname_map.get(nickname)
-            
-            if matches and len(matches) == 1:
-                # Unique match found!
-                sid = matches[0]
+    # 2. Match all nicknames in one batch on the I/O thread (keeps the event loop free on big guilds).
+    # The captured index is an immutable snapshot: an import or reload meanwhile publishes a new one.
+    index = name_index
+    nicknames = [name for _, name in unlinked]
+    results = await io_executor.run(lambda: [index.resolve(nick) for nick in nicknames])
+
+    for (member_id, _), (status, sid, ranked) in zip(unlinked, results):
+        if status == 'match':
+            # Integrity check: Is this ID already claimed by someone else?
+            if sid in claims:
+                continue
                 
-                # Integrity check: Is this ID already claimed by someone else?
-                if sid in claimed_ids:
-                    continue
-                    
-                claimed_ids[sid] = str(member.id)
-                restored_count += 1
-            elif matches and len(matches) > 1:
-                # Multiple students have this surname (e.g. "Santos")
-                ambiguous_count += 1
-            else:
-                # Nickname doesn't match any student surname
-                not_found_count += 1
+            claims.claim(sid, member_id)
+            restored_count += 1
+            if ranked[0][1] < 1.0:
+                fuzzy_count += 1
+        elif status == 'ambiguous':
+            # Multiple students have this surname (e.g. "Santos")
+            ambiguous_count += 1
+        else:
+            # Nickname doesn't match any student surname
+            not_found_count += 1
 
-    save_claimed_ids(claimed_ids)
-    
     embed = discord.Embed(title="✅ Claim Scan Complete", color=discord.Color.green())
-    embed.add_field(name="Restored", value=str(restored_count), inline=True)
+    embed.add_field(name="Restored", value=f"{restored_count} ({fuzzy_count} fuzzy)", inline=True)
     embed.add_field(name="Ambiguous (Skipped)", value=str(ambiguous_count), inline=True)
     embed.add_field(name="No Match (Skipped)", value=str(not_found_count), inline=True)
-    embed.set_footer(text="Ambiguous users share a surname. They must re-verify manually.")
+    embed.set_footer(text="Ambiguous users share a surname or match several students. They must re-verify manually.")
     
     await status_msg.edit(content=None, embed=embed)
 
@@ -1436,64 +4623,83 @@ async def fixunverified(ctx):
 
     status_msg = await ctx.send("🕵️ **Scanning for unverified team members...**")
 
-    # Build surname map for lookup (Nickname -> List of IDs)
-    surname_map = {}
-    for sid, info in student_db.items():
-        surname = info['name'].split()[0].replace(',', '')
-        if surname not in surname_map: surname_map[surname] = []
-        surname_map[surname].append(sid)
-
-    teams = load_teams()
-    team_members = set()
-    for t in teams.values():
-        for m in t['members']:
-            team_members.add(m)
-
-    verified_role = discord.utils.get(ctx.guild.roles, name="Verified")
-    fixed_count = 0
-    failed_count = 0
-    log_channel = discord.utils.get(ctx.guild.text_channels, name="mod-logs")
-
-    for user_id in team_members:
-        member = ctx.guild.get_member(int(user_id))
-        if not member: continue
-        
-        # If they are in a team but NOT verified
-        if verified_role not in member.roles:
-            student_id = None
-            
-            # Strategy 1: Check if they already have a claimed ID (maybe role was just removed)
-            for sid, uid in claimed_ids.items():
-                if uid == user_id:
-                    student_id = sid
-                    break
-            
-            # Strategy 2: Try to match Nickname to Database
-            if not student_id:
-                nick = member.display_name
-                matches = surname_map.get(nick)
-                if matches and len(matches) == 1:
-                    # Unique match found! Check if ID is free.
-                    if matches[0] not in claimed_ids:
-                         student_id = matches[0]
-
-            if student_id:
-                success, msg = await perform_verification(ctx.guild, member, student_id, ctx.author)
-                if success:
-                    fixed_count += 1
-                else:
-                    failed_count += 1
-            else:
-                # Log ambiguity so Mod can fix manually
-                if log_channel:
-                    await log_channel.send(f"⚠️ **Auto-Fix Failed:** {member.mention} is in a team but unverified. Could not determine Student ID automatically.")
-                failed_count += 1
+    counts = await bulk_scheduler.start("fixunverified", ctx.guild, list(team_store.member_index), status_msg, params={"moderator_id": ctx.author.id})
+    fixed_count = counts['fixed']
+    failed_count = counts['failed']
 
     await status_msg.edit(content=f"✅ **Fix Complete.**\nFixed: {fixed_count}\nFailed/Ambiguous: {failed_count}")
 
 @bot.command()
+async def reloadroster(ctx, mode: str = ""):
+    """(Moderator Only) Re-reads response.csv without restarting the bot. Usage: !reloadroster [force]"""
+    if "Moderator" not in [r.name for r in ctx.author.roles]:
+        await ctx.send("You need the **Moderator** role to use this command.", delete_after=5)
+        return
+
+    status_msg = await ctx.send("🔄 Reloading student roster...")
+    try:
+        embed = await roster_watcher.reload(force=mode.lower() == "force")
+    except RosterShrinkError as e:
+        await status_msg.edit(content=f"❌ {e} Use `!reloadroster force` if this is intended.")
+        return
+    await status_msg.edit(content=None, embed=embed)
+
+@bot.command()
+async def importroster(ctx):
+    """(Moderator Only) Merges an attached CSV into the student roster. Usage: !importroster (with CSV attached)"""
+    if "Moderator" not in [r.name for r in ctx.author.roles]:
+        await ctx.send("You need the **Moderator** role to use this command.", delete_after=5)
+        return
+
+    if not ctx.message.attachments or not ctx.message.attachments[0].filename.lower().endswith(".csv"):
+        await ctx.send("Please attach a `.csv` file with `Student Number`, `Full Name` and `Column 7`/`Sport` columns.", delete_after=10)
+        return
+
+    attachment = ctx.message.attachments[0]
+    status_msg = await ctx.send(f"📥 **Downloading** `{attachment.filename}`...")
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        # Hold the roster lock so a hot reload cannot swap student_db mid-import
+        async with roster_watcher.lock:
+            await download_attachment(attachment, tmp_path)
+
+            # Reject files without the required columns up front (instead of "0 rows")
+            header = await io_executor.run(read_roster_header, tmp_path)
+            missing = [c for c in ('Student Number', 'Full Name') if c not in header]
+            if missing:
+                raise ValueError(f"`{attachment.filename}` is missing the {', '.join(f'`{c}`' for c in missing)} column(s).")
+
+            stats, invalid_examples, sports_changed = await import_roster_file(tmp_path, status_msg)
+
+            # Runs after the queued appends, so the watcher won't treat our own write as an external change
+            roster_watcher.signature = await io_executor.run(file_signature, STUDENT_FILE)
+    except Exception as e:
+        await status_msg.edit(content=f"❌ **Import failed:** {e}")
+        return
+    finally:
+        await io_executor.run(os.remove, tmp_path)
+
+    updated_members = await apply_sport_changes(ctx.guild, sports_changed)
+    metrics['roster_imports'] += 1
+
+    embed = discord.Embed(title="📥 Roster Import Complete", color=discord.Color.green())
+    embed.add_field(name="Rows Read", value=str(stats['rows']), inline=True)
+    embed.add_field(name="Added", value=str(stats['added']), inline=True)
+    embed.add_field(name="Sports Updated", value=f"{stats['updated']} ({updated_members} members' roles)", inline=True)
+    embed.add_field(name="Invalid IDs", value=str(stats['invalid']), inline=True)
+    embed.add_field(name="Total Students", value=str(len(student_db)), inline=True)
+    if invalid_examples:
+        embed.add_field(name="Invalid Examples", value=", ".join(f"`{sid}`" for sid in invalid_examples), inline=False)
+    await status_msg.edit(content=None, embed=embed)
+
+@bot.hybrid_command(description="List or toggle your in-game roles (max 2 per game).")
+@commands.guild_only()
+@app_commands.describe(role1="In-game role, e.g. Duelist", role2="Second in-game role")
 async def gameroles(ctx, role1: str = None, role2: str = None):
     """Lists roles or assigns them (Max 2 per game). Usage: !gameroles [role1] [role2]"""
+    await ctx.defer(ephemeral=True)
     
     # 1. If no argument, List Roles AND Current Status
     if not role1 and not role2:
@@ -1555,7 +4761,7 @@ async def gameroles(ctx, role1: str = None, role2: str = None):
 
         # 3. Ensure the role exists in the server
         guild = ctx.guild
-        role_obj = discord.utils.get(guild.roles, name=target_role_proper)
+        role_obj = guild_index.role(guild, target_role_proper)
         
         if not role_obj:
             try:
@@ -1606,6 +4812,109 @@ async def gameroles(ctx, role1: str = None, role2: str = None):
         position = "Primary" if current_count == 1 else "Secondary"
         await ctx.send(f"✅ Added **{target_role_proper}** as your **{position}** role!", delete_after=5)
 
+@bot.command(name="metrics")
+async def metrics_cmd(ctx):
+    """(Moderator Only) Shows internal performance counters."""
+    if "Moderator" not in [r.name for r in ctx.author.roles]:
+        await ctx.send("You need the **Moderator** role to use this command.", delete_after=5)
+        return
+
+    embed = discord.Embed(title="📈 Bot Metrics", color=discord.Color.blue())
+
+    # Storage
+    requests = metrics['save_requests']
+    flushes = metrics['flushes']
+    embed.add_field(name="💾 Storage", value=(
+        f"Backend: `{STORAGE_BACKEND}`\n"
+        f"Save requests: {requests}\n"
+        f"Disk flushes: {flushes}\n"
+        f"Flushes saved by coalescing: {max(requests - flushes - len(persistence.pending), 0)}\n"
+        f"Pending: {', '.join(persistence.pending) or 'None'}"
+    ), inline=False)
+
+    # Event loop health (a blocked loop delays gateway heartbeats)
+    embed.add_field(name="⏱️ Event Loop", value=(
+        f"Lag (last/avg/max): {metrics['loop_lag_last_ms']} / {metrics['loop_lag_avg_ms']} / {metrics['loop_lag_max_ms']} ms\n"
+        f"Blocked > {int(loop_lag_monitor.warn_threshold * 1000)}ms: {metrics['loop_lag_warnings']} times\n"
+        f"I/O jobs: {metrics['io_jobs']} (queued now: {io_executor.queued}, peak: {metrics['io_queue_peak']})"
+    ), inline=False)
+
+    # Roster startup path
+    embed.add_field(name="📋 Roster", value=(
+        f"Students: {len(student_db)}\n"
+        f"Last load: {metrics['roster_load_ms']} ms from `{roster_load_source}`\n"
+        f"Cache hit: {metrics['roster_load_cache_ms']} ms | Full parse: {metrics['roster_load_csv_ms']} ms"
+    ), inline=False)
+
+    # Startup / member cache (both modes, from the last run of each)
+    startup_lines = [f"Mode: `{MEMBER_CACHE_MODE}` | Ready in {metrics['time_to_ready_ms']} ms | Member fetches: {metrics['member_fetches']} (+{metrics['member_queries']} batched queries)"]
+    for mode, report in sorted(member_snapshot.startup.items()):
+        line = f"**{mode}:** ready {report.get('ready_ms', '?')} ms, {report.get('cached_members', 0)} members cached ({report.get('cache_bytes', 0) / 1024 / 1024:.1f} MB)"
+        if 'chunked_ms' in report:
+            line += f"; warm after {report['chunked_ms']} ms ({report.get('warm_cache_bytes', 0) / 1024 / 1024:.1f} MB)"
+        startup_lines.append(line)
+    embed.add_field(name="🚀 Startup", value="\n".join(startup_lines), inline=False)
+
+    # Member role/nickname edits
+    embed.add_field(name="👤 Member Edits", value=(
+        f"API calls: {metrics['member_api_calls']}\n"
+        f"Calls saved by batching: {metrics['member_api_calls_saved']}\n"
+        f"No-op edits skipped: {metrics['member_edits_skipped']}"
+    ), inline=False)
+
+    # Bracket rendering
+    embed.add_field(name="🖨️ Rendering", value=(
+        f"Workers: {RENDER_WORKERS} processes | Running: {len(render_pool.running)} | Waiting now: {render_pool.waiting} (peak: {metrics['render_queue_peak']})\n"
+        f"Renders: {metrics['renders']} | Last: {metrics['render_last_ms']} ms | Timeouts: {metrics['render_timeouts']}\n"
+        f"Templates: {len(template_env.cache) if template_env else 0} compiled (startup: {metrics['template_load_ms']} ms)\n"
+        f"SVG match boxes reused: {svg_match_box.cache_info().hits} | Redrawn: {svg_match_box.cache_info().misses}\n"
+        f"Cache: {len(render_cache.entries)} brackets, {render_cache.total_bytes / 1024 / 1024:.1f}/{RENDER_CACHE_MAX_BYTES // 1024 // 1024} MB | "
+        f"Hits: {metrics['render_cache_hits']} | Misses: {metrics['render_cache_misses']} | Evictions: {metrics['render_cache_evictions']}"
+    ), inline=False)
+
+    # Bulk jobs
+    embed.add_field(name="📦 Bulk Jobs", value=(
+        f"Running: {len(bulk_scheduler.running)} (checkpointed: {len(bulk_scheduler.jobs)})\n"
+        f"Jobs run: {metrics['bulk_jobs']} | Items: {metrics['bulk_items']} | Retries: {metrics['bulk_retries']}"
+    ), inline=False)
+
+    # Verification queue
+    wait_ms, total_ms, max_ms = verification_queue.latency_ms()
+    embed.add_field(name="🎫 Verification Queue", value=(
+        f"Depth: {verification_queue.depth} (peak: {metrics['verify_queue_peak']}) | Workers: {VERIFY_WORKERS}\n"
+        f"Processed: {metrics['verify_processed']} | Failed: {metrics['verify_failed']} | Rejected (full): {metrics['verify_rejected']}\n"
+        f"Latency avg wait / avg total / max: {wait_ms} / {total_ms} / {max_ms} ms\n"
+        f"Throttled by guild budget: {metrics['verify_budget_waits']} times"
+    ), inline=False)
+
+    # Mod log batching
+    embed.add_field(name="📝 Mod Log", value=(
+        f"Events: {metrics['modlog_events']} | Posts: {metrics['modlog_messages']}\n"
+        f"Coalesced: {metrics['modlog_coalesced']} | Dropped: {metrics['modlog_dropped']}\n"
+        f"Buffered now: {sum(len(b['events']) for b in mod_log.buffers.values())}\n"
+        f"#verify reminders suppressed by cooldown: {metrics['verify_reminders_suppressed']}"
+    ), inline=False)
+
+    # Team locking
+    embed.add_field(name="🔒 Team Locks", value=(
+        f"Active locks: {len(team_store.locks)}\n"
+        f"Waits on a busy team/user: {metrics['lock_waits']}"
+    ), inline=False)
+
+    await ctx.send(embed=embed)
+
+@bot.command()
+async def synccommands(ctx):
+    """(Moderator Only) Registers the slash commands in this server."""
+    if "Moderator" not in [r.name for r in ctx.author.roles]:
+        await ctx.send("You need the **Moderator** role to use this command.", delete_after=5)
+        return
+
+    # Guild-scoped sync applies instantly (global sync can take up to an hour)
+    bot.tree.copy_global_to(guild=ctx.guild)
+    synced = await bot.tree.sync(guild=ctx.guild)
+    await ctx.send(f"✅ Synced {len(synced)} slash commands: {', '.join(f'`/{c.name}`' for c in synced)}")
+
 @bot.command()
 async def help(ctx):
     """Shows a detailed guide of all available commands."""
@@ -1673,16 +4982,32 @@ async def help(ctx):
         "`!backup` - Download database files.\n"
         "`!restore` - Upload database files to restore.\n"
         "`!scanteams` - Rebuild database from server channels.\n"
-        "`!scanclaims` - Rebuild claimed IDs from nicknames."
+        "`!scanclaims` - Rebuild claimed IDs from nicknames.\n"
+        "`!reloadroster [force]` - Reload response.csv without a restart.\n"
+        "`!importroster` - Merge an attached CSV into the roster.\n"
+        "`!report <game> <match> <winner|undo>` - Record or correct a match result.\n"
+        "`!metrics` - Show storage and performance counters.\n"
+        "`!synccommands` - Register the slash commands in this server."
     ), inline=False)
 
-    embed.set_footer(text="Tip: Arguments with spaces must be wrapped in quotes (e.g. \"Team Name\").")
+    embed.set_footer(text="Tip: Arguments with spaces must be wrapped in quotes (e.g. \"Team Name\"). /verify, /createteam, /invite, /join, /leave, /kick and /gameroles also work as private slash commands.")
 
     await ctx.send(embed=embed)
 
 # Run bot using token stored in environment variable
-token = os.getenv("DISCORD_TOKEN")
-if not token:
-    print("Error: DISCORD_TOKEN environment variable not found.")
-else:
-    bot.run(token)
\ No newline at end of file
+# (guarded so scripts/ can import this module without starting the bot)
+if __name__ == "__main__":
+    token = os.getenv("DISCORD_TOKEN")
+    if not token:
+        print("Error: DISCORD_TOKEN environment variable not found.")
+    else:
+        try:
+            bot.run(token)
+        finally:
+            # Never exit with unsaved changes still waiting in the write-behind buffer
+            io_executor.shutdown()
+            render_pool.shutdown()
+            member_snapshot.save()
+            persistence.flush_all()  # Off the loop: writes (and one retry of failed writes) happen right here
+            if persistence.failed:
+                print(f"Error: Exiting with unsaved changes to: {', '.join(key for key, _ in persistence.failed)}")
\ No newline at end of file
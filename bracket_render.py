@@ -0,0 +1,31 @@
+"""
+Bracket image rasterization, run by bot.py as a separate process per render.
+
+Usage: python bracket_render.py <html|svg> <output.png>  (source document on stdin)
+
+Deliberately free of bot state and import side effects: every render starts
+in a fresh interpreter (nothing is forked from the bot's threads, locks or
+sqlite connection), and a stuck render can be killed on its own.
+"""
+import sys
+
+def render_html_png(html_content, img_filename):
+    """WeasyPrint layout and PNG output (seconds of pure CPU)."""
+    from weasyprint import HTML
+    HTML(string=html_content).write_png(img_filename)
+
+def render_svg_png(svg_content, img_filename):
+    """Rasterizes an SVG bracket with cairosvg."""
+    import cairosvg
+    cairosvg.svg2png(bytestring=svg_content.encode("utf-8"), write_to=img_filename)
+
+RENDERERS = {"html": render_html_png, "svg": render_svg_png}
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] not in RENDERERS:
+        sys.exit("Usage: python bracket_render.py <html|svg> <output.png>")
+    kind, img_filename = sys.argv[1], sys.argv[2]
+    RENDERERS[kind](sys.stdin.buffer.read().decode("utf-8"), img_filename)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Shared setup for the benchmark scripts.
+
+Imports bot.py without starting the bot, from a scratch working directory,
+so the benchmarks never read or write the real data files (and never compete
+with a running bot's I/O thread or render workers).
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def load_bot(files=()):
+    """Imports bot.py from a temp directory; files are copied there from the repo first."""
+    scratch = tempfile.mkdtemp(prefix="bench_")
+    for name in files:
+        shutil.copy(os.path.join(ROOT, name), scratch)
+    os.environ.pop("DISCORD_TOKEN", None)
+    os.chdir(scratch)
+    import bot
+    return bot
@@ -0,0 +1,60 @@
+"""
+Compares role lookup by linear scan (discord.utils.get) against GuildNameIndex.
+
+Usage: python scripts/bench_guild.py [simulated_roles] [lookups]
+"""
+import random
+import sys
+import time
+import types
+
+import discord
+
+from bench_env import load_bot
+
+def benchmark_guild_index(bot, role_count, lookups=2000):
+    """
+    Times discord.utils.get over guild.roles against GuildNameIndex on a
+    synthetic guild with role_count roles. Lookups target random names,
+    so the linear scan walks half the list on average.
+    """
+    roles = [types.SimpleNamespace(id=i, name=f"Team {i:05d}", position=i) for i in range(role_count)]
+    guild = types.SimpleNamespace(id=0, roles=roles, text_channels=[], categories=[])
+    names = [random.choice(roles).name for _ in range(lookups)]
+
+    start = time.perf_counter()
+    for name in names:
+        discord.utils.get(guild.roles, name=name)
+    scan_time = time.perf_counter() - start
+
+    index = bot.GuildNameIndex()
+    start = time.perf_counter()
+    index.build(guild)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in names:
+        index.role(guild, name)
+    index_time = time.perf_counter() - start
+
+    return {
+        'roles': role_count,
+        'lookups': lookups,
+        'scan_us': scan_time / lookups * 1e6,
+        'index_us': index_time / lookups * 1e6,
+        'build_ms': build_time * 1000,
+    }
+
+def main():
+    roles = max(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, 1)
+    lookups = max(int(sys.argv[2]) if len(sys.argv) > 2 else 2000, 1)
+    bot = load_bot()
+    result = benchmark_guild_index(bot, roles, lookups)
+
+    print(f"Roles: {result['roles']} | Lookups: {result['lookups']}")
+    print(f"discord.utils.get: {result['scan_us']:.2f} µs/lookup")
+    print(f"GuildNameIndex:    {result['index_us']:.2f} µs/lookup (build: {result['build_ms']:.1f} ms)")
+    print(f"Speedup: {result['scan_us'] / max(result['index_us'], 1e-9):.0f}x")
+
+if __name__ == "__main__":
+    main()
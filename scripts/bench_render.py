@@ -0,0 +1,54 @@
+"""
+Compares the SVG and HTML/WeasyPrint bracket renderers on a synthetic bracket.
+
+Usage: python scripts/bench_render.py [teams]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from bench_env import load_bot
+import bracket_render # Repo root is on sys.path via bench_env
+
+def benchmark_renderers(bot, team_count):
+    """Renders a synthetic team_count bracket with both renderers. Timings in ms (None = unavailable)."""
+    matches = bot.build_bracket_matches([f"Team {i:04d}" for i in range(team_count)])
+    result = {'teams': team_count, 'matches': len(matches), 'svg_ms': None, 'svg_png_ms': None, 'html_ms': None, 'html_png_ms': None}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start = time.perf_counter()
+        svg_content = bot.build_bracket_svg("BENCH", matches)
+        result['svg_ms'] = (time.perf_counter() - start) * 1000
+        result['svg_kb'] = len(svg_content) / 1024
+        if bot.HAS_SVG_PNG:
+            start = time.perf_counter()
+            bracket_render.render_svg_png(svg_content, os.path.join(tmp_dir, "svg.png"))
+            result['svg_png_ms'] = (time.perf_counter() - start) * 1000
+
+        if bot.HAS_VISUALS and os.path.exists("bracket_template.html"):
+            start = time.perf_counter()
+            html_content = bot.write_bracket_html(os.path.join(tmp_dir, "bracket.html"), "BENCH", bot.bracket_rounds(matches))
+            result['html_ms'] = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            bracket_render.render_html_png(html_content, os.path.join(tmp_dir, "html.png"))
+            result['html_png_ms'] = (time.perf_counter() - start) * 1000
+    return result
+
+def main():
+    teams = max(int(sys.argv[1]) if len(sys.argv) > 1 else 64, 2)
+    bot = load_bot(files=["bracket_template.html"])
+    result = benchmark_renderers(bot, teams)
+
+    def ms(value):
+        return f"{value:.1f} ms" if value is not None else "unavailable"
+
+    print(f"Teams: {result['teams']} | Matches: {result['matches']}")
+    print(f"SVG:               build {ms(result['svg_ms'])} ({result['svg_kb']:.0f} KB), PNG (cairosvg) {ms(result['svg_png_ms'])}")
+    print(f"HTML + WeasyPrint: template {ms(result['html_ms'])}, PNG {ms(result['html_png_ms'])}")
+    if result['html_png_ms'] is not None:
+        svg_total = result['svg_ms'] + (result['svg_png_ms'] or 0)
+        html_total = result['html_ms'] + result['html_png_ms']
+        print(f"Speedup: {html_total / max(svg_total, 1e-9):.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compares the old dict-of-dicts student_db with CompactRoster (memory and load time).
+
+Usage: python scripts/bench_roster.py [simulated_students] [roster.csv]
+"""
+import os
+import sys
+import time
+
+from bench_env import ROOT, load_bot
+
+def deep_sizeof(bot, obj, seen=None):
+    """Approximate memory footprint of a roster structure in bytes."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(bot, k, seen) + deep_sizeof(bot, v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(bot, v, seen) for v in obj)
+    elif isinstance(obj, bot.CompactRoster):
+        size += sum(deep_sizeof(bot, v, seen) for v in (obj.index, obj.names, obj.masks, obj.sport_names, obj.sport_ids, obj._sport_sets))
+    return size
+
+def benchmark_roster(bot, path, target_size=0):
+    """
+    Compares the old dict-of-dicts student_db with CompactRoster.
+    Rows from the CSV are repeated with synthetic student numbers until
+    target_size students exist, to model a university-wide roster.
+    """
+    rows = list(bot.iter_roster_rows(path)) if os.path.exists(path) else []
+    if not rows:
+        return None
+    distinct = len({sid for sid, _, _ in rows})
+    if target_size > distinct:
+        base = rows
+        rows = []
+        copy = 0
+        while copy * distinct < target_size:
+            # Fresh strings per copy, like a real CSV parse would produce
+            rows.extend((f"{sid}-{copy}", "".join(list(name)), "".join(list(sport))) for sid, name, sport in base)
+            copy += 1
+
+    # Old representation
+    start = time.perf_counter()
+    legacy = {}
+    for sid, name, sport in rows:
+        if sid not in legacy:
+            legacy[sid] = {'name': name, 'sports': set()}
+        if sport:
+            legacy[sid]['sports'].add(sport)
+    legacy_time = time.perf_counter() - start
+
+    # Compact representation
+    start = time.perf_counter()
+    compact = bot.CompactRoster()
+    for sid, name, sport in rows:
+        compact.add(sid, name, sport)
+    compact_time = time.perf_counter() - start
+
+    return {
+        'students': len(legacy),
+        'legacy_bytes': deep_sizeof(bot, legacy),
+        'compact_bytes': deep_sizeof(bot, compact),
+        'legacy_ms': legacy_time * 1000,
+        'compact_ms': compact_time * 1000,
+    }
+
+def main():
+    size = max(int(sys.argv[1]) if len(sys.argv) > 1 else 0, 0)
+    path = os.path.abspath(sys.argv[2]) if len(sys.argv) > 2 else os.path.join(ROOT, "response.csv")
+    bot = load_bot()
+    result = benchmark_roster(bot, path, size)
+    if not result:
+        print(f"{path} not found or empty.")
+        return
+
+    print(f"Students: {result['students']}")
+    print(f"Dict of dicts: {result['legacy_bytes'] / 1024 / 1024:.2f} MB, {result['legacy_ms']:.1f} ms")
+    print(f"CompactRoster: {result['compact_bytes'] / 1024 / 1024:.2f} MB, {result['compact_ms']:.1f} ms")
+    print(f"Saved: {(1 - result['compact_bytes'] / result['legacy_bytes']) * 100:.0f}% memory")
+
+if __name__ == "__main__":
+    main()
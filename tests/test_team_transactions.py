@@ -0,0 +1,120 @@
+"""
+Stress test for TeamStore.transaction: hundreds of concurrent join/kick
+commands against a handful of teams must never lose an update or put a
+member in two teams.
+
+Run from the repo root:  python -m unittest discover tests
+(needs the packages from requirements.txt, since it imports bot.py)
+"""
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TEAMS = 8
+PLAYERS = 300
+COMMANDS = 1500
+
+bot = None
+scratch = None
+cwd = None
+
+def setUpModule():
+    # Import bot.py from a scratch directory so the real data files are never touched
+    global bot, scratch, cwd
+    cwd = os.getcwd()
+    scratch = tempfile.mkdtemp(prefix="test_teams_")
+    os.environ.pop("DISCORD_TOKEN", None)
+    os.chdir(scratch)
+    import bot as bot_module
+    bot = bot_module
+
+def tearDownModule():
+    os.chdir(cwd)
+    shutil.rmtree(scratch, ignore_errors=True)
+
+async def discord_call():
+    """Stands in for a Discord API call: yields to the other commands mid-transaction."""
+    await asyncio.sleep(random.random() / 1000)
+
+class TeamTransactionStressTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        random.seed(1234)
+        self.store = bot.TeamStore()
+        self.store.save = lambda changed=None: None  # Persistence is not under test
+        self.store.replace_all({
+            f"Team {t}": {
+                "captain_id": f"captain-{t}",
+                "members": [f"captain-{t}"],
+                "invites": [],
+                "game": "Valorant",
+                "role_id": 1000 + t
+            } for t in range(TEAMS)
+        }, persist=False)
+        self.joins = {f"Team {t}": 0 for t in range(TEAMS)}
+        self.kicks = {f"Team {t}": 0 for t in range(TEAMS)}
+
+    async def join(self, user_id, team_name):
+        """Same check -> Discord -> mutate shape as !invite followed by !join."""
+        store = self.store
+        async with store.transaction(team=team_name, users=[user_id]):
+            if user_id not in store.get(team_name)['invites']:
+                store.add_invite(team_name, user_id)
+        await discord_call()
+        async with store.transaction(team=team_name, users=[user_id]):
+            if user_id not in store.get(team_name).get("invites", []):
+                return
+            await discord_call()
+            if store.team_of(user_id)[0]:
+                return
+            store.add_member(team_name, user_id, from_invite=True)
+            self.joins[team_name] += 1
+            await discord_call()
+
+    async def kick(self, captain_id, user_id):
+        """Same shape as !kick: the team is resolved from the captain under the user locks."""
+        store = self.store
+        async with store.transaction(team=lambda: store.captain_index.get(captain_id), users=[captain_id, user_id]):
+            team_name, team_data = store.captained_by(captain_id)
+            await discord_call()
+            if user_id not in team_data['members']:
+                return
+            store.remove_member(team_name, user_id)
+            self.kicks[team_name] += 1
+            await discord_call()
+
+    async def test_concurrent_join_and_kick(self):
+        commands = []
+        for _ in range(COMMANDS):
+            user_id = f"player-{random.randrange(PLAYERS)}"
+            team = random.randrange(TEAMS)
+            if random.random() < 0.6:
+                commands.append(self.join(user_id, f"Team {team}"))
+            else:
+                commands.append(self.kick(f"captain-{team}", user_id))
+        await asyncio.gather(*commands)
+
+        seen = {}
+        for team_name, data in self.store.items():
+            # No lost updates: every successful join/kick is reflected in the roster
+            self.assertEqual(len(data['members']), 1 + self.joins[team_name] - self.kicks[team_name], team_name)
+            for user_id in data['members']:
+                # No duplicate membership, within a team or across teams
+                self.assertNotIn(user_id, seen, f"{user_id} is in {seen.get(user_id)} and {team_name}")
+                seen[user_id] = team_name
+        self.assertEqual(seen, self.store.member_index)
+        self.assertGreater(sum(self.joins.values()), 0)
+        self.assertGreater(sum(self.kicks.values()), 0)
+
+        # Every lock was released and forgotten
+        self.assertEqual(self.store.locks, {})
+
+if __name__ == "__main__":
+    unittest.main()